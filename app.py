@@ -4,7 +4,12 @@ import os
 import numpy as np
 import gradio as gr
 
-from supertonic_mnn.model import ensure_models, load_text_to_speech, get_voice_style_path, DEFAULT_CACHE_DIR
+from supertonic_mnn.model import (
+    ensure_models,
+    load_engine_pool,
+    get_voice_style_path,
+    DEFAULT_CACHE_DIR,
+)
 from supertonic_mnn.engine import load_voice_style
 from supertonic_mnn.text import AVAILABLE_LANGS
 
@@ -25,38 +30,27 @@ VOICES = ["M1", "M2", "M3", "M4", "M5", "F1", "F2", "F3", "F4", "F5"]
 LOCAL_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "converted_models")
 USE_LOCAL = os.path.exists(LOCAL_MODEL_DIR)
 
+# Weight-sharing engines per version/precision, so concurrent requests don't share MNN modules
+POOL_SIZE = 2
+
 tts_engines = {}
 voice_style_cache = {}
 
 
-def _load_engine_local(version: str, precision: str):
-    from supertonic_mnn.engine import load_mnn, TextToSpeech
-    from supertonic_mnn.text import UnicodeProcessor
-    import json
-
-    model_dir = os.path.join(LOCAL_MODEL_DIR, version)
-    models_dir = os.path.join(model_dir, "mnn_models")
-    precision_dir = os.path.join(models_dir, precision)
-    cfg_path = os.path.join(models_dir, "tts.json")
-    with open(cfg_path) as f:
-        cfgs = json.load(f)
-    mnn_cfg = {"backend": 0, "thread_num": 4, "precision": "low", "memory": "low"}
-    dp = load_mnn(os.path.join(precision_dir, "duration_predictor.mnn"), ["text_ids", "style_dp", "text_mask"], ["duration"], mnn_cfg)
-    text_enc = load_mnn(os.path.join(precision_dir, "text_encoder.mnn"), ["text_ids", "style_ttl", "text_mask"], ["text_emb"], mnn_cfg)
-    vec_est = load_mnn(os.path.join(precision_dir, "vector_estimator.mnn"), ["noisy_latent", "text_emb", "style_ttl", "latent_mask", "text_mask", "current_step", "total_step"], ["denoised_latent"], mnn_cfg)
-    vocoder = load_mnn(os.path.join(precision_dir, "vocoder.mnn"), ["latent"], ["wav_tts"], mnn_cfg)
-    text_processor = UnicodeProcessor(os.path.join(models_dir, "unicode_indexer.json"))
-    return TextToSpeech(cfgs, text_processor, dp, text_enc, vec_est, vocoder)
+# MNN settings of the local models, which come without a config.json
+LOCAL_MNN_CFG = {"backend": 0, "thread_num": 4, "precision": "low", "memory": "low"}
 
 
 def get_engine(version: str, precision: str = "fp16"):
     key = f"{version}_{precision}"
     if key not in tts_engines:
         if USE_LOCAL:
-            tts_engines[key] = _load_engine_local(version, precision)
+            tts_engines[key] = load_engine_pool(
+                LOCAL_MODEL_DIR, precision, version=version, size=POOL_SIZE, mnn_cfg=LOCAL_MNN_CFG
+            )
         else:
             ensure_models(DEFAULT_CACHE_DIR, precision, version)
-            tts_engines[key] = load_text_to_speech(DEFAULT_CACHE_DIR, precision, version=version)
+            tts_engines[key] = load_engine_pool(DEFAULT_CACHE_DIR, precision, version=version, size=POOL_SIZE)
     return tts_engines[key]
 
 
@@ -77,10 +71,11 @@ def synthesize(text: str, lang: str, voice: str, version: str, steps: int, speed
 
     lang_code = lang.split(" - ")[0] if " - " in lang else lang
 
-    engine = get_engine(version)
+    pool = get_engine(version)
     style = get_style(voice, version)
 
-    wav, duration, rtf = engine(text, lang_code, style, total_step=steps, speed=speed)
+    with pool.engine() as engine:
+        wav, duration, rtf = engine(text, lang_code, style, total_step=steps, speed=speed)
 
     audio_data = wav[0]
     sample_rate = engine.sample_rate
@@ -1,3 +1,4 @@
 from .wrapper import SupertonicTTS
+from .engine import EarlyExit
 
-__all__ = ["SupertonicTTS"]
+__all__ = ["SupertonicTTS", "EarlyExit"]
\ No newline at end of file
@@ -0,0 +1,208 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .bench import BENCH_CORPUS, corpus_text
+from .engine import load_mnn, load_voice_style
+from .model import (
+    DEFAULT_CACHE_DIR,
+    MODULE_IO,
+    MODULE_NAMES,
+    ensure_models,
+    get_voice_style_path,
+    host_fingerprint,
+    load_mnn_config,
+    load_text_to_speech,
+    tuned_profile_path,
+)
+
+MODEL_PRECISIONS = ("fp32", "fp16", "int8")
+RUNTIME_PRECISIONS = ("normal", "low")
+MEMORY_MODES = ("normal", "low")
+
+
+def default_thread_counts() -> list[int]:
+    """Powers of two up to the number of CPUs, plus the number of CPUs."""
+    cpus = os.cpu_count() or 1
+    counts = {cpus}
+    count = 1
+    while count < cpus:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def sample_inputs(tts, style, text: str, lang: str, total_step: int) -> dict:
+    """
+    Build a representative input for each module from one text chunk.
+
+    Returns:
+        Mapping of module name to its input dict.
+    """
+    text_ids, text_mask = tts.text_processor([text], [lang])
+    duration, *_ = tts.dp_ort.run(
+        None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}, copy=True
+    )
+    text_emb, *_ = tts.text_enc_ort.run(
+        None, {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask}, copy=True
+    )
+    xt, latent_mask = tts.sample_noisy_latent(duration, 0)
+    return {
+        "duration_predictor": {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask},
+        "text_encoder": {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
+        "vector_estimator": {
+            "noisy_latent": xt,
+            "text_emb": text_emb,
+            "style_ttl": style.ttl,
+            "latent_mask": latent_mask,
+            "text_mask": text_mask,
+            "current_step": np.zeros(1, dtype=np.float32),
+            "total_step": np.full(1, total_step, dtype=np.float32),
+        },
+        "vocoder": {"latent": xt},
+    }
+
+
+def time_module(path: str, name: str, config: dict, inputs: dict, repeat: int = 5) -> float:
+    """Median seconds per run of one module file with the given MNN settings."""
+    input_names, output_names = MODULE_IO[name]
+    module = load_mnn(path, input_names, output_names, config)
+    module.run(None, inputs)  # Warm up, e.g. resize and allocate
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        module.run(None, inputs)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def autotune(
+    model_dir: str = DEFAULT_CACHE_DIR,
+    precision: str = "fp16",
+    version: str = "v3",
+    model_precisions: Optional[Sequence[str]] = None,
+    thread_counts: Optional[Sequence[int]] = None,
+    runtime_precisions: Sequence[str] = RUNTIME_PRECISIONS,
+    memory_modes: Sequence[str] = MEMORY_MODES,
+    lang: str = "en",
+    voice: str = "M1",
+    total_step: int = 5,
+    repeat: int = 5,
+) -> dict:
+    """
+    Find the fastest settings of each module on this machine.
+
+    Every module is timed on its own, with inputs from a typical text chunk,
+    for each combination of model file precision, thread count, MNN
+    precision mode and memory mode. The fastest combination of each module
+    makes up the profile, which is written where load_text_to_speech picks
+    it up for this precision and version.
+
+    Only the model files of precision are tried unless model_precisions
+    lists others; lower precisions are faster but may reduce quality.
+
+    Returns:
+        The profile: host, module_configs and every measured timing.
+    """
+    model_precisions = model_precisions or [precision]
+    thread_counts = thread_counts or default_thread_counts()
+    backend = load_mnn_config(model_dir)["backend"]
+    version_dir = os.path.join(model_dir, version) if version in ("v2", "v3") else model_dir
+    models_dir = os.path.join(version_dir, "mnn_models")
+
+    for model_precision in model_precisions:
+        ensure_models(model_dir, model_precision, version)
+    tts = load_text_to_speech(model_dir, precision, version=version, tuned=False)
+    style = load_voice_style([get_voice_style_path(voice, model_dir, version)])
+    text = corpus_text(BENCH_CORPUS[lang], 300)
+    inputs = sample_inputs(tts, style, text, lang, total_step)
+
+    module_configs = {}
+    timings = {}
+    for name in MODULE_NAMES:
+        results = []
+        for model_precision, thread_num, runtime_precision, memory in itertools.product(
+            model_precisions, thread_counts, runtime_precisions, memory_modes
+        ):
+            config = {
+                "model_precision": model_precision,
+                "thread_num": thread_num,
+                "precision": runtime_precision,
+                "memory": memory,
+            }
+            path = os.path.join(models_dir, model_precision, f"{name}.mnn")
+            seconds = time_module(path, name, {"backend": backend, **config}, inputs[name], repeat)
+            print(f"{name} {config}: {seconds * 1000:.2f}ms", file=sys.stderr)
+            results.append({"config": config, "seconds": seconds})
+        results.sort(key=lambda result: result["seconds"])
+        module_configs[name] = results[0]["config"]
+        timings[name] = results
+
+    profile = {
+        "host": host_fingerprint(),
+        "precision": precision,
+        "version": version,
+        "module_configs": module_configs,
+        "timings": timings,
+    }
+    with open(tuned_profile_path(model_dir, precision, version), "w") as f:
+        json.dump(profile, f, indent=2)
+    return profile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="supertonic-mnn autotune",
+        description="Find the fastest MNN settings of each model on this machine. "
+                    "The result is used automatically when the models are loaded "
+                    "with the same precision and version.",
+    )
+    parser.add_argument(
+        "--precision", type=str, choices=MODEL_PRECISIONS, default="fp16",
+        help="Precision the profile applies to. Default: fp16",
+    )
+    parser.add_argument(
+        "--model-precisions", nargs="+", choices=MODEL_PRECISIONS, default=None,
+        help="Model files each module may be loaded from, e.g. fp16 int8. Lower "
+             "precisions are faster but may reduce quality, and are only used "
+             "when loading with tuned_model_files=True. Default: --precision",
+    )
+    parser.add_argument(
+        "--threads", nargs="+", type=int, default=None,
+        help="Thread counts to try. Default: powers of two up to the CPU count",
+    )
+    parser.add_argument(
+        "--runtime-precisions", nargs="+", default=list(RUNTIME_PRECISIONS),
+        help="MNN precision modes to try. Default: normal low",
+    )
+    parser.add_argument(
+        "--memory-modes", nargs="+", default=list(MEMORY_MODES),
+        help="MNN memory modes to try. Default: normal low",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per setting. Default: 5")
+    parser.add_argument("--model-dir", type=str, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--version", type=str, choices=["v1", "v2", "v3"], default="v3")
+    args = parser.parse_args(argv)
+
+    # Model loading prints progress; keep stdout for the result
+    with redirect_stdout(sys.stderr):
+        profile = autotune(
+            args.model_dir,
+            args.precision,
+            args.version,
+            model_precisions=args.model_precisions,
+            thread_counts=args.threads,
+            runtime_precisions=args.runtime_precisions,
+            memory_modes=args.memory_modes,
+            repeat=args.repeat,
+        )
+    print(json.dumps(profile["module_configs"], indent=2))
+    print(f"Saved profile to {tuned_profile_path(args.model_dir, args.precision, args.version)}")
+    return 0
@@ -0,0 +1,366 @@
+import argparse
+import itertools
+import json
+import platform
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Optional
+
+import numpy as np
+
+from .engine import load_voice_style
+from .metrics import HistogramSink
+from .model import (
+    DEFAULT_CACHE_DIR,
+    MODULE_NAMES,
+    ensure_models,
+    get_voice_style_path,
+    host_fingerprint,
+    load_mnn_config,
+    load_text_to_speech,
+)
+from .text import iter_paragraphs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Fixed benchmark corpus. The English text is the opening of tests/tts.txt;
+# texts shorter than a requested length are repeated.
+BENCH_CORPUS = {
+    "en": (
+        "Call me Ishmael. Some years ago, never mind how long precisely, having "
+        "little or no money in my purse, and nothing particular to interest me on "
+        "shore, I thought I would sail about a little and see the watery part of "
+        "the world. It is a way I have of driving off the spleen and regulating "
+        "the circulation. Whenever I find myself growing grim about the mouth; "
+        "whenever it is a damp, drizzly November in my soul; whenever I find "
+        "myself involuntarily pausing before coffin warehouses, and bringing up "
+        "the rear of every funeral I meet; then, I account it high time to get to "
+        "sea as soon as I can. This is my substitute for pistol and ball. With a "
+        "philosophical flourish Cato throws himself upon his sword; I quietly take "
+        "to the ship. There is nothing surprising in this. If they but knew it, "
+        "almost all men in their degree, some time or other, cherish very nearly "
+        "the same feelings towards the ocean with me."
+    ),
+    "ko": (
+        "오늘은 날씨가 정말 좋습니다. 아침 일찍 공원에 나가 산책을 했습니다. "
+        "나무 사이로 햇살이 비치고, 새들이 노래를 불렀습니다. 점심에는 친구와 "
+        "함께 작은 식당에서 국수를 먹었습니다. 오후에는 도서관에 가서 오래된 "
+        "책을 몇 권 빌렸습니다. 저녁이 되자 바람이 조금 차가워졌습니다."
+    ),
+    "ja": (
+        "今日はとても良い天気です。朝早く公園を散歩しました。木々の間から光が差し込み、"
+        "鳥たちが歌っていました。お昼には友達と小さなお店でうどんを食べました。"
+        "午後は図書館に行って、古い本を何冊か借りました。夕方になると、風が少し冷たくなりました。"
+    ),
+    "fr": (
+        "Il faisait très beau ce matin. Je suis allé me promener dans le parc, "
+        "où les oiseaux chantaient dans les arbres. À midi, j'ai déjeuné avec un "
+        "ami dans un petit restaurant du quartier. L'après-midi, je suis passé à "
+        "la bibliothèque pour emprunter quelques vieux livres. Le soir, le vent "
+        "s'est levé et l'air est devenu plus frais."
+    ),
+    "de": (
+        "Heute war das Wetter wunderbar. Am Morgen bin ich im Park spazieren "
+        "gegangen, wo die Vögel in den Bäumen sangen. Zu Mittag habe ich mit "
+        "einem Freund in einem kleinen Restaurant gegessen. Am Nachmittag war ich "
+        "in der Bibliothek und habe ein paar alte Bücher ausgeliehen. Am Abend "
+        "wurde der Wind etwas kühler."
+    ),
+    "es": (
+        "Hoy ha hecho un tiempo estupendo. Por la mañana fui a pasear al parque, "
+        "donde los pájaros cantaban entre los árboles. Al mediodía comí con un "
+        "amigo en un pequeño restaurante del barrio. Por la tarde pasé por la "
+        "biblioteca y saqué algunos libros antiguos. Por la noche el viento se "
+        "volvió un poco más fresco."
+    ),
+}
+
+DEFAULT_LENGTHS = (100, 400, 1600)
+
+# Metrics compared against a baseline; True means higher is better
+COMPARED_METRICS = {"rtf": False, "ttfa": False, "chunks_per_sec": True}
+
+# Where corpus_text may cut: after a sentence end, or at any word boundary
+# (CJK text has no spaces, so its punctuation marks the boundaries)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])")
+_WORD_BREAK = re.compile(r"\s+|(?<=[、，。！？])")
+
+
+def corpus_text(text: str, length: int) -> str:
+    """
+    Take about length characters of text, repeating it if needed.
+
+    The text is cut at the last sentence end at or below length, or at the
+    last word boundary if that sentence end would drop more than a tenth of
+    length, so inputs of the same length are comparable across languages.
+    """
+    text = " ".join(" ".join(paragraph.split()) for paragraph in iter_paragraphs(text))
+    repeated = " ".join([text] * (length // (len(text) + 1) + 2))
+    # One more character, so that a boundary right at length is found
+    head = repeated[: length + 1]
+    sentence_cuts = [match.start() for match in _SENTENCE_BREAK.finditer(head)]
+    cut = max([c for c in sentence_cuts if c <= length], default=0)
+    if cut < 0.9 * length:
+        word_cuts = [match.start() for match in _WORD_BREAK.finditer(head)]
+        cut = max([c for c in word_cuts if c <= length], default=length)
+    return repeated[:cut].strip()
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    """A memory field of /proc/self/status (Linux), in MB."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident memory to the current one, where supported.
+
+    Returns:
+        True if peak_rss_mb() now measures from this point (Linux only).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident memory of this process, in MB (Linux only)."""
+    return _proc_status_mb("VmRSS")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process since start or reset_peak_rss(), in MB."""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None or resource is None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_run(tts, style, text, lang, steps, repeat=3, warmup=1, seed=0) -> dict:
+    """
+    Benchmark one configuration on a loaded engine.
+
+    __call__ is run repeat times for the RTF and per-stage latencies, and
+    stream() repeat times for the time to first audio and chunks per second.
+
+    peak_rss_mb is the peak resident memory during this run, including the
+    loaded models, and peak_rss_delta_mb its growth over the memory in use
+    when the run started. Where the peak can't be reset (anything but Linux)
+    peak_rss_mb is the peak of the whole process and the delta is None.
+    """
+    resettable = reset_peak_rss()
+    rss_before = current_rss_mb()
+    sink = HistogramSink()
+    for _ in range(warmup):
+        tts(text, lang, style, steps, seed=seed)
+    tts.enable_timing([sink])
+    rtfs = []
+    for _ in range(repeat):
+        tts(text, lang, style, steps, seed=seed)
+        rtfs.append(tts.last_timings.rtf)
+    tts.enable_timing([])
+
+    ttfas = []
+    chunk_rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        first = None
+        chunks = 0
+        for wav, _, elapsed in tts.stream(text, lang, style, steps, seed=seed):
+            if first is None:
+                first = time.perf_counter() - start
+            if elapsed > 0:  # Skip the silence between chunks
+                chunks += 1
+        ttfas.append(first)
+        chunk_rates.append(chunks / (time.perf_counter() - start))
+
+    stages = {
+        name: {"p50": stats["p50"], "p95": stats["p95"]}
+        for name, stats in sink.summary().items()
+    }
+    peak = peak_rss_mb()
+    return {
+        "rtf": float(np.median(rtfs)),
+        "ttfa": float(np.median(ttfas)),
+        "chunks_per_sec": float(np.median(chunk_rates)),
+        "stages": stages,
+        "peak_rss_mb": peak,
+        "peak_rss_delta_mb": peak - rss_before if resettable and rss_before is not None else None,
+    }
+
+
+def _run_key(config: dict) -> tuple:
+    return tuple(config[name] for name in sorted(config))
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.1) -> list:
+    """
+    Find runs that got worse than the baseline by more than tolerance.
+
+    Runs are matched by configuration; runs missing from the baseline are
+    not compared.
+
+    Returns:
+        List of {"config", "metric", "baseline", "value", "change"} dicts.
+    """
+    baseline_runs = {_run_key(run["config"]): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in report["runs"]:
+        base = baseline_runs.get(_run_key(run["config"]))
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, reference = run.get(metric), base.get(metric)
+            if not value or not reference:
+                continue
+            change = value / reference - 1
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    {
+                        "config": run["config"],
+                        "metric": metric,
+                        "baseline": reference,
+                        "value": value,
+                        "change": change,
+                    }
+                )
+    return regressions
+
+
+def run_grid(args, corpus: dict) -> list:
+    """Benchmark every combination of the settings in args."""
+    threads = args.threads or [load_mnn_config(args.model_dir)["thread_num"]]
+    runs = []
+    for precision, thread_num in itertools.product(args.precision, threads):
+        ensure_models(args.model_dir, precision, args.version)
+        module_configs = {name: {"thread_num": thread_num} for name in MODULE_NAMES}
+        # Measure the settings of the grid, not an autotune profile
+        tts = load_text_to_speech(
+            args.model_dir,
+            precision,
+            version=args.version,
+            module_configs=module_configs,
+            tuned=False,
+        )
+        for voice, steps, lang, length in itertools.product(
+            args.voice, args.steps, args.lang, args.lengths
+        ):
+            style = load_voice_style(
+                [get_voice_style_path(voice, args.model_dir, args.version)]
+            )
+            config = {
+                "precision": precision,
+                "threads": thread_num,
+                "steps": steps,
+                "voice": voice,
+                "lang": lang,
+                "length": length,
+            }
+            print(f"Benchmarking {config}", file=sys.stderr)
+            text = corpus_text(corpus[lang], length)
+            result = bench_run(tts, style, text, lang, steps, args.repeat, args.warmup)
+            runs.append({"config": config, **result})
+        del tts
+    return runs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="supertonic-mnn bench",
+        description="Benchmark synthesis speed over a grid of settings and report JSON.",
+    )
+    parser.add_argument(
+        "--precision", nargs="+", default=["fp16"], choices=["fp32", "fp16", "int8"],
+        help="Model precisions to benchmark. Default: fp16",
+    )
+    parser.add_argument(
+        "--threads", nargs="+", type=int, default=None,
+        help="MNN thread counts to benchmark. Default: thread_num from config.json",
+    )
+    parser.add_argument(
+        "--steps", nargs="+", type=int, default=[5], help="Denoising steps. Default: 5"
+    )
+    parser.add_argument("--voice", nargs="+", default=["M1"], help="Voice styles. Default: M1")
+    parser.add_argument(
+        "--lang", nargs="+", default=["en"],
+        help=f"Corpus languages ({', '.join(BENCH_CORPUS)}). Default: en",
+    )
+    parser.add_argument(
+        "--lengths", nargs="+", type=int, default=list(DEFAULT_LENGTHS),
+        help="Text lengths in characters. Default: 100 400 1600",
+    )
+    parser.add_argument(
+        "--corpus", type=str, default=None,
+        help="Text file to use instead of the built-in corpus, e.g. tests/tts.txt",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per setting. Default: 3")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per setting. Default: 1")
+    parser.add_argument("--model-dir", type=str, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--version", type=str, choices=["v1", "v2", "v3"], default="v3")
+    parser.add_argument(
+        "--output", "-o", type=str, default=None, help="Write the JSON report here. Default: stdout"
+    )
+    parser.add_argument(
+        "--baseline", type=str, default=None,
+        help="Earlier report to compare against; exits with status 1 on regressions.",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1,
+        help="Relative slowdown allowed before a regression is flagged. Default: 0.1",
+    )
+    args = parser.parse_args(argv)
+
+    corpus = dict(BENCH_CORPUS)
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = dict.fromkeys(args.lang, f.read())
+    unknown = [lang for lang in args.lang if lang not in corpus]
+    if unknown:
+        parser.error(f"No corpus text for {unknown}; use --corpus")
+
+    # Keep stdout for the report; model loading prints progress
+    with redirect_stdout(sys.stderr):
+        runs = run_grid(args, corpus)
+
+    report = {
+        "host": {**host_fingerprint(), "python": platform.python_version()},
+        "version": args.version,
+        "runs": runs,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        for regression in report["regressions"]:
+            print(
+                f"Regression: {regression['metric']} {regression['change']:+.1%} "
+                f"for {regression['config']}",
+                file=sys.stderr,
+            )
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+
+def _nbytes(value) -> int:
+    """Total size of the numpy arrays in a value (an array or a tuple of them)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+
+def _freeze(value):
+    """Copy the arrays of a value into read-only arrays owned by the cache."""
+    if isinstance(value, np.ndarray):
+        value = np.array(value)
+        value.flags.writeable = False
+        return value
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the size of its values.
+
+    Values are numpy arrays or tuples of them. They are copied into read-only
+    arrays on insertion, so callers can neither change a cached value nor keep
+    an MNN buffer alive through it.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Maximum total size of the cached arrays. Least recently
+                used entries are evicted beyond it.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value):
+        """Cache a value, evicting older entries to stay within max_bytes."""
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        value = _freeze(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        """Drop every entry and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counts and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+class WaveformCache:
+    """
+    Two-tier cache of synthesized audio: an in-memory LRU in front of a
+    directory of .npz files.
+
+    Disk entries are written to a temporary file and renamed into place, so
+    concurrent processes sharing the directory never read a partial entry.
+    When the directory grows past disk_bytes, the least recently used files
+    (by modification time, refreshed on every hit) are deleted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 0,
+    ):
+        """
+        Args:
+            max_bytes: Memory budget of the in-memory tier.
+            disk_dir: Directory of the on-disk tier. None disables it.
+            disk_bytes: Size budget of the on-disk tier.
+        """
+        self.memory = LRUCache(max_bytes)
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._disk_lock = threading.Lock()
+        self._disk_used = None
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(**fields) -> str:
+        """Hash the fields that determine a waveform into a cache key."""
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def get(self, key: str):
+        """Return the cached (wav, duration) for key, or None."""
+        value = self.memory.get(key)
+        if value is not None or self.disk_dir is None:
+            return value
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                value = (data["wav"], data["duration"])
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: tuple):
+        """Cache (wav, duration) in memory and, if enabled, on disk."""
+        self.memory.put(key, value)
+        if self.disk_dir is None:
+            return
+        wav, duration = value
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, wav=wav, duration=duration)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._disk_lock:
+            if self._disk_used is None:
+                self._disk_used = self._scan_disk()[1]
+            else:
+                self._disk_used += size
+            if self._disk_used > self.disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self):
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict_disk(self):
+        # Rescan, as other processes may share the directory
+        entries, used = self._scan_disk()
+        for _, size, path in sorted(entries):
+            if used <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
+        self._disk_used = used
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        self.memory.clear()
+        if self.disk_dir is None:
+            return
+        with self._disk_lock:
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".npz"):
+                    os.remove(entry.path)
+            self._disk_used = 0
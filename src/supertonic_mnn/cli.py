@@ -1,15 +1,21 @@
 import argparse
+import itertools
+import logging
 import soundfile as sf
 import re
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from .engine import load_voice_style
 from .model import (
     ensure_models,
     load_text_to_speech,
+    load_engine_pool,
     get_voice_style_path,
     DEFAULT_CACHE_DIR,
 )
+from .prefork import PreforkServer
+from . import autotune, bench
 
 
 def sanitize_filename(text: str, max_len: int = 20) -> str:
@@ -18,7 +24,29 @@ def sanitize_filename(text: str, max_len: int = 20) -> str:
     return re.sub(r"[^\w]", "_", prefix, flags=re.UNICODE)
 
 
+def run_bounded(fn, items, workers: int):
+    """
+    Call fn on each item in a thread pool, taking the next item only once a
+    worker is free, so a lazily read input is not consumed up front.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(fn, item))
+            if len(pending) >= workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+        for future in pending:
+            future.result()
+
+
 def main():
+    if sys.argv[1:2] == ["bench"]:
+        return bench.main(sys.argv[2:])
+    if sys.argv[1:2] == ["autotune"]:
+        return autotune.main(sys.argv[2:])
+
     parser = argparse.ArgumentParser(description="Supertonic MNN Inference CLI")
 
     parser.add_argument(
@@ -85,31 +113,93 @@ def main():
         help="Model version: v1, v2, or v3. Default: v3",
     )
 
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Number of text chunks to synthesize together in one batch. Default: 1",
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Overlap text encoding, diffusion and vocoding of consecutive chunks.",
+    )
+
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=1,
+        help="Number of weight-sharing engines used to synthesize input lines "
+             "concurrently. MNN threads are split across them. Default: 1",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes that synthesize text chunks in parallel. "
+             "Models are loaded once and shared copy-on-write. Default: 1",
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible output. Default: random",
+    )
+
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Log the real time factor and per-stage timing of each synthesis. "
+             "Not available with --jobs.",
+    )
+
     args = parser.parse_args()
+    if args.jobs > 1:
+        # Worker processes synthesize chunk by chunk with their own engines
+        unsupported = [
+            flag
+            for flag, used in (
+                ("--batch-size", args.batch_size != 1),
+                ("--pipelined", args.pipelined),
+                ("--timing", args.timing),
+            )
+            if used
+        ]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --jobs")
 
-    # Handle input text
+    # Handle input text. Input is read as it is synthesized, not up front.
     if args.input_file:
         if not os.path.exists(args.input_file):
             print(f"Error: Input file '{args.input_file}' does not exist.")
             return
         with open(args.input_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            texts = [line.strip() for line in lines if line.strip()]
-        if not texts:
+            num_texts = sum(1 for line in f if line.strip())
+        if not num_texts:
             print(f"Error: No valid text found in '{args.input_file}'.")
             return
-        print(f"Loaded {len(texts)} line(s) from '{args.input_file}'.")
+        print(f"Found {num_texts} line(s) in '{args.input_file}'.")
+
+        def read_lines():
+            with open(args.input_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
+
+        texts = read_lines()
     else:
         print("Reading text from stdin...")
-        text = sys.stdin.read().strip()
-        if not text:
+        lines = iter(sys.stdin)
+        first_line = next((line for line in lines if line.strip()), None)
+        if first_line is None:
             print("Error: No text provided.")
             return
-        texts = [text]
-
-    if not texts:
-        print("Error: No text provided.")
-        return
+        num_texts = 1
+        texts = iter([itertools.chain([first_line], lines)])
 
     # 1. Ensure models are present
     try:
@@ -120,12 +210,39 @@ def main():
 
     # 2. Load TTS Engine
     print(f"Loading TTS engine with precision={args.precision}, version={args.version}...")
+    pool = None
+    server = None
+    tts = None
     try:
-        tts = load_text_to_speech(args.model_dir, args.precision, version=args.version)
+        if args.jobs > 1:
+            server = PreforkServer(
+                args.model_dir,
+                args.precision,
+                args.version,
+                voices=[args.voice],
+                workers=args.jobs,
+            )
+            server.start()
+        elif args.pool_size > 1 and num_texts > 1:
+            pool = load_engine_pool(
+                args.model_dir, args.precision, version=args.version, size=args.pool_size
+            )
+        else:
+            tts = load_text_to_speech(args.model_dir, args.precision, version=args.version)
     except Exception as e:
         print(f"Error loading engine: {e}")
         return
 
+    if args.timing:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        if tts is not None:
+            tts.enable_timing()
+        elif pool is not None:
+            engines = [pool.checkout() for _ in range(pool.size)]
+            for engine in engines:
+                engine.enable_timing()
+                pool.checkin(engine)
+
     # 3. Load Voice Style
     try:
         style_path = get_voice_style_path(args.voice, args.model_dir, args.version)
@@ -135,43 +252,88 @@ def main():
         print(f"Error loading voice style: {e}")
         return
 
+    def synthesize_text(text, tts):
+        if server is not None:
+            return server.synthesize_document(
+                text, args.voice, args.lang, args.steps, args.speed, seed=args.seed
+            )
+        wav, duration, rtf = tts(
+            text,
+            args.lang,
+            style,
+            args.steps,
+            args.speed,
+            batch_size=args.batch_size,
+            pipelined=args.pipelined,
+            seed=args.seed,
+        )
+        return wav[0], tts.sample_rate
+
     # 4. Synthesize
-    if args.input_file and len(texts) > 1:
-        print(f"Synthesizing {len(texts)} line(s) from file...")
+    if args.input_file and num_texts > 1:
+        print(f"Synthesizing {num_texts} line(s) from file...")
         output_dir = os.path.dirname(args.output) if os.path.dirname(args.output) else "."
         base_name = os.path.splitext(os.path.basename(args.output))[0]
         extension = os.path.splitext(args.output)[1] if os.path.splitext(args.output)[1] else ".wav"
         
-        for idx, text in enumerate(texts, 1):
-            print(f"Synthesizing line {idx}/{len(texts)}: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        def synthesize_line(idx, text, tts):
+            print(f"Synthesizing line {idx}/{num_texts}: '{text[:50]}{'...' if len(text) > 50 else ''}'")
             try:
-                wav, duration, rtf = tts(text, args.lang, style, args.steps, args.speed)
+                wav_data, sample_rate = synthesize_text(text, tts)
                 
                 # Generate output filename
-                if len(texts) == 1:
+                if num_texts == 1:
                     output_file = args.output
                 else:
                     output_file = os.path.join(output_dir, f"{base_name}_{idx}{extension}")
                 
                 # Save output
-                wav_data = wav[0]
-                sf.write(output_file, wav_data, tts.sample_rate)
+                sf.write(output_file, wav_data, sample_rate)
                 print(f"Saved audio to: {output_file}")
                 
             except Exception as e:
                 print(f"Inference failed for line {idx}: {e}")
                 import traceback
                 traceback.print_exc()
+
+        if server is not None:
+            # Lines are read as workers free up; their chunks spread across
+            # the worker processes
+            run_bounded(lambda item: synthesize_line(*item, None), enumerate(texts, 1), args.jobs)
+        elif pool is not None:
+            def synthesize_line_pooled(item):
+                with pool.engine() as engine:
+                    synthesize_line(*item, engine)
+
+            run_bounded(synthesize_line_pooled, enumerate(texts, 1), args.pool_size)
+        else:
+            for idx, text in enumerate(texts, 1):
+                synthesize_line(idx, text, tts)
     else:
         # Single text synthesis
-        text = texts[0]
-        print(f"Synthesizing text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+        text = next(texts)
         try:
-            wav, duration, rtf = tts(text, args.lang, style, args.steps, args.speed)
+            if tts is not None and args.batch_size == 1:
+                # Chunks are read, synthesized and written one at a time
+                print("Synthesizing text...")
+                with sf.SoundFile(args.output, "w", tts.sample_rate, channels=1) as out:
+                    for wav, _, _ in tts.stream(
+                        text,
+                        args.lang,
+                        style,
+                        args.steps,
+                        args.speed,
+                        pipelined=args.pipelined,
+                        seed=args.seed,
+                    ):
+                        out.write(wav[0])
+            else:
+                text = text if isinstance(text, str) else "".join(text).strip()
+                print(f"Synthesizing text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+                wav_data, sample_rate = synthesize_text(text, tts)
 
-            # Save output
-            wav_data = wav[0]
-            sf.write(args.output, wav_data, tts.sample_rate)
+                # Save output
+                sf.write(args.output, wav_data, sample_rate)
             print(f"Saved audio to: {args.output}")
 
         except Exception as e:
@@ -179,6 +341,9 @@ def main():
             import traceback
             traceback.print_exc()
 
+    if server is not None:
+        server.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
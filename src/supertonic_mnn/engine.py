@@ -1,8 +1,82 @@
+import asyncio
+import copy
+import hashlib
 import json
 import numpy as np
 import MNN
+import queue
+import threading
 import time
-from .text import UnicodeProcessor, length_to_mask, chunk_text
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Iterable, Optional, Sequence, Union
+from .text import IncrementalChunker, UnicodeProcessor, length_to_mask, iter_chunks
+from .pipeline import (
+    aread_pieces,
+    incremental_chunks,
+    lookahead,
+    pipelined_infer,
+    read_pieces,
+)
+from .cache import LRUCache, WaveformCache
+from .metrics import LoggingSink, RequestTimings
+
+# Default bucket sizes for shape-bucketed execution. Text lengths include the
+# language tags added by UnicodeProcessor; latent lengths are in latent frames
+# (base_chunk_size * chunk_compress_factor samples each).
+DEFAULT_TEXT_BUCKETS = (32, 64, 96, 128, 192, 256, 320)
+DEFAULT_LATENT_BUCKETS = (16, 32, 64, 96, 128, 192, 256, 320)
+
+# Default windowed vocoding sizes, in latent frames
+DEFAULT_VOCODER_WINDOW = 32
+DEFAULT_VOCODER_OVERLAP = 8
+
+# Default number of per-shape module clones kept by MNNInference.enable_shape_cache
+DEFAULT_SHAPE_MODULES = 32
+
+# Progressive streaming chunk sizes in characters, (first chunk, largest
+# chunk), per language. Languages not listed use DEFAULT_STREAM_CHUNK_SIZES.
+STREAM_CHUNK_SIZES = {"ko": (40, 120), "ja": (40, 120)}
+DEFAULT_STREAM_CHUNK_SIZES = (100, 300)
+
+# Seconds incrementally streamed text may wait for a sentence boundary
+DEFAULT_FLUSH_TIMEOUT = 1.0
+
+# Default memory budget of the text conditioning cache, in bytes
+DEFAULT_CONDITIONING_CACHE_BYTES = 64 * 1024 * 1024
+
+# Default budgets of the waveform cache tiers, in bytes
+DEFAULT_WAVEFORM_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_WAVEFORM_DISK_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class _VarView:
+    """Expose an MNN Var's buffer to numpy as a read-only array.
+
+    The resulting array keeps a reference to this object (and thus the Var)
+    as its base, so the buffer stays valid for as long as the array is alive.
+    """
+
+    def __init__(self, var):
+        self.var = var
+        interface = dict(var.read().__array_interface__)
+        interface["data"] = (interface["data"][0], True)
+        self.__array_interface__ = interface
+
+
+def as_numpy(value, copy: bool = False) -> np.ndarray:
+    """
+    Read an MNN Var into numpy.
+
+    Args:
+        value: MNN Var, e.g. a module output.
+        copy: Return a writable array that owns its data instead of a
+            read-only view of the Var's buffer.
+    """
+    if value.data_format == MNN.expr.NC4HW4:
+        value = MNN.expr.convert(value, MNN.expr.NCHW)
+    value = np.asarray(_VarView(value))
+    return value.copy() if copy else value
 
 
 class MNNInference:
@@ -17,36 +91,194 @@ class MNNInference:
             runtime_manager=rt,
         )
         self.input_names = input_names
+        self.output_names = output_names
+        # Per-input-shape module clones, see enable_shape_cache()
+        self.shape_modules = None
+        self.max_shape_modules = DEFAULT_SHAPE_MODULES
+
+    def clone(self) -> "MNNInference":
+        """Return an executor that shares this module's weights but runs independently."""
+        other = copy.copy(self)
+        other.model = self.model.clone(True)
+        if self.shape_modules is not None:
+            other.shape_modules = OrderedDict()
+        return other
+
+    def enable_shape_cache(self, max_modules: int = DEFAULT_SHAPE_MODULES):
+        """
+        Keep one weight-sharing module clone per distinct set of input shapes.
+
+        MNN re-plans memory whenever a module sees new input shapes. With
+        bucketed inputs the number of distinct shapes is small, so giving each
+        its own clone lets every bucket keep its planned shapes. Each clone
+        holds its own planned buffers, so beyond max_modules shapes the least
+        recently used clone is dropped.
+        """
+        self.max_shape_modules = max_modules
+        if self.shape_modules is None:
+            self.shape_modules = OrderedDict()
+
+    def _module_for(self, mnn_inputs):
+        if self.shape_modules is None:
+            return self.model
+        key = tuple(tuple(value.shape) for value in mnn_inputs)
+        module = self.shape_modules.get(key)
+        if module is not None:
+            self.shape_modules.move_to_end(key)
+            return module
+        module = self.model.clone(True) if self.shape_modules else self.model
+        self.shape_modules[key] = module
+        while len(self.shape_modules) > self.max_shape_modules:
+            self.shape_modules.popitem(last=False)
+        return module
 
-    def run(self, output_names, input_dict):
-        mnn_inputs = []
+    @staticmethod
+    def _to_var(key, value):
+        # Values that are already MNN Vars (e.g. the output of a previous
+        # forward) are passed through without a round trip to numpy.
+        if not isinstance(value, np.ndarray):
+            return value
+        if key == "text_ids":
+            data_type = MNN.numpy.int32
+            value = value.astype(np.int32, copy=False)
+        else:
+            data_type = MNN.numpy.float32
+
+        mnn_placeholder = MNN.expr.placeholder(value.shape, dtype=data_type)
+        mnn_placeholder.write(value)
+        return mnn_placeholder
+
+    def bind(self, input_dict):
+        """Upload numpy inputs into MNN placeholders once so they can be reused."""
+        return {key: self._to_var(key, value) for key, value in input_dict.items()}
+
+    def forward(self, input_dict):
+        """Run the module and return the raw MNN output Vars."""
         # Enforce correct input ordering based on self.input_names
-        for key in self.input_names:
-            value = input_dict[key]
-            if key == "text_ids":
-                data_type = MNN.numpy.int32
-                value = value.astype(np.int32)
-            else:
-                data_type = MNN.numpy.float32
+        mnn_inputs = [self._to_var(key, input_dict[key]) for key in self.input_names]
+        return self._module_for(mnn_inputs).forward(mnn_inputs)
+
+    def run(self, output_names, input_dict, copy=False):
+        """
+        Run the module and return the requested outputs as numpy arrays.
 
-            mnn_placeholder = MNN.expr.placeholder(value.shape, dtype=data_type)
-            mnn_placeholder.write(value)
-            mnn_inputs.append(mnn_placeholder)
+        Args:
+            output_names: Names of the outputs to return, in order. None returns
+                all outputs the module was loaded with.
+            input_dict: Mapping of input name to numpy array or MNN Var.
+            copy: Return writable arrays that own their data. By default the
+                arrays are read-only views of MNN's output buffers.
 
-        output = self.model.forward(mnn_inputs)
+        Returns:
+            List of numpy arrays, one per requested output.
+        """
+        output = self.forward(input_dict)
         if len(output) <= 0:
             return None
-        if len(output) > 0 and output[0].dtype == MNN.numpy.float32:
-            return [np.array(output[0].read())]
-        output = MNN.expr.convert(output[0], MNN.expr.NCHW)
-        output = output.read()
-        return [np.array(output)]
+        if output_names is None:
+            output_names = self.output_names
+
+        results = []
+        for name in output_names:
+            if name not in self.output_names:
+                raise KeyError(
+                    f"Unknown output '{name}', expected one of {self.output_names}"
+                )
+            results.append(as_numpy(output[self.output_names.index(name)], copy))
+        return results
 
 
 class Style:
     def __init__(self, style_ttl_onnx: np.ndarray, style_dp_onnx: np.ndarray):
         self.ttl = style_ttl_onnx
         self.dp = style_dp_onnx
+        self._key = None
+
+    @property
+    def key(self) -> str:
+        """Content hash identifying this style, e.g. for cache keys."""
+        if self._key is None:
+            digest = hashlib.sha1(self.ttl.tobytes())
+            digest.update(self.dp.tobytes())
+            self._key = digest.hexdigest()
+        return self._key
+
+    def repeat(self, n: int) -> "Style":
+        """Repeat a single style n times along the batch dimension."""
+        if n == self.ttl.shape[0]:
+            return self
+        return Style(np.repeat(self.ttl, n, axis=0), np.repeat(self.dp, n, axis=0))
+
+    @staticmethod
+    def concat(styles: list["Style"]) -> "Style":
+        """Stack several styles into one batch, in order."""
+        if len(styles) == 1:
+            return styles[0]
+        return Style(
+            np.concatenate([style.ttl for style in styles], axis=0),
+            np.concatenate([style.dp for style in styles], axis=0),
+        )
+
+
+class EarlyExit:
+    """
+    Adaptive stopping rule for the diffusion loop, set per request.
+
+    After each step the update applied to the latent is compared with the
+    previous step's update. Once the relative change between them falls
+    below threshold, the trajectory has become straight, so the remaining
+    steps are extrapolated from the last update instead of being run. Each
+    skipped step saves one vector estimator run.
+
+    The number of steps actually run for each chunk (or batch of chunks) is
+    appended to steps_used.
+    """
+
+    def __init__(
+        self, threshold: float = 0.05, min_steps: int = 2, max_steps: Optional[int] = None
+    ):
+        """
+        Args:
+            threshold: Relative change between consecutive latent updates
+                below which the loop stops.
+            min_steps: Minimum number of steps to run (at least 2, to have
+                two updates to compare).
+            max_steps: Maximum number of steps to run; the rest are
+                extrapolated even without convergence. None allows all steps.
+        """
+        self.threshold = threshold
+        self.min_steps = max(min_steps, 2)
+        self.max_steps = max_steps
+        self.steps_used = []
+
+
+class _ChunkReader:
+    """Iterate text chunks one ahead, so the stream knows if another follows.
+
+    Chunks may be consumed in a worker thread (pipelined or prefetched
+    streams) while has_more is called from the consumer's thread.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._next = next(self._chunks, None)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        chunk = self._next
+        if chunk is None:
+            raise StopIteration
+        self.count += 1
+        self._next = next(self._chunks, None)
+        return chunk
+
+    def has_more(self, done: int) -> bool:
+        """Whether there are more than done chunks."""
+        # Check _next first: __next__ counts a chunk before moving past it
+        return self._next is not None or done < self.count
 
 
 class TextToSpeech:
@@ -58,7 +290,16 @@ class TextToSpeech:
         text_enc_ort: MNNInference,
         vector_est_ort: MNNInference,
         vocoder_ort: MNNInference,
+        text_buckets: Optional[Sequence[int]] = None,
+        latent_buckets: Optional[Sequence[int]] = None,
     ):
+        """
+        Args:
+            text_buckets: Sorted text lengths to pad ``text_ids`` up to. None
+                disables text bucketing.
+            latent_buckets: Sorted latent lengths to pad the noisy latent up
+                to. None disables latent bucketing.
+        """
         self.cfgs = cfgs
         self.text_processor = text_processor
         self.dp_ort = dp_ort
@@ -69,25 +310,388 @@ class TextToSpeech:
         self.base_chunk_size = cfgs["ae"]["base_chunk_size"]
         self.chunk_compress_factor = cfgs["ttl"]["chunk_compress_factor"]
         self.ldim = cfgs["ttl"]["latent_dim"]
+        self.text_buckets = None
+        self.latent_buckets = None
+        self.vocoder_window = None
+        self.vocoder_overlap = 0
+        # Per-language (first, largest) chunk sizes for progressive streaming
+        self.stream_chunk_sizes = dict(STREAM_CHUNK_SIZES)
+        # Identifies the loaded models in cache keys, set by load_text_to_speech
+        self.model_version = None
+        self.conditioning_cache = None
+        self.waveform_cache = None
+        # Reused by sample_noisy_latent(reuse_buffer=True)
+        self._noise_buffer = None
+        self.timing_sinks = None
+        # RequestTimings of the last request, set when timing is enabled
+        self.last_timings = None
+        self._timings = None
+        if text_buckets or latent_buckets:
+            self.enable_bucketing(text_buckets, latent_buckets)
+
+    def clone(self) -> "TextToSpeech":
+        """
+        Return an engine whose MNN modules share weights with this one.
+
+        The clone can run concurrently with the original, e.g. in another
+        thread; the text processor and settings are shared.
+        """
+        other = copy.copy(self)
+        other._noise_buffer = None
+        other._timings = None
+        other.last_timings = None
+        other.dp_ort = self.dp_ort.clone()
+        other.text_enc_ort = self.text_enc_ort.clone()
+        other.vector_est_ort = self.vector_est_ort.clone()
+        other.vocoder_ort = self.vocoder_ort.clone()
+        return other
+
+    def enable_bucketing(
+        self,
+        text_buckets: Optional[Sequence[int]] = DEFAULT_TEXT_BUCKETS,
+        latent_buckets: Optional[Sequence[int]] = DEFAULT_LATENT_BUCKETS,
+    ):
+        """
+        Pad inputs up to fixed bucket sizes so MNN can reuse planned shapes.
+
+        Padded positions are excluded through the text and latent masks, and
+        the vocoder output is trimmed back to the real ``wav_lengths``.
+        """
+        self.text_buckets = sorted(text_buckets) if text_buckets else None
+        self.latent_buckets = sorted(latent_buckets) if latent_buckets else None
+        for ort in (self.dp_ort, self.text_enc_ort, self.vector_est_ort, self.vocoder_ort):
+            ort.enable_shape_cache()
+
+    def enable_windowed_vocoding(
+        self,
+        window: Optional[int] = DEFAULT_VOCODER_WINDOW,
+        overlap: int = DEFAULT_VOCODER_OVERLAP,
+    ):
+        """
+        Run the vocoder on overlapping time windows of the latent.
+
+        Peak vocoder memory is bounded by window + 2 * overlap latent frames
+        instead of growing with the chunk, and ``stream`` yields the audio of
+        each window as soon as it is decoded. The output matches a full decode
+        as long as overlap covers the vocoder's receptive field.
+
+        Args:
+            window: Latent frames decoded per window. None disables windowing.
+            overlap: Context frames decoded on each side of a window and
+                trimmed from its audio.
+        """
+        self.vocoder_window = window
+        self.vocoder_overlap = overlap
+
+    def enable_conditioning_cache(self, max_bytes: int = DEFAULT_CONDITIONING_CACHE_BYTES):
+        """
+        Cache the duration predictor and text encoder outputs per chunk.
+
+        Both only depend on the normalized text, language, voice style and
+        model, so repeated chunks skip two of the four model runs; only the
+        noise and the diffusion loop differ between requests. The cache is
+        keyed on those values plus the text bucketing, is shared with clones
+        of this engine, and evicts least recently used entries beyond
+        max_bytes. Only single-chunk conditioning (batch size 1) is cached.
+
+        Args:
+            max_bytes: Memory budget of the cache. None disables caching.
+        """
+        self.conditioning_cache = LRUCache(max_bytes) if max_bytes else None
+
+    def enable_waveform_cache(
+        self,
+        max_bytes: Optional[int] = DEFAULT_WAVEFORM_CACHE_BYTES,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = DEFAULT_WAVEFORM_DISK_BYTES,
+    ):
+        """
+        Cache the results of __call__ by content.
+
+        The key hashes the normalized text chunks, language, voice style,
+        steps, speed, silence duration, model version and seed, plus the
+        batching, bucketing and vocoder window settings, so a repeated
+        request returns the stored waveform without running any model.
+        Requests without a seed share the first waveform synthesized for them.
+
+        Args:
+            max_bytes: Memory budget of the in-process tier. None disables
+                the cache.
+            disk_dir: Directory of the on-disk tier, shared between processes.
+                None keeps the cache in memory only.
+            disk_bytes: Size budget of the on-disk tier.
+        """
+        if max_bytes is None:
+            self.waveform_cache = None
+        else:
+            self.waveform_cache = WaveformCache(max_bytes, disk_dir, disk_bytes)
+
+    def enable_timing(self, sinks: Optional[Sequence] = None):
+        """
+        Time every stage of each request and report it to sinks.
+
+        Each __call__ or stream request produces a RequestTimings (also kept
+        as last_timings) with the time spent in text processing, the duration
+        predictor, the text encoder, every vector estimator step and the
+        vocoder, plus the remaining Python overhead. Sinks are objects with a
+        record(timings) method, such as those in supertonic_mnn.metrics; they
+        are shared with clones of this engine.
+
+        Args:
+            sinks: Sinks to report to. None logs a summary line per request
+                through a LoggingSink. An empty list disables timing.
+        """
+        self.timing_sinks = [LoggingSink()] if sinks is None else list(sinks)
+
+    def _timed(self, stage: str):
+        if self._timings is None:
+            return nullcontext()
+        return self._timings.stage(stage)
+
+    def _start_timing(self) -> Optional[RequestTimings]:
+        self._timings = RequestTimings() if self.timing_sinks else None
+        return self._timings
+
+    def _report_timing(self, timings, audio_duration, chunks, total=None):
+        self._timings = None
+        if timings is None:
+            return
+        timings.finish(audio_duration, chunks, total)
+        self.last_timings = timings
+        for sink in self.timing_sinks:
+            sink.record(timings)
+
+    def _pad_text(
+        self, text_ids: np.ndarray, text_mask: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        text_len = text_ids.shape[1]
+        padded_len = bucket_length(text_len, self.text_buckets)
+        if padded_len == text_len:
+            return text_ids, text_mask
+        text_ids = np.pad(text_ids, ((0, 0), (0, padded_len - text_len)))
+        text_mask = np.pad(text_mask, ((0, 0), (0, 0), (0, padded_len - text_len)))
+        return text_ids, text_mask
 
     def sample_noisy_latent(
-        self, duration: np.ndarray
+        self,
+        duration: np.ndarray,
+        rng: Union[None, int, np.random.Generator] = None,
+        reuse_buffer: bool = False,
     ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Draw the initial noise of the diffusion loop, masked to each item's length.
+
+        Args:
+            duration: Per-item durations in seconds.
+            rng: np.random.Generator (or seed for a new one) to draw float32
+                noise from directly. None uses numpy's global random state.
+            reuse_buffer: Draw into a buffer owned by the engine instead of a
+                new array. The noise is then only valid until the next call,
+                so it must be consumed (uploaded to MNN) before that.
+
+        Returns:
+            (noisy_latent, latent_mask)
+        """
         bsz = len(duration)
         wav_len_max = duration.max() * self.sample_rate
         wav_lengths = (duration * self.sample_rate).astype(np.int64)
         chunk_size = self.base_chunk_size * self.chunk_compress_factor
         latent_len = ((wav_len_max + chunk_size - 1) / chunk_size).astype(np.int32)
+        if self.latent_buckets:
+            latent_len = bucket_length(int(latent_len), self.latent_buckets)
         latent_dim = self.ldim * self.chunk_compress_factor
-        noisy_latent = np.random.randn(bsz, latent_dim, latent_len).astype(np.float32)
+        shape = (bsz, latent_dim, int(latent_len))
+        if reuse_buffer:
+            size = bsz * latent_dim * int(latent_len)
+            if self._noise_buffer is None or self._noise_buffer.size < size:
+                self._noise_buffer = np.empty(size, dtype=np.float32)
+            noisy_latent = self._noise_buffer[:size].reshape(shape)
+        else:
+            noisy_latent = np.empty(shape, dtype=np.float32)
+        if rng is None:
+            noisy_latent[...] = np.random.randn(*shape)
+        else:
+            np.random.default_rng(rng).standard_normal(out=noisy_latent, dtype=np.float32)
         latent_mask = get_latent_mask(
-            wav_lengths, self.base_chunk_size, self.chunk_compress_factor
+            wav_lengths, self.base_chunk_size, self.chunk_compress_factor, latent_len
         )
-        noisy_latent = noisy_latent * latent_mask
+        noisy_latent *= latent_mask
         return noisy_latent, latent_mask
 
+    def _denoise(
+        self,
+        xt: np.ndarray,
+        text_emb: np.ndarray,
+        style: Style,
+        text_mask: np.ndarray,
+        latent_mask: np.ndarray,
+        total_step: int,
+        early_exit: Optional[EarlyExit] = None,
+    ):
+        """
+        Run the diffusion loop with the latent kept inside MNN.
+
+        The conditioning inputs are the same for every step, so they are
+        uploaded once and reused; only the step counter is rewritten, and the
+        latent returned by each step is fed straight into the next one.
+
+        With early_exit, the latent is also read back after every step to
+        check for convergence (see EarlyExit).
+
+        Returns:
+            The final latent as an MNN Var (or a numpy array when the loop
+            exited early), ready to be passed to the vocoder.
+        """
+        bsz = xt.shape[0]
+        inputs = self.vector_est_ort.bind(
+            {
+                "noisy_latent": xt,
+                "text_emb": text_emb,
+                "style_ttl": style.ttl,
+                "text_mask": text_mask,
+                "latent_mask": latent_mask,
+                "total_step": np.full(bsz, total_step, dtype=np.float32),
+            }
+        )
+        current_step = MNN.expr.placeholder([bsz], dtype=MNN.numpy.float32)
+        inputs["current_step"] = current_step
+        timings = self._timings
+        if early_exit is not None:
+            prev_x, prev_delta = np.array(xt), None
+        for step in range(total_step):
+            current_step.write(np.full(bsz, step, dtype=np.float32))
+            step_start = time.perf_counter()
+            inputs["noisy_latent"], *_ = self.vector_est_ort.forward(inputs)
+            if timings is not None:
+                timings.add_step(time.perf_counter() - step_start)
+            if early_exit is None:
+                continue
+
+            steps_run = step + 1
+            remaining = total_step - steps_run
+            x = as_numpy(inputs["noisy_latent"], copy=True)
+            delta = x - prev_x
+            if remaining and steps_run >= early_exit.min_steps:
+                change = np.linalg.norm(delta - prev_delta) / max(np.linalg.norm(delta), 1e-12)
+                at_max = early_exit.max_steps is not None and steps_run >= early_exit.max_steps
+                if change < early_exit.threshold or at_max:
+                    early_exit.steps_used.append(steps_run)
+                    # Masked positions stay zero, as both terms are masked
+                    x += remaining * delta
+                    return x
+            prev_x, prev_delta = x, delta
+
+        if early_exit is not None:
+            early_exit.steps_used.append(total_step)
+        return inputs["noisy_latent"]
+
+    def _condition(
+        self,
+        text_list: list[str],
+        lang_list: list[str],
+        style: Style,
+        speed: Union[float, np.ndarray] = 1.05,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run the text front end, duration predictor and text encoder.
+
+        Returns:
+            (text_emb, text_mask, duration) where duration is already scaled
+            by speed.
+        """
+        cache_key = None
+        normalized = None
+        if self.conditioning_cache is not None and len(text_list) == 1:
+            with self._timed("text_processing"):
+                normalized = self.text_processor._preprocess_text(text_list[0], lang_list[0])
+            cache_key = (
+                normalized,
+                lang_list[0],
+                style.key,
+                self.model_version,
+                tuple(self.text_buckets or ()),
+            )
+            cached = self.conditioning_cache.get(cache_key)
+            if cached is not None:
+                text_emb_onnx, text_mask, dur_onnx = cached
+                return text_emb_onnx, text_mask, dur_onnx / speed
+
+        with self._timed("text_processing"):
+            if normalized is not None:
+                # Already normalized for the cache key
+                text_ids, text_mask = self.text_processor._tokenize([normalized])
+            else:
+                text_ids, text_mask = self.text_processor(text_list, lang_list)
+        if self.text_buckets:
+            text_ids, text_mask = self._pad_text(text_ids, text_mask)
+        with self._timed("duration_predictor"):
+            dur_onnx, *_ = self.dp_ort.run(
+                None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}
+            )
+        with self._timed("text_encoder"):
+            text_emb_onnx, *_ = self.text_enc_ort.run(
+                None,
+                {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
+            )
+        if cache_key is not None:
+            self.conditioning_cache.put(cache_key, (text_emb_onnx, text_mask, dur_onnx))
+        return text_emb_onnx, text_mask, dur_onnx / speed
+
+    def _vocode(self, xt, duration: np.ndarray) -> np.ndarray:
+        if self.vocoder_window:
+            windows = [wav for wav, _ in self._vocode_windows(xt, duration)]
+            return np.concatenate(windows, axis=1)
+        with self._timed("vocoder"):
+            wav, *_ = self.vocoder_ort.run(None, {"latent": xt})
+        if self.latent_buckets:
+            # Drop the audio decoded from the padded latent frames
+            wav_len = int((duration * self.sample_rate).astype(np.int64).max())
+            wav = wav[:, :wav_len]
+        return wav
+
+    def _vocode_windows(self, xt, duration: np.ndarray):
+        """
+        Decode the latent window by window (see enable_windowed_vocoding).
+
+        Each window is decoded together with up to vocoder_overlap frames of
+        context on either side, and the audio decoded from the context is
+        trimmed away.
+
+        Yields:
+            (wav, last) for each window, where wav is (bsz, samples) and last
+            marks the final window.
+        """
+        latent = xt if isinstance(xt, np.ndarray) else as_numpy(xt)
+        latent_len = latent.shape[2]
+        frame_size = self.base_chunk_size * self.chunk_compress_factor
+        window, overlap = self.vocoder_window, self.vocoder_overlap
+        if self.latent_buckets:
+            wav_len = int((duration * self.sample_rate).astype(np.int64).max())
+        else:
+            wav_len = latent_len * frame_size
+
+        # Windows made only of padded frames are skipped
+        starts = [start for start in range(0, latent_len, window) if start * frame_size < wav_len]
+        for start in starts:
+            left = max(0, start - overlap)
+            right = min(latent_len, start + window + overlap)
+            with self._timed("vocoder"):
+                wav, *_ = self.vocoder_ort.run(
+                    None, {"latent": np.ascontiguousarray(latent[:, :, left:right])}
+                )
+            begin = (start - left) * frame_size
+            length = min(window * frame_size, wav_len - start * frame_size)
+            yield wav[:, begin : begin + length], start == starts[-1]
+
     def _infer(
-        self, text_list: list[str], lang_list: list[str], style: Style, total_step: int, speed: float = 1.05
+        self,
+        text_list: list[str],
+        lang_list: list[str],
+        style: Style,
+        total_step: int,
+        speed: Union[float, np.ndarray] = 1.05,
+        rng: Optional[np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
     ) -> tuple[np.ndarray, np.ndarray, float]:
         assert (
             len(text_list) == style.ttl.shape[0]
@@ -97,38 +701,143 @@ class TextToSpeech:
         # Start timing for RTF calculation
         start_time = time.time()
 
-        text_ids, text_mask = self.text_processor(text_list, lang_list)
-        dur_onnx, *_ = self.dp_ort.run(
-            None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}
-        )
-        dur_onnx = dur_onnx / speed
-        text_emb_onnx, *_ = self.text_enc_ort.run(
-            None,
-            {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
+        text_emb_onnx, text_mask, dur_onnx = self._condition(text_list, lang_list, style, speed)
+        xt, latent_mask = self.sample_noisy_latent(dur_onnx, rng, reuse_buffer=True)
+        xt = self._denoise(
+            xt, text_emb_onnx, style, text_mask, latent_mask, total_step, early_exit
         )
-        xt, latent_mask = self.sample_noisy_latent(dur_onnx)
-        total_step_np = np.array([total_step] * bsz, dtype=np.float32)
-        for step in range(total_step):
-            current_step = np.array([step] * bsz, dtype=np.float32)
-            xt, *_ = self.vector_est_ort.run(
-                None,
-                {
-                    "noisy_latent": xt,
-                    "text_emb": text_emb_onnx,
-                    "style_ttl": style.ttl,
-                    "text_mask": text_mask,
-                    "latent_mask": latent_mask,
-                    "current_step": current_step,
-                    "total_step": total_step_np,
-                },
-            )
-        wav, *_ = self.vocoder_ort.run(None, {"latent": xt})
+        wav = self._vocode(xt, dur_onnx)
 
         # Calculate elapsed time for RTF
         elapsed_time = time.time() - start_time
 
         return wav, dur_onnx, elapsed_time
 
+    def _infer_windows(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        rng: Optional[np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
+    ):
+        """
+        Synthesize chunks one at a time, yielding each chunk's audio per vocoder window.
+
+        Yields:
+            (wav, duration, elapsed_time, last) for each window, where last
+            marks the final window of a chunk.
+        """
+        for text in text_list:
+            start_time = time.time()
+            text_emb, text_mask, dur_onnx = self._condition([text], [lang], style, speed)
+            xt, latent_mask = self.sample_noisy_latent(dur_onnx, rng, reuse_buffer=True)
+            xt = self._denoise(
+                xt, text_emb, style, text_mask, latent_mask, total_step, early_exit
+            )
+            for wav, last in self._vocode_windows(xt, dur_onnx):
+                elapsed_time = time.time() - start_time
+                yield wav, wav.shape[1] / self.sample_rate, elapsed_time, last
+                start_time = time.time()
+
+    def _chunk_text(self, text: str, lang: str) -> list[str]:
+        return list(self._iter_chunks(text, lang))
+
+    def _iter_chunks(self, text: Union[str, Iterable[str]], lang: str, progressive: bool = False):
+        if progressive:
+            first_len, max_len = self.stream_chunk_sizes.get(lang, DEFAULT_STREAM_CHUNK_SIZES)
+            return iter_chunks(text, max_len, first_len)
+        max_len = 120 if lang in ("ko", "ja") else 300
+        return iter_chunks(text, max_len)
+
+    def _infer_chunks(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        batch_size: int = 1,
+        pipelined: bool = False,
+        rng: Optional[np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
+    ):
+        """
+        Synthesize chunks in groups of up to batch_size and yield them in order.
+
+        Each group goes through the duration predictor, text encoder,
+        diffusion loop and vocoder as one batch, with the style repeated along
+        the batch dimension. Batched waveforms are trimmed to their own
+        duration, and the group's generation time is split evenly.
+
+        With pipelined=True, chunks are synthesized one at a time with the
+        stages of consecutive chunks overlapped (see pipelined_infer).
+
+        rng, if given, draws the initial noise of every chunk in turn, and
+        early_exit, if given, applies to the diffusion loop of every group.
+
+        Yields:
+            (wav, duration, elapsed_time) for each chunk
+        """
+        if pipelined:
+            if batch_size > 1:
+                raise ValueError("pipelined mode does not support batch_size > 1")
+            yield from pipelined_infer(
+                self, text_list, lang, style, total_step, speed, rng=rng, early_exit=early_exit
+            )
+            return
+
+        if batch_size <= 1:
+            for text in text_list:
+                yield self._infer([text], [lang], style, total_step, speed, rng, early_exit)
+            return
+
+        for start in range(0, len(text_list), batch_size):
+            group = text_list[start : start + batch_size]
+            bsz = len(group)
+            wav, dur_onnx, elapsed_time = self._infer(
+                group, [lang] * bsz, style.repeat(bsz), total_step, speed, rng, early_exit
+            )
+            wav_lengths = (dur_onnx * self.sample_rate).astype(np.int64)
+            for i in range(bsz):
+                yield wav[i : i + 1, : wav_lengths[i]], dur_onnx[i : i + 1], elapsed_time / bsz
+
+    def _waveform_key(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float,
+        silence_duration: float,
+        seed: Optional[int] = None,
+        early_exit: Optional[EarlyExit] = None,
+        **settings,
+    ) -> str:
+        """Waveform cache key of a request; settings are how it is batched."""
+        with self._timed("text_processing"):
+            normalized = [self.text_processor._preprocess_text(t, lang) for t in text_list]
+        return WaveformCache.make_key(
+            text=normalized,
+            lang=lang,
+            voice=style.key,
+            steps=total_step,
+            speed=speed,
+            silence_duration=silence_duration,
+            model_version=self.model_version,
+            seed=seed,
+            early_exit=None
+            if early_exit is None
+            else [early_exit.threshold, early_exit.min_steps, early_exit.max_steps],
+            # Batching, padding and vocoding windows change the audio
+            text_buckets=self.text_buckets,
+            latent_buckets=self.latent_buckets,
+            vocoder_window=[self.vocoder_window, self.vocoder_overlap],
+            **settings,
+        )
+
     def __call__(
         self,
         text: str,
@@ -137,80 +846,347 @@ class TextToSpeech:
         total_step: int,
         speed: float = 1.05,
         silence_duration: float = 0.3,
+        batch_size: int = 1,
+        pipelined: bool = False,
+        seed: Union[None, int, np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
     ) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Synthesize a whole text and return the concatenated waveform.
+
+        Chunks that occur several times in the text are synthesized once and
+        their audio is reused.
+
+        Args:
+            batch_size: Number of chunks to synthesize together in one batched
+                pass. 1 runs chunks one at a time.
+            pipelined: Overlap text conditioning, diffusion and vocoding of
+                consecutive chunks in separate worker threads.
+            seed: Seed (or np.random.Generator) of the initial noise, for
+                reproducible output. None uses numpy's global random state.
+            early_exit: Stop the diffusion loop once it converges; the steps
+                run per chunk are recorded in early_exit.steps_used.
+        """
         assert (
             style.ttl.shape[0] == 1
         ), "Single speaker text to speech only supports single style"
-        max_len = 120 if lang in ("ko", "ja") else 300
-        text_list = chunk_text(text, max_len=max_len)
-        wav_cat = None
+        timings = self._start_timing()
+        text_list = self._chunk_text(text, lang)
+
+        cache_key = None
+        # A Generator's output depends on its state, so it can't be a cache key
+        if self.waveform_cache is not None and not isinstance(seed, np.random.Generator):
+            start_time = time.time()
+            cache_key = self._waveform_key(
+                text_list,
+                lang,
+                style,
+                total_step,
+                speed,
+                silence_duration,
+                seed,
+                early_exit,
+                batch_size=batch_size,
+                pipelined=pipelined,
+            )
+            cached = self.waveform_cache.get(cache_key)
+            if cached is not None:
+                wav_cat, dur_cat = cached
+                elapsed_time = time.time() - start_time
+                audio_duration = wav_cat.shape[1] / self.sample_rate
+                if timings is not None:
+                    timings.cache_hit = True
+                self._report_timing(timings, audio_duration, len(text_list))
+                rtf = elapsed_time / audio_duration if audio_duration > 0 else 0.0
+                # Cached arrays are read-only; callers get writable copies,
+                # as on a miss
+                return wav_cat.copy(), dur_cat.copy(), rtf
+
+        rng = None if seed is None else np.random.default_rng(seed)
+        unique_texts = list(dict.fromkeys(text_list))
+        chunks = self._infer_chunks(
+            unique_texts, lang, style, total_step, speed, batch_size, pipelined, rng, early_exit
+        )
+        results = dict(zip(unique_texts, list(chunks)))
+        wav_list = []
         dur_cat = None
-        total_elapsed_time = 0.0
+        total_elapsed_time = sum(elapsed_time for _, _, elapsed_time in results.values())
 
         for text in text_list:
-            wav, dur_onnx, elapsed_time = self._infer([text], [lang], style, total_step, speed)
-            total_elapsed_time += elapsed_time
+            wav, dur_onnx, _ = results[text]
 
-            if wav_cat is None:
-                wav_cat = wav
-                dur_cat = dur_onnx
+            if not wav_list:
+                dur_cat = dur_onnx.copy()
             else:
                 silence = np.zeros(
                     (1, int(silence_duration * self.sample_rate)), dtype=np.float32
                 )
-                wav_cat = np.concatenate([wav_cat, silence, wav], axis=1)
+                wav_list.append(silence)
                 dur_cat += dur_onnx + silence_duration
+            # The vocoder output is a read-only view of MNN's buffer; it is
+            # copied exactly once, by the concatenation below.
+            wav_list.append(wav)
+
+        wav_cat = np.concatenate(wav_list, axis=1)
 
         # Calculate overall RTF
         total_audio_duration = wav_cat.shape[1] / self.sample_rate
         rtf = total_elapsed_time / total_audio_duration if total_audio_duration > 0 else 0.0
+        self._report_timing(timings, total_audio_duration, len(text_list))
 
-        # Print RTF information
-        print(f"RTF (Real Time Factor): {rtf:.4f}")
-        print(f"Audio Duration: {total_audio_duration:.2f}s")
-        print(f"Generation Time: {total_elapsed_time:.2f}s")
-
+        if cache_key is not None:
+            self.waveform_cache.put(cache_key, (wav_cat, dur_cat))
         return wav_cat, dur_cat, rtf
 
 
     def stream(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         lang: str,
         style: Style,
         total_step: int,
         speed: float = 1.05,
         silence_duration: float = 0.3,
+        pipelined: bool = False,
+        prefetch: int = 0,
+        progressive: bool = False,
+        seed: Union[None, int, np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
     ):
+        """
+        Synthesize a text chunk by chunk, yielding audio as each chunk is ready.
+
+        Args:
+            text: Text, or an open file or iterator of text pieces. The text is
+                read as it is chunked, one paragraph at a time, so synthesis
+                of a long document starts right away.
+            pipelined: Overlap text conditioning, diffusion and vocoding of
+                consecutive chunks in separate worker threads.
+            prefetch: Number of chunks to synthesize ahead of the consumer in
+                a background thread. 0 synthesizes each chunk on demand.
+            progressive: Start with a short first chunk, cut at a sentence or
+                clause boundary, and let later chunks grow to the usual size.
+                Sizes are taken per language from stream_chunk_sizes.
+            seed: Seed (or np.random.Generator) of the initial noise, for
+                reproducible output.
+            early_exit: Stop the diffusion loop of each chunk once it
+                converges (see EarlyExit).
+
+        With windowed vocoding enabled (see enable_windowed_vocoding) and
+        pipelined=False, each chunk's audio is yielded window by window.
+        """
         assert (
             style.ttl.shape[0] == 1
         ), "Single speaker text to speech only supports single style"
-        max_len = 120 if lang in ("ko", "ja") else 300
-        text_list = chunk_text(text, max_len=max_len)
+        text_list = _ChunkReader(self._iter_chunks(text, lang, progressive))
 
-        for i, text_chunk in enumerate(text_list):
-            wav, dur_onnx, elapsed_time = self._infer([text_chunk], [lang], style, total_step, speed)
+        rng = None if seed is None else np.random.default_rng(seed)
+        if self.vocoder_window and not pipelined:
+            chunks = self._infer_windows(
+                text_list, lang, style, total_step, speed, rng, early_exit
+            )
+        else:
+            chunks = self._infer_chunks(
+                text_list,
+                lang,
+                style,
+                total_step,
+                speed,
+                pipelined=pipelined,
+                rng=rng,
+                early_exit=early_exit,
+            )
+        if prefetch > 0:
+            chunks = lookahead(chunks, prefetch)
+        timings = self._start_timing()
+        try:
+            chunks_done = 0
+            total_elapsed_time = 0.0
+            total_samples = 0
+            for item in chunks:
+                # Yield the generated audio chunk (or window of it)
+                wav, dur_onnx, elapsed_time = item[:3]
+                total_elapsed_time += elapsed_time
+                total_samples += wav.shape[1]
+                yield wav, dur_onnx, elapsed_time
+                if len(item) == 4 and not item[3]:
+                    continue  # More windows of this chunk follow
 
-            # Yield the generated audio chunk
-            yield wav, dur_onnx, elapsed_time
+                # Yield silence if it's not the last chunk
+                chunks_done += 1
+                if text_list.has_more(chunks_done):
+                    silence = np.zeros(
+                        (1, int(silence_duration * self.sample_rate)), dtype=np.float32
+                    )
+                    total_samples += silence.shape[1]
+                    yield silence, silence_duration, 0.0
 
-            # Yield silence if it's not the last chunk
-            if i < len(text_list) - 1:
-                silence = np.zeros(
-                    (1, int(silence_duration * self.sample_rate)), dtype=np.float32
+            # Time spent by the consumer between chunks is not counted
+            self._report_timing(
+                timings, total_samples / self.sample_rate, chunks_done, total_elapsed_time
+            )
+        finally:
+            self._timings = None
+            # Stop any background workers when the consumer stops early
+            chunks.close()
+
+    def stream_incremental(
+        self,
+        pieces,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        silence_duration: float = 0.3,
+        flush_timeout: Optional[float] = DEFAULT_FLUSH_TIMEOUT,
+        seed: Union[None, int, np.random.Generator] = None,
+        early_exit: Optional[EarlyExit] = None,
+    ):
+        """
+        Synthesize text that arrives in pieces, e.g. tokens from an LLM.
+
+        Pieces are buffered and cut into chunks at sentence ends (see
+        IncrementalChunker, with the sizes of stream_chunk_sizes). Each chunk
+        is synthesized as soon as it is complete while more pieces keep
+        arriving, so speech starts before the text is finished.
+
+        Args:
+            pieces: Iterator or async iterator of text pieces. Iterators are
+                read in a background thread.
+            flush_timeout: Seconds pending text may wait for a sentence or
+                clause boundary before it is synthesized as it is. None waits
+                for a boundary or the end of the text.
+            seed: Seed (or np.random.Generator) of the initial noise, for
+                reproducible output.
+            early_exit: Stop the diffusion loop of each chunk once it
+                converges (see EarlyExit).
+
+        Returns:
+            Generator of (wav, duration, elapsed_time) like stream(), with
+            silence between chunks. For an async iterator, an async generator
+            that runs synthesis in the event loop's default executor.
+        """
+        assert (
+            style.ttl.shape[0] == 1
+        ), "Single speaker text to speech only supports single style"
+        args = (lang, style, total_step, speed, silence_duration, flush_timeout, seed, early_exit)
+        if hasattr(pieces, "__aiter__"):
+            return self._astream_incremental(pieces, *args)
+        return self._stream_incremental(pieces, *args)
+
+    def _stream_incremental(self, pieces, *args):
+        inbox = queue.Queue()
+        stop = threading.Event()
+        read_pieces(pieces, inbox, stop)
+        chunks = self._synthesize_incremental(inbox, stop, *args)
+        try:
+            yield from chunks
+        finally:
+            stop.set()
+            chunks.close()
+
+    async def _astream_incremental(self, pieces, *args):
+        inbox = queue.Queue()
+        stop = threading.Event()
+        reader = asyncio.ensure_future(aread_pieces(pieces, inbox))
+        chunks = self._synthesize_incremental(inbox, stop, *args)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                item = await loop.run_in_executor(None, next, chunks, None)
+                if item is None:
+                    return
+                yield item
+        finally:
+            # Ends the synthesis thread once its current chunk is done
+            stop.set()
+            reader.cancel()
+            try:
+                chunks.close()
+            except ValueError:
+                pass  # Still running in the executor; stop ends it
+
+    def _synthesize_incremental(
+        self,
+        inbox,
+        stop,
+        lang,
+        style,
+        total_step,
+        speed,
+        silence_duration,
+        flush_timeout,
+        seed,
+        early_exit,
+    ):
+        first_len, max_len = self.stream_chunk_sizes.get(lang, DEFAULT_STREAM_CHUNK_SIZES)
+        chunker = IncrementalChunker(first_len, max_len)
+        rng = None if seed is None else np.random.default_rng(seed)
+        timings = self._start_timing()
+        texts = incremental_chunks(inbox, stop, chunker, flush_timeout)
+        try:
+            chunks_done = 0
+            total_elapsed_time = 0.0
+            total_samples = 0
+            for text in texts:
+                # Another chunk follows, so the previous one gets its silence
+                if chunks_done:
+                    silence = np.zeros(
+                        (1, int(silence_duration * self.sample_rate)), dtype=np.float32
+                    )
+                    total_samples += silence.shape[1]
+                    yield silence, silence_duration, 0.0
+                wav, dur_onnx, elapsed_time = self._infer(
+                    [text], [lang], style, total_step, speed, rng, early_exit
                 )
-                yield silence, silence_duration, 0.0
+                total_elapsed_time += elapsed_time
+                total_samples += wav.shape[1]
+                chunks_done += 1
+                yield wav, dur_onnx, elapsed_time
+
+            self._report_timing(
+                timings, total_samples / self.sample_rate, chunks_done, total_elapsed_time
+            )
+        finally:
+            self._timings = None
+            texts.close()
 
 
 def get_latent_mask(
-    wav_lengths: np.ndarray, base_chunk_size: int, chunk_compress_factor: int
+    wav_lengths: np.ndarray,
+    base_chunk_size: int,
+    chunk_compress_factor: int,
+    max_len: Optional[int] = None,
 ) -> np.ndarray:
     latent_size = base_chunk_size * chunk_compress_factor
     latent_lengths = (wav_lengths + latent_size - 1) // latent_size
-    latent_mask = length_to_mask(latent_lengths)
+    latent_mask = length_to_mask(latent_lengths, max_len)
     return latent_mask
 
 
+def bucket_length(length: int, buckets: Optional[Sequence[int]]) -> int:
+    """
+    Round a length up to the smallest bucket that fits it.
+
+    Lengths beyond the largest bucket are rounded up to a multiple of it, so
+    very long inputs still land on a small set of shapes.
+
+    Args:
+        length: Actual length.
+        buckets: Sorted bucket sizes. None or empty returns length unchanged.
+
+    Returns:
+        Padded length (>= length)
+    """
+    if not buckets:
+        return length
+    for size in buckets:
+        if length <= size:
+            return size
+    largest = buckets[-1]
+    return -(-length // largest) * largest
+
+
 def load_mnn(model_path, input_names, output_names, config):
     return MNNInference(model_path, input_names, output_names, config)
 
@@ -0,0 +1,212 @@
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+# Stages timed by TextToSpeech, in pipeline order
+STAGES = (
+    "text_processing",
+    "duration_predictor",
+    "text_encoder",
+    "vector_estimator",
+    "vocoder",
+)
+
+# Upper bounds (seconds) of the histogram buckets
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+logger = logging.getLogger("supertonic_mnn")
+
+
+class RequestTimings:
+    """
+    Per-stage timing of one synthesis request.
+
+    stages holds the seconds spent in each of STAGES (summed over chunks),
+    and steps the duration of every vector estimator run in order, so
+    stages["vector_estimator"] == sum(steps). Time not spent in any stage,
+    e.g. noise sampling, padding and numpy copies, is reported as overhead.
+    """
+
+    def __init__(self):
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.steps = []
+        self.chunks = 0
+        self.audio_duration = 0.0
+        self.total = 0.0
+        self.cache_hit = False
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the time spent in a with block to a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def add_step(self, seconds: float):
+        """Record one vector estimator run."""
+        self.steps.append(seconds)
+        self.stages["vector_estimator"] += seconds
+
+    def finish(self, audio_duration: float, chunks: int = 0, total: Optional[float] = None):
+        """Stop the request's wall clock, or set the total time if given."""
+        self.total = time.perf_counter() - self._start if total is None else total
+        self.audio_duration = audio_duration
+        self.chunks = chunks
+
+    @property
+    def overhead(self) -> float:
+        """Wall time outside every stage (0 when stages overlap, e.g. pipelined)."""
+        return max(0.0, self.total - sum(self.stages.values()))
+
+    @property
+    def rtf(self) -> float:
+        """Real time factor: generation time over audio duration."""
+        return self.total / self.audio_duration if self.audio_duration > 0 else 0.0
+
+    def samples(self):
+        """(metric, seconds) pairs to feed into histograms."""
+        for name, seconds in self.stages.items():
+            yield name, seconds
+        for seconds in self.steps:
+            yield "vector_estimator_step", seconds
+        yield "overhead", self.overhead
+        yield "total", self.total
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": dict(self.stages),
+            "steps": list(self.steps),
+            "overhead": self.overhead,
+            "total": self.total,
+            "audio_duration": self.audio_duration,
+            "rtf": self.rtf,
+            "chunks": self.chunks,
+            "cache_hit": self.cache_hit,
+        }
+
+
+class LoggingSink:
+    """Log a one-line summary of every request."""
+
+    def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.log = log or logger
+        self.level = level
+
+    def record(self, timings: RequestTimings):
+        stages = " ".join(
+            f"{name}={seconds * 1000:.1f}ms"
+            for name, seconds in (*timings.stages.items(), ("overhead", timings.overhead))
+        )
+        self.log.log(
+            self.level,
+            "RTF %.4f, audio %.2fs, generation %.2fs (%s)",
+            timings.rtf,
+            timings.audio_duration,
+            timings.total,
+            stages,
+        )
+
+
+class HistogramSink:
+    """
+    In-memory histograms of stage times across requests.
+
+    Besides bucket counts, the most recent max_samples values of each metric
+    are kept for percentiles.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, max_samples: int = 10000):
+        self.buckets = tuple(sorted(buckets))
+        self.max_samples = max_samples
+        self.requests = 0
+        self.audio_seconds = 0.0
+        self._counts = {}
+        self._sums = {}
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings: RequestTimings):
+        with self._lock:
+            self.requests += 1
+            self.audio_seconds += timings.audio_duration
+            for name, seconds in timings.samples():
+                self._observe(name, seconds)
+
+    def _observe(self, name: str, value: float):
+        if name not in self._counts:
+            self._counts[name] = [0] * (len(self.buckets) + 1)
+            self._sums[name] = 0.0
+            self._samples[name] = deque(maxlen=self.max_samples)
+        self._counts[name][bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[name] += value
+        self._samples[name].append(value)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """The q-th percentile (0-100) of a metric's recent values, or None."""
+        with self._lock:
+            values = sorted(self._samples.get(name, ()))
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+        return values[index]
+
+    def summary(self) -> dict:
+        """Count, sum, p50 and p95 of every metric."""
+        with self._lock:
+            names = list(self._counts)
+            totals = {name: (sum(self._counts[name]), self._sums[name]) for name in names}
+        return {
+            name: {
+                "count": count,
+                "sum": total,
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+            }
+            for name, (count, total) in totals.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.audio_seconds = 0.0
+            self._counts.clear()
+            self._sums.clear()
+            self._samples.clear()
+
+
+class PrometheusSink(HistogramSink):
+    """Histograms rendered in the Prometheus text exposition format."""
+
+    def render(self, prefix: str = "supertonic") -> str:
+        """Return the metrics as text, e.g. to serve from a /metrics endpoint."""
+        name = f"{prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each synthesis stage.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, counts in self._counts.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+            lines += [
+                f"# HELP {prefix}_requests_total Synthesis requests.",
+                f"# TYPE {prefix}_requests_total counter",
+                f"{prefix}_requests_total {self.requests}",
+                f"# HELP {prefix}_audio_seconds_total Audio synthesized.",
+                f"# TYPE {prefix}_audio_seconds_total counter",
+                f"{prefix}_audio_seconds_total {self.audio_seconds}",
+            ]
+        return "\n".join(lines) + "\n"
@@ -1,13 +1,39 @@
 import os
 import json
+import platform
+import subprocess
+import sys
 import time
+from typing import Optional
 from huggingface_hub import hf_hub_download
 from .engine import TextToSpeech, load_mnn
+from .pool import EnginePool
 from .text import UnicodeProcessor
 
 DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/supertonic-mnn")
 REPO_ID = "yunfengwang/supertonic-tts-mnn"
 
+MODULE_NAMES = ["duration_predictor", "text_encoder", "vector_estimator", "vocoder"]
+
+# Input and output names of each module
+MODULE_IO = {
+    "duration_predictor": (["text_ids", "style_dp", "text_mask"], ["duration"]),
+    "text_encoder": (["text_ids", "style_ttl", "text_mask"], ["text_emb"]),
+    "vector_estimator": (
+        [
+            "noisy_latent",
+            "text_emb",
+            "style_ttl",
+            "latent_mask",
+            "text_mask",
+            "current_step",
+            "total_step",
+        ],
+        ["denoised_latent"],
+    ),
+    "vocoder": (["latent"], ["wav_tts"]),
+}
+
 VOICE_STYLES_ALL = ["M1", "M2", "M3", "M4", "M5", "F1", "F2", "F3", "F4", "F5"]
 
 
@@ -120,10 +146,8 @@ def ensure_models(target_dir: str = DEFAULT_CACHE_DIR, precision: str = "fp16",
                 pass  # Some styles may not exist for all versions
 
 
-def load_text_to_speech(
-    model_dir: str = DEFAULT_CACHE_DIR, precision: str = "fp16", use_gpu: bool = False, version: str = "v3"
-) -> TextToSpeech:
-    # Load MNN settings from config.json
+def load_mnn_config(model_dir: str = DEFAULT_CACHE_DIR) -> dict:
+    """Read the MNN runtime settings (backend, threads, precision, memory) from config.json."""
     mnn_cfg_path = os.path.join(model_dir, "config.json")
     mnn_cfg = dict()
     mnn_backend_mapping = {
@@ -142,53 +166,194 @@ def load_text_to_speech(
         mnn_cfg["thread_num"] = data['mnn_cfg_thread_num']
         mnn_cfg["precision"] = data['mnn_cfg_precision']
         mnn_cfg["memory"] = data['mnn_cfg_memory']
+    return mnn_cfg
+
+
+def _cpu_model() -> str:
+    # platform.processor() is empty on most Linux systems, so read the
+    # brand string the OS reports.
+    try:
+        if sys.platform == "darwin":
+            return subprocess.run(
+                ["sysctl", "-n", "machdep.cpu.brand_string"],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() == "model name":
+                    return value.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return platform.processor()
+
+
+def host_fingerprint() -> dict:
+    """Describe the CPU a tuned profile was measured on."""
+    return {
+        "machine": platform.machine(),
+        "processor": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def tuned_profile_path(
+    model_dir: str = DEFAULT_CACHE_DIR, precision: str = "fp16", version: str = "v3"
+) -> str:
+    """Path of the profile written by `supertonic-mnn autotune`."""
+    version_dir = os.path.join(model_dir, version) if version in ("v2", "v3") else model_dir
+    return os.path.join(version_dir, "mnn_models", f"autotune_{precision}.json")
+
+
+def load_tuned_profile(
+    model_dir: str = DEFAULT_CACHE_DIR, precision: str = "fp16", version: str = "v3"
+) -> Optional[dict]:
+    """
+    Read the module_configs tuned for this machine, if any.
+
+    Returns:
+        The tuned module_configs, or None if there is no profile or it was
+        measured on a different CPU.
+    """
+    path = tuned_profile_path(model_dir, precision, version)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        profile = json.load(f)
+    if profile.get("host") != host_fingerprint():
+        return None
+    return profile["module_configs"]
+
+
+def load_text_to_speech(
+    model_dir: str = DEFAULT_CACHE_DIR,
+    precision: str = "fp16",
+    use_gpu: bool = False,
+    version: str = "v3",
+    bucketing: bool = False,
+    module_configs: Optional[dict] = None,
+    tuned: bool = True,
+    tuned_model_files: bool = False,
+    mnn_cfg: Optional[dict] = None,
+) -> TextToSpeech:
+    """
+    Load the four MNN modules and the text processor into a TextToSpeech engine.
+
+    Args:
+        model_dir: Directory containing config.json and the versioned models.
+        precision: Model precision ('fp16', 'fp32', 'int8').
+        use_gpu: Unused, kept for compatibility.
+        version: Model version ('v1', 'v2', 'v3').
+        bucketing: Enable shape-bucketed execution.
+        module_configs: Per-module overrides of the MNN runtime settings from
+            config.json, keyed by module name ('duration_predictor',
+            'text_encoder', 'vector_estimator', 'vocoder'), e.g.
+            {"vector_estimator": {"thread_num": 8}}. A "model_precision"
+            entry loads that module from another precision's model file.
+        tuned: Apply the profile written by `supertonic-mnn autotune` for
+            this machine, precision and version, if there is one. Entries in
+            module_configs take precedence over it.
+        tuned_model_files: Also load modules from the model file precisions
+            the profile chose. Off by default, so every module is loaded from
+            the files of the requested precision.
+        mnn_cfg: MNN runtime settings to start from instead of the ones in
+            model_dir's config.json.
+    """
+    mnn_cfg = dict(mnn_cfg) if mnn_cfg is not None else load_mnn_config(model_dir)
 
     # Versioned model directory
     version_dir = os.path.join(model_dir, version) if version in ("v2", "v3") else model_dir
     models_dir = os.path.join(version_dir, "mnn_models")
-    precision_dir = os.path.join(models_dir, precision)
 
     # Load Config
     cfg_path = os.path.join(models_dir, "tts.json")
     with open(cfg_path, "r") as f:
         cfgs = json.load(f)
 
-    # Load Models from precision directory
-    dp_path = os.path.join(precision_dir, "duration_predictor.mnn")
-    text_enc_path = os.path.join(precision_dir, "text_encoder.mnn")
-    vector_est_path = os.path.join(precision_dir, "vector_estimator.mnn")
-    vocoder_path = os.path.join(precision_dir, "vocoder.mnn")
-
-    # Define input/output names
-    dp_ort = load_mnn(dp_path, ["text_ids", "style_dp", "text_mask"], ["duration"], mnn_cfg)
-    text_enc_ort = load_mnn(
-        text_enc_path, ["text_ids", "style_ttl", "text_mask"], ["text_emb"], mnn_cfg
-    )
-
-    vector_est_ort = load_mnn(
-        vector_est_path,
-        [
-            "noisy_latent",
-            "text_emb",
-            "style_ttl",
-            "latent_mask",
-            "text_mask",
-            "current_step",
-            "total_step",
-        ],
-        ["denoised_latent"],
-        mnn_cfg,
-    )
-
-    vocoder_ort = load_mnn(vocoder_path, ["latent"], ["wav_tts"], mnn_cfg)
+    module_configs = module_configs or {}
+    tuned_configs = (tuned and load_tuned_profile(model_dir, precision, version)) or {}
+    if not tuned_model_files:
+        tuned_configs = {
+            name: {key: value for key, value in cfg.items() if key != "model_precision"}
+            for name, cfg in tuned_configs.items()
+        }
+
+    # Load Models from precision directory, unless a module is configured
+    # to use another precision's file
+    module_precisions = {}
+
+    def load_module(name):
+        cfg = {**mnn_cfg, **tuned_configs.get(name, {}), **module_configs.get(name, {})}
+        module_precisions[name] = cfg.pop("model_precision", precision)
+        path = os.path.join(models_dir, module_precisions[name], f"{name}.mnn")
+        input_names, output_names = MODULE_IO[name]
+        return load_mnn(path, input_names, output_names, cfg)
+
+    dp_ort = load_module("duration_predictor")
+    text_enc_ort = load_module("text_encoder")
+    vector_est_ort = load_module("vector_estimator")
+    vocoder_ort = load_module("vocoder")
 
     # Load Text Processor
     unicode_indexer_path = os.path.join(models_dir, "unicode_indexer.json")
     text_processor = UnicodeProcessor(unicode_indexer_path)
 
-    return TextToSpeech(
+    tts = TextToSpeech(
         cfgs, text_processor, dp_ort, text_enc_ort, vector_est_ort, vocoder_ort
     )
+    if set(module_precisions.values()) == {precision}:
+        tts.model_version = f"{version}/{precision}"
+    else:
+        tts.model_version = f"{version}/" + ",".join(
+            f"{name}:{module_precisions[name]}" for name in MODULE_NAMES
+        )
+    if bucketing:
+        tts.enable_bucketing()
+    return tts
+
+
+def load_engine_pool(
+    model_dir: str = DEFAULT_CACHE_DIR,
+    precision: str = "fp16",
+    version: str = "v3",
+    size: int = 2,
+    thread_num: Optional[int] = None,
+    **kwargs,
+) -> EnginePool:
+    """
+    Load every model once and build a pool of engines that share the weights.
+
+    Args:
+        model_dir: Directory containing config.json and the versioned models.
+        precision: Model precision ('fp16', 'fp32', 'int8').
+        version: Model version ('v1', 'v2', 'v3').
+        size: Number of engines in the pool.
+        thread_num: Total MNN threads of each module, split across the
+            engines.
+        **kwargs: Passed on to load_text_to_speech.
+
+    Each engine runs a module on 1/size of its thread budget, so the pool
+    as a whole uses what one engine would. The budget is thread_num if
+    given, else the tuned profile's thread count (unless tuned=False), else
+    the one in config.json. Thread counts in module_configs apply as given.
+    """
+    module_configs = kwargs.pop("module_configs", None) or {}
+    mnn_cfg = kwargs.get("mnn_cfg") or load_mnn_config(model_dir)
+    tuned = kwargs.get("tuned", True)
+    tuned_configs = (tuned and load_tuned_profile(model_dir, precision, version)) or {}
+
+    def engine_threads(name):
+        budget = thread_num or tuned_configs.get(name, {}).get("thread_num", mnn_cfg["thread_num"])
+        return max(1, budget // size)
+
+    module_configs = {
+        name: {"thread_num": engine_threads(name), **module_configs.get(name, {})}
+        for name in MODULE_NAMES
+    }
+    tts = load_text_to_speech(
+        model_dir, precision, version=version, module_configs=module_configs, **kwargs
+    )
+    return EnginePool(tts, size)
 
 
 def get_voice_style_path(voice_name: str, model_dir: str = DEFAULT_CACHE_DIR, version: str = "v3") -> str:
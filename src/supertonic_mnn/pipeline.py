@@ -0,0 +1,256 @@
+import queue
+import threading
+import time
+from typing import Optional
+
+# Sentinel marking the end of a stage's output
+_DONE = object()
+
+# Returned by _get when its deadline passes
+_TIMEOUT = object()
+
+# How often blocked workers re-check the stop flag, in seconds
+_POLL_INTERVAL = 0.1
+
+
+class _Failure:
+    """Carries an exception raised in a worker thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up once stop is set."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event, deadline: Optional[float] = None):
+    """
+    Get from a queue, returning _DONE once stop is set, or _TIMEOUT once the
+    time.monotonic() deadline, if any, has passed.
+    """
+    while not stop.is_set():
+        timeout = _POLL_INTERVAL
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return _TIMEOUT
+        try:
+            return q.get(timeout=timeout)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def _start_stage(target, inbox, outbox, stop):
+    """
+    Run target(item) for every item from inbox and forward results to outbox.
+
+    A None inbox makes target a callable returning an iterator that produces
+    the stage's items; the iterator is closed when the stage ends. Failures
+    are forwarded downstream and end the stage.
+    """
+
+    def run():
+        try:
+            if inbox is None:
+                results = target()
+                try:
+                    for result in results:
+                        if not _put(outbox, result, stop):
+                            return
+                finally:
+                    close = getattr(results, "close", None)
+                    if close is not None:
+                        close()
+            else:
+                while True:
+                    item = _get(inbox, stop)
+                    if item is _DONE or isinstance(item, _Failure):
+                        _put(outbox, item, stop)
+                        return
+                    if not _put(outbox, target(item), stop):
+                        return
+        except BaseException as e:
+            _put(outbox, _Failure(e), stop)
+            return
+        _put(outbox, _DONE, stop)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _drain(outbox: queue.Queue, stop: threading.Event, threads: list):
+    """Yield outputs until the last stage is done, then shut the workers down."""
+    try:
+        while True:
+            item = _get(outbox, stop)
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Also reached when the consumer closes the generator early
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def lookahead(iterable, depth: int):
+    """
+    Consume an iterable in a background thread, up to depth items ahead.
+
+    Items are buffered in a bounded queue so the producer keeps working while
+    the consumer handles earlier items. Exceptions raised by the producer are
+    re-raised to the consumer, and the producer stops (and its iterator is
+    closed) when the consumer closes this generator early.
+
+    Args:
+        iterable: Source of items, e.g. a synthesis generator.
+        depth: Maximum number of items produced ahead of the consumer.
+
+    Yields:
+        The items of iterable, in order.
+    """
+    stop = threading.Event()
+    outbox = queue.Queue(maxsize=max(depth, 1))
+    thread = _start_stage(lambda: iter(iterable), None, outbox, stop)
+    yield from _drain(outbox, stop, [thread])
+
+
+def pipelined_infer(
+    tts, text_list, lang, style, total_step, speed=1.05, depth=1, rng=None, early_exit=None
+):
+    """
+    Synthesize chunks with text conditioning, diffusion and vocoding overlapped.
+
+    Each stage runs in its own worker thread: while chunk N is in the
+    diffusion loop, chunk N+1 goes through the text front end, duration
+    predictor and text encoder, and chunk N-1 is being vocoded. Stages use
+    separate MNN modules, so each one runs with its own thread budget (see
+    ``module_configs`` in ``load_text_to_speech``). Chunks come out in order.
+
+    Args:
+        tts: TextToSpeech engine.
+        text_list: Text chunks to synthesize.
+        lang: Language code.
+        style: Single-speaker Style.
+        total_step: Number of diffusion steps.
+        speed: Speech speed.
+        depth: Maximum number of finished items buffered between stages.
+        rng: Optional np.random.Generator for the initial noise.
+        early_exit: Optional EarlyExit rule for the diffusion loop.
+
+    Yields:
+        (wav, duration, elapsed_time) for each chunk, in order. elapsed_time is
+        how long the consumer waited for the chunk.
+    """
+    stop = threading.Event()
+    conditioned = queue.Queue(maxsize=depth)
+    denoised = queue.Queue(maxsize=depth)
+    outbox = queue.Queue(maxsize=depth)
+
+    def condition():
+        for text in text_list:
+            text_emb, text_mask, dur_onnx = tts._condition([text], [lang], style, speed)
+            xt, latent_mask = tts.sample_noisy_latent(dur_onnx, rng)
+            yield xt, text_emb, text_mask, latent_mask, dur_onnx
+
+    def denoise(item):
+        xt, text_emb, text_mask, latent_mask, dur_onnx = item
+        xt = tts._denoise(xt, text_emb, style, text_mask, latent_mask, total_step, early_exit)
+        return xt, dur_onnx
+
+    def vocode(item):
+        xt, dur_onnx = item
+        return tts._vocode(xt, dur_onnx), dur_onnx
+
+    threads = [
+        _start_stage(condition, None, conditioned, stop),
+        _start_stage(denoise, conditioned, denoised, stop),
+        _start_stage(vocode, denoised, outbox, stop),
+    ]
+    wait_start = time.time()
+    for wav, dur_onnx in _drain(outbox, stop, threads):
+        yield wav, dur_onnx, time.time() - wait_start
+        wait_start = time.time()
+
+
+def read_pieces(pieces, inbox: queue.Queue, stop: threading.Event) -> threading.Thread:
+    """
+    Read an iterator in a background thread, queueing its items on inbox.
+
+    The items are followed by _DONE, or by the exception the iterator raised.
+    Reading stops once stop is set.
+    """
+    return _start_stage(lambda: iter(pieces), None, inbox, stop)
+
+
+async def aread_pieces(pieces, inbox: queue.Queue):
+    """Queue the items of an async iterator on inbox, like read_pieces."""
+    try:
+        async for piece in pieces:
+            inbox.put(piece)
+    except Exception as e:
+        inbox.put(_Failure(e))
+        return
+    inbox.put(_DONE)
+
+
+def incremental_chunks(
+    inbox: queue.Queue, stop: threading.Event, chunker, flush_timeout: Optional[float] = None
+):
+    """
+    Cut text pieces arriving on inbox into chunks as soon as they are complete.
+
+    Every piece queued so far is fed to the chunker before the next chunk is
+    yielded, so text that arrives while the consumer is busy with a chunk is
+    cut into fewer, longer chunks. Text that stays pending for flush_timeout
+    seconds is flushed without waiting for a boundary.
+
+    Args:
+        inbox: Queue of text pieces, filled by read_pieces or aread_pieces.
+        stop: Event that ends the generator early.
+        chunker: IncrementalChunker that decides where to cut.
+        flush_timeout: Seconds pending text may wait for a boundary. None
+            waits until the end of the text.
+
+    Yields:
+        Text chunks, in order.
+    """
+    deadline = None
+    done = False
+    while not done:
+        item = _get(inbox, stop, deadline)
+        if stop.is_set():
+            return
+        chunks = []
+        if item is _TIMEOUT:
+            chunks = chunker.flush()
+        while item is not _TIMEOUT:
+            if item is _DONE:
+                chunks += chunker.flush()
+                done = True
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            chunks += chunker.feed(item)
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+
+        if not chunker.pending or flush_timeout is None:
+            deadline = None
+        elif chunks or deadline is None:
+            deadline = time.monotonic() + flush_timeout
+        yield from chunks
@@ -0,0 +1,59 @@
+import queue
+from contextlib import contextmanager
+from typing import Optional
+
+
+class EnginePool:
+    """
+    A thread-safe pool of TextToSpeech engines that share model weights.
+
+    The first engine is the one passed in; the others are clones of it, so
+    each .mnn file is loaded only once. Engines are handed out with
+    checkout()/checkin(), and an engine is used by one thread at a time.
+
+    Usage:
+        pool = load_engine_pool(size=4)
+        with pool.engine() as tts:
+            wav, duration, rtf = tts(text, "en", style, total_step=5)
+    """
+
+    def __init__(self, tts, size: int = 2):
+        """
+        Args:
+            tts: Loaded TextToSpeech engine to share weights with.
+            size: Number of engines in the pool.
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.size = size
+        self.sample_rate = tts.sample_rate
+        # Every engine of the pool, checked out or not, e.g. to change settings
+        self.engines = [tts] + [tts.clone() for _ in range(size - 1)]
+        self._engines = queue.Queue()
+        for engine in self.engines:
+            self._engines.put(engine)
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Take an engine out of the pool, waiting until one is free.
+
+        Raises:
+            TimeoutError: If no engine became free within timeout seconds.
+        """
+        try:
+            return self._engines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free engine within {timeout}s") from None
+
+    def checkin(self, tts):
+        """Return an engine taken with checkout() to the pool."""
+        self._engines.put(tts)
+
+    @contextmanager
+    def engine(self, timeout: Optional[float] = None):
+        """Check out an engine for the duration of a with block."""
+        tts = self.checkout(timeout)
+        try:
+            yield tts
+        finally:
+            self.checkin(tts)
@@ -0,0 +1,457 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+
+from .model import (
+    DEFAULT_CACHE_DIR,
+    MODULE_NAMES,
+    VOICE_STYLES_ALL,
+    load_mnn_config,
+    load_text_to_speech,
+)
+from .shm import AudioRingBuffer
+from .wrapper import SupertonicTTS
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class _Worker:
+    def __init__(self, worker_id, process, inbox, ring):
+        self.worker_id = worker_id
+        self.process = process
+        self.inbox = inbox
+        self.ring = ring
+        # request_id -> Future, or _Stream for streaming requests
+        self.inflight = {}
+
+
+class _Stream:
+    """Chunks of one streaming request, handed from the reader thread to the consumer."""
+
+    def __init__(self):
+        self.items = queue.Queue()
+        self.cancelled = False
+
+
+class PreforkServer:
+    """
+    Multi-process synthesis with models shared copy-on-write.
+
+    The parent process loads the engine and the voice styles once through
+    SupertonicTTS, then forks worker processes that inherit them, so each
+    worker only adds its own activation memory instead of a full copy of the
+    four models. A supervisor thread restarts workers that crash, and
+    gracefully replaces workers whose resident memory grows past max_rss_mb.
+
+    Audio comes back through a shared-memory ring buffer per worker (see
+    AudioRingBuffer): the worker writes the samples once and only their
+    location is sent through the result queue, so waveforms are never
+    pickled. synthesize_stream() yields chunks straight from that buffer.
+    A worker whose buffer stays full for write_timeout seconds, because a
+    stream consumer stopped reading, abandons that request with an error.
+
+    Requires the 'fork' start method (Linux/macOS). The parent should not run
+    inference itself, so forked workers start from a clean MNN state.
+
+    Usage:
+        with PreforkServer(workers=4, voices=["M1", "F1"]) as server:
+            audio, sample_rate = server.synthesize("Hello world", voice="F1")
+    """
+
+    def __init__(
+        self,
+        model_dir: str = DEFAULT_CACHE_DIR,
+        precision: str = "fp16",
+        version: str = "v3",
+        voices: Optional[list[str]] = None,
+        workers: int = 2,
+        max_rss_mb: Optional[float] = None,
+        check_interval: float = 1.0,
+        ring_size: int = 1 << 21,
+        write_timeout: Optional[float] = 30.0,
+        thread_num: Optional[int] = None,
+    ):
+        """
+        Args:
+            model_dir: Directory to store/load models.
+            precision: Model precision ('fp16', 'fp32', 'int8').
+            version: Model version ('v1', 'v2', 'v3').
+            voices: Voice styles to preload. None loads every available
+                built-in voice.
+            workers: Number of worker processes.
+            max_rss_mb: Replace a worker once its resident memory exceeds this
+                many MB. None disables the check.
+            check_interval: Seconds between supervisor checks.
+            ring_size: Samples in each worker's shared audio buffer (default
+                2M, 8 MB). Larger results fall back to the result queue.
+            write_timeout: Seconds a worker waits for space in its shared
+                audio buffer before it abandons the request. None waits
+                forever.
+            thread_num: Total MNN threads to split across the workers.
+                Defaults to the thread count in config.json.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("PreforkServer requires the 'fork' start method")
+        self.tts = SupertonicTTS(model_dir, precision, version)
+        self.voices = voices
+        self.num_workers = workers
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.ring_size = ring_size
+        self.write_timeout = write_timeout
+        self.thread_num = thread_num
+        self._ctx = multiprocessing.get_context("fork")
+        self._outbox = self._ctx.Queue()
+        self._workers = []
+        # Workers finishing their last requests before being replaced
+        self._retiring = []
+        self._worker_ids = itertools.count()
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.sample_rate = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Load the engine and voices, then fork the workers."""
+        if self.tts.engine is None:
+            thread_num = self.thread_num or load_mnn_config(self.tts.model_dir)["thread_num"]
+            per_worker = {"thread_num": max(1, thread_num // self.num_workers)}
+            self.tts.engine = load_text_to_speech(
+                self.tts.model_dir,
+                self.tts.precision,
+                version=self.tts.version,
+                module_configs={name: per_worker for name in MODULE_NAMES},
+            )
+        engine = self.tts.engine
+        self.sample_rate = engine.sample_rate
+        if self.voices is None:
+            for voice in VOICE_STYLES_ALL:
+                try:
+                    self.tts._get_style(voice)
+                except ValueError:
+                    pass  # Some styles may not exist for all versions
+        else:
+            for voice in self.voices:
+                self.tts._get_style(voice)
+
+        with self._lock:
+            for _ in range(self.num_workers):
+                self._workers.append(self._spawn())
+        self._threads = [
+            threading.Thread(target=self._read_results, daemon=True),
+            threading.Thread(target=self._supervise, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        text: str,
+        voice: str = "M1",
+        lang: str = "en",
+        steps: int = 5,
+        speed: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> Future:
+        """
+        Queue a text on the least busy worker.
+
+        Returns:
+            Future resolving to (audio_data, sample_rate), like
+            SupertonicTTS.synthesize.
+        """
+        future = Future()
+        self._dispatch(future, False, text, voice, lang, steps, speed, seed)
+        return future
+
+    def synthesize(self, text: str, **kwargs):
+        """Blocking version of submit()."""
+        return self.submit(text, **kwargs).result()
+
+    def synthesize_document(
+        self,
+        text: str,
+        voice: str = "M1",
+        lang: str = "en",
+        steps: int = 5,
+        speed: float = 1.0,
+        silence_duration: float = 0.3,
+        seed: Optional[int] = None,
+    ):
+        """
+        Synthesize a long text with its chunks spread across the workers.
+
+        The text is split with the engine's chunker, every chunk is queued at
+        once, and the audio is reassembled in order with silence_duration
+        seconds of silence between chunks, as TextToSpeech.__call__ does.
+        With a seed, each chunk gets its own seed derived from it, so the
+        output does not depend on which worker ran which chunk.
+
+        Returns:
+            (audio_data, sample_rate)
+        """
+        chunks = self.tts.engine._chunk_text(text, lang)
+        if seed is None:
+            seeds = [None] * len(chunks)
+        else:
+            seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(len(chunks))]
+        futures = [
+            self.submit(chunk, voice, lang, steps, speed, chunk_seed)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        ]
+        silence = np.zeros(int(silence_duration * self.sample_rate), dtype=np.float32)
+        parts = []
+        for future in futures:
+            if parts:
+                parts.append(silence)
+            parts.append(future.result()[0])
+        return np.concatenate(parts), self.sample_rate
+
+    def synthesize_stream(
+        self,
+        text: str,
+        voice: str = "M1",
+        lang: str = "en",
+        steps: int = 5,
+        speed: float = 1.0,
+        copy: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+        Stream a text from a worker, like SupertonicTTS.synthesize_stream.
+
+        Args:
+            copy: Yield copies of the chunks. By default each chunk is a view
+                into shared memory that is only valid until the next chunk is
+                requested.
+
+        Yields:
+            (audio_chunk, sample_rate) for each text chunk.
+        """
+        stream = _Stream()
+        worker = self._dispatch(stream, True, text, voice, lang, steps, speed, seed)
+        ring = worker.ring
+        region = None
+        try:
+            while True:
+                kind, payload = stream.items.get()
+                if region is not None:
+                    ring.release(region)
+                    region = None
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise payload
+                if isinstance(payload, np.ndarray):
+                    audio = payload
+                else:
+                    region = payload
+                    audio = ring.read(region)
+                    if copy:
+                        audio = audio.copy()
+                yield audio, self.sample_rate
+        finally:
+            with self._lock:
+                stream.cancelled = True
+                pending = list(stream.items.queue)
+            if region is not None:
+                ring.release(region)
+            for kind, payload in pending:
+                if kind == "chunk" and not isinstance(payload, np.ndarray):
+                    ring.release(payload)
+
+    def _dispatch(self, target, streaming, text, voice, lang, steps, speed, seed) -> "_Worker":
+        """Queue a request on the least busy worker; results go to target."""
+        if voice not in self.tts.voice_styles:
+            raise ValueError(f"Voice style '{voice}' was not preloaded")
+        request_id = next(self._request_ids)
+        with self._lock:
+            if not self._workers:
+                raise RuntimeError("PreforkServer is not running")
+            worker = min(self._workers, key=lambda w: len(w.inflight))
+            worker.inflight[request_id] = target
+            worker.inbox.put((request_id, streaming, text, voice, lang, steps, speed, seed))
+        return worker
+
+    def close(self):
+        """Let the workers finish queued requests, then stop them."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            for worker in workers:
+                worker.inbox.put(None)
+            workers += self._retiring
+        for worker in workers:
+            worker.process.join()
+        self._stop.set()
+        self._outbox.put(None)
+        for thread in self._threads:
+            thread.join()
+        for worker in workers:
+            self._fail(worker, RuntimeError("PreforkServer closed"))
+            worker.ring.close()
+
+    def _spawn(self) -> _Worker:
+        worker_id = next(self._worker_ids)
+        inbox = self._ctx.Queue()
+        ring = AudioRingBuffer(self.ring_size)
+        process = self._ctx.Process(
+            target=self._serve, args=(worker_id, inbox, self._outbox, ring), daemon=True
+        )
+        process.start()
+        return _Worker(worker_id, process, inbox, ring)
+
+    def _serve(self, worker_id, inbox, outbox, ring):
+        """Worker process main loop; runs on the engine inherited from the parent."""
+
+        def send(request_id, kind, audio):
+            # Large results that do not fit the ring go through the queue
+            region = ring.write(audio, timeout=self.write_timeout)
+            outbox.put((worker_id, request_id, kind, audio if region is None else region))
+
+        while True:
+            task = inbox.get()
+            if task is None:
+                break
+            request_id, streaming, text, voice, lang, steps, speed, seed = task
+            try:
+                if streaming:
+                    for audio, _ in self.tts.synthesize_stream(
+                        text, voice, lang, steps, speed, seed=seed
+                    ):
+                        send(request_id, "chunk", audio)
+                    outbox.put((worker_id, request_id, "end", None))
+                else:
+                    audio, _ = self.tts.synthesize(text, voice, lang, steps, speed, seed=seed)
+                    send(request_id, "audio", audio)
+            except TimeoutError as e:
+                # The consumer stopped reading; give up so the worker is free again
+                outbox.put((worker_id, request_id, "abandoned", f"{type(e).__name__}: {e}"))
+            except Exception as e:
+                outbox.put((worker_id, request_id, "error", f"{type(e).__name__}: {e}"))
+
+    def _read_results(self):
+        while True:
+            result = self._outbox.get()
+            if result is None:
+                break
+            worker_id, request_id, kind, payload = result
+            with self._lock:
+                worker = target = None
+                for candidate in self._workers + self._retiring:
+                    if candidate.worker_id == worker_id:
+                        worker = candidate
+                        break
+                if worker is None:
+                    continue
+                if kind == "chunk":
+                    target = worker.inflight.get(request_id)
+                else:
+                    target = worker.inflight.pop(request_id, None)
+                if isinstance(payload, tuple):
+                    worker.ring.received(payload)
+                if isinstance(target, _Stream):
+                    if target.cancelled:
+                        if isinstance(payload, tuple):
+                            worker.ring.release(payload)
+                        continue
+                    if kind == "abandoned":
+                        # Free the ring space held by chunks the consumer never read
+                        self._drop_chunks(worker, target)
+                        kind = "error"
+                    if kind == "error":
+                        payload = RuntimeError(payload)
+                    target.items.put((kind, payload))
+                    continue
+
+            if target is None:
+                if isinstance(payload, tuple):
+                    worker.ring.release(payload)
+            elif kind in ("error", "abandoned"):
+                target.set_exception(RuntimeError(payload))
+            else:
+                if isinstance(payload, tuple):
+                    audio = worker.ring.read(payload).copy()
+                    worker.ring.release(payload)
+                else:
+                    audio = payload
+                target.set_result((audio, self.sample_rate))
+
+    def _supervise(self):
+        while not self._stop.wait(self.check_interval):
+            with self._lock:
+                for i, worker in enumerate(self._workers):
+                    if not worker.process.is_alive():
+                        self._fail(
+                            worker,
+                            RuntimeError(
+                                f"Worker {worker.worker_id} exited with code "
+                                f"{worker.process.exitcode}"
+                            ),
+                        )
+                        worker.ring.close()
+                        self._workers[i] = self._spawn()
+                    elif self.max_rss_mb is not None:
+                        rss = _rss_mb(worker.process.pid)
+                        if rss is not None and rss > self.max_rss_mb:
+                            # Let it finish in-flight requests, then exit
+                            worker.inbox.put(None)
+                            self._retiring.append(worker)
+                            self._workers[i] = self._spawn()
+
+                for worker in list(self._retiring):
+                    if worker.process.is_alive():
+                        continue
+                    if worker.inflight and worker.process.exitcode == 0:
+                        # Exited cleanly; its last results are still being read
+                        continue
+                    self._fail(
+                        worker,
+                        RuntimeError(
+                            f"Worker {worker.worker_id} exited with code "
+                            f"{worker.process.exitcode}"
+                        ),
+                    )
+                    worker.ring.close()
+                    self._retiring.remove(worker)
+
+    @staticmethod
+    def _drop_chunks(worker: _Worker, stream: _Stream):
+        while True:
+            try:
+                kind, payload = stream.items.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "chunk" and not isinstance(payload, np.ndarray):
+                worker.ring.release(payload)
+
+    @staticmethod
+    def _fail(worker: _Worker, error: Exception):
+        for target in worker.inflight.values():
+            if isinstance(target, _Stream):
+                target.items.put(("error", error))
+            elif not target.done():
+                target.set_exception(error)
+        worker.inflight.clear()
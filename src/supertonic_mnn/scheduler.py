@@ -0,0 +1,393 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import MNN
+import numpy as np
+
+from .engine import Style, TextToSpeech, as_numpy
+
+
+class _Request:
+    """Bookkeeping for one caller's text, split into chunks."""
+
+    def __init__(self, n_chunks: int, silence_duration: float):
+        self.future = Future()
+        self.silence_duration = silence_duration
+        self.wavs = [None] * n_chunks
+        self.durs = [None] * n_chunks
+        self.remaining = n_chunks
+        # Waveform cache key to store the result under, if caching is enabled
+        self.cache_key = None
+
+
+class _ChunkItem:
+    def __init__(self, request, index, text, lang, style, total_step, speed):
+        self.request = request
+        self.index = index
+        self.text = text
+        self.lang = lang
+        self.style = style
+        self.total_step = total_step
+        self.speed = speed
+        self.arrival = time.monotonic()
+
+
+class BatchScheduler:
+    """
+    Merge concurrent synthesis requests into shared batches.
+
+    Requests are split into chunks and queued. A background worker collects
+    chunks that arrive within ``max_wait`` seconds of the oldest pending one
+    (or until ``max_batch_size`` chunks are ready), stacks their styles and
+    language tags into one batch and runs the pipeline once. Chunks can only
+    share a batch when they use the same number of diffusion steps; voices,
+    languages and speeds may differ.
+
+    Usage:
+        scheduler = BatchScheduler(tts, max_batch_size=8, max_wait=0.01)
+        wav, duration = scheduler.submit("Hello world", "en", style, 5).result()
+        scheduler.close()
+    """
+
+    def __init__(self, tts: TextToSpeech, max_batch_size: int = 8, max_wait: float = 0.01):
+        """
+        Args:
+            tts: Engine to run batches on. The scheduler must be its only user.
+            max_batch_size: Maximum number of chunks per batch.
+            max_wait: Maximum time in seconds a chunk waits for others to join
+                its batch.
+        """
+        self.tts = tts
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._closed = False
+        # Orders submit() against close(), so nothing is queued after the
+        # worker's stop marker
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        silence_duration: float = 0.3,
+    ) -> Future:
+        """
+        Queue a text for synthesis.
+
+        With the engine's waveform cache enabled, a repeated text is answered
+        from the cache without being queued.
+
+        Returns:
+            Future resolving to (wav, duration), with the same shapes as the
+            first two values returned by TextToSpeech.__call__.
+        """
+        if self._closed:
+            raise RuntimeError("BatchScheduler is closed")
+        assert (
+            style.ttl.shape[0] == 1
+        ), "Single speaker text to speech only supports single style"
+        text_list = self.tts._chunk_text(text, lang)
+        request = _Request(len(text_list), silence_duration)
+        if not text_list:
+            request.future.set_exception(ValueError("No text to synthesize"))
+            return request.future
+        cache = self.tts.waveform_cache
+        if cache is not None:
+            request.cache_key = self.tts._waveform_key(
+                text_list,
+                lang,
+                style,
+                total_step,
+                speed,
+                silence_duration,
+                batching=type(self).__name__,
+                batch_size=self.max_batch_size,
+            )
+            cached = cache.get(request.cache_key)
+            if cached is not None:
+                wav, duration = cached
+                request.future.set_result((wav.copy(), duration.copy()))
+                return request.future
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is closed")
+            for index, chunk in enumerate(text_list):
+                self._queue.put(_ChunkItem(request, index, chunk, lang, style, total_step, speed))
+        return request.future
+
+    def close(self):
+        """Finish all queued requests and stop the worker."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        pending = []
+        closing = False
+        while pending or not closing:
+            if not pending:
+                item = self._queue.get()
+                if item is None:
+                    break
+                pending.append(item)
+
+            deadline = pending[0].arrival + self.max_wait
+            while not closing and len(pending) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                else:
+                    pending.append(item)
+
+            total_step = pending[0].total_step
+            batch = [item for item in pending if item.total_step == total_step]
+            batch = batch[: self.max_batch_size]
+            pending = [item for item in pending if item not in batch]
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list):
+        try:
+            wav, dur_onnx, _ = self.tts._infer(
+                [item.text for item in batch],
+                [item.lang for item in batch],
+                Style.concat([item.style for item in batch]),
+                batch[0].total_step,
+                np.array([item.speed for item in batch], dtype=np.float32),
+            )
+        except Exception as e:
+            self._fail_items(batch, e)
+            return
+
+        wav_lengths = (dur_onnx * self.tts.sample_rate).astype(np.int64)
+        for i, item in enumerate(batch):
+            request = item.request
+            if request.future.done():
+                continue
+            request.wavs[item.index] = wav[i : i + 1, : wav_lengths[i]]
+            request.durs[item.index] = dur_onnx[i : i + 1]
+            request.remaining -= 1
+            if request.remaining == 0:
+                self._finish(request)
+
+    @staticmethod
+    def _fail_items(items: list, error: Exception):
+        for item in items:
+            if not item.request.future.done():
+                item.request.future.set_exception(error)
+
+    def _finish(self, request: _Request):
+        result = self._assemble(request)
+        if request.cache_key is not None:
+            self.tts.waveform_cache.put(request.cache_key, result)
+        request.future.set_result(result)
+
+    def _assemble(self, request: _Request) -> tuple[np.ndarray, np.ndarray]:
+        silence = np.zeros(
+            (1, int(request.silence_duration * self.tts.sample_rate)), dtype=np.float32
+        )
+        wav_list = []
+        for wav in request.wavs:
+            if wav_list:
+                wav_list.append(silence)
+            wav_list.append(wav)
+        duration = sum(request.durs) + request.silence_duration * (len(request.durs) - 1)
+        return np.concatenate(wav_list, axis=1), duration
+
+
+class _Slot:
+    """A chunk that is part of the running diffusion batch."""
+
+    def __init__(
+        self, item, text_emb, text_mask, style_ttl, latent, latent_mask, duration, wav_length
+    ):
+        self.item = item
+        self.text_emb = text_emb
+        self.text_mask = text_mask
+        self.style_ttl = style_ttl
+        self.latent = latent
+        self.latent_mask = latent_mask
+        self.duration = duration
+        self.wav_length = wav_length
+        self.step = 0
+
+
+def _pad_stack(arrays: list[np.ndarray]) -> np.ndarray:
+    """Zero-pad arrays along the last axis to a common length and stack them on axis 0."""
+    max_len = max(array.shape[-1] for array in arrays)
+    shape = (sum(array.shape[0] for array in arrays),) + arrays[0].shape[1:-1] + (max_len,)
+    out = np.zeros(shape, dtype=arrays[0].dtype)
+    offset = 0
+    for array in arrays:
+        out[offset : offset + array.shape[0], ..., : array.shape[-1]] = array
+        offset += array.shape[0]
+    return out
+
+
+class ContinuousBatchScheduler(BatchScheduler):
+    """
+    Continuous batching inside the diffusion loop.
+
+    The vector estimator takes per-item current_step and total_step, so one
+    running batch can hold chunks at different steps. New chunks are
+    conditioned (duration predictor and text encoder) and join the running
+    batch at step 0 between two vector estimator calls, and chunks that reach
+    their total_step leave it and go to the vocoder. A new request therefore
+    never waits for a whole batch to finish all its steps.
+
+    While the batch membership is unchanged the latent stays in MNN from one
+    step to the next; it is only read back and repacked when chunks join or
+    leave.
+
+    Usage:
+        scheduler = ContinuousBatchScheduler(tts, max_batch_size=8)
+        wav, duration = scheduler.submit("Hello world", "en", style, 5).result()
+        scheduler.close()
+    """
+
+    def __init__(self, tts: TextToSpeech, max_batch_size: int = 8):
+        """
+        Args:
+            tts: Engine to run on. The scheduler must be its only user.
+            max_batch_size: Maximum number of chunks in the running batch.
+        """
+        super().__init__(tts, max_batch_size=max_batch_size, max_wait=0.0)
+
+    def _run(self):
+        slots = []
+        inputs = None
+        current_step = None
+        closing = False
+        while slots or not closing:
+            admitted = []
+            while not closing and len(slots) + len(admitted) < self.max_batch_size:
+                try:
+                    item = self._queue.get(block=not slots and not admitted)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                else:
+                    admitted.append(item)
+
+            finished = [slot for slot in slots if slot.step >= slot.item.total_step]
+            if admitted or finished:
+                if inputs is not None:
+                    # Membership changes: read the running latent back per chunk
+                    latent = as_numpy(inputs["noisy_latent"])
+                    for i, slot in enumerate(slots):
+                        slot.latent = latent[i : i + 1, :, : slot.latent.shape[-1]]
+                    inputs = None
+                if finished:
+                    slots = [slot for slot in slots if slot not in finished]
+                    self._vocode(finished)
+                if admitted:
+                    slots.extend(self._admit(admitted))
+
+            if not slots:
+                continue
+            try:
+                if inputs is None:
+                    inputs, current_step = self._pack(slots)
+                current_step.write(np.array([slot.step for slot in slots], dtype=np.float32))
+                inputs["noisy_latent"], *_ = self.tts.vector_est_ort.forward(inputs)
+            except Exception as e:
+                self._fail(slots, e)
+                slots = []
+                inputs = None
+                continue
+            for slot in slots:
+                slot.step += 1
+
+    def _pack(self, slots: list):
+        """Bind the running batch's inputs, padded to common lengths, to MNN."""
+        inputs = self.tts.vector_est_ort.bind(
+            {
+                "noisy_latent": _pad_stack([slot.latent for slot in slots]),
+                "text_emb": _pad_stack([slot.text_emb for slot in slots]),
+                "style_ttl": np.concatenate([slot.style_ttl for slot in slots], axis=0),
+                "text_mask": _pad_stack([slot.text_mask for slot in slots]),
+                "latent_mask": _pad_stack([slot.latent_mask for slot in slots]),
+                "total_step": np.array(
+                    [slot.item.total_step for slot in slots], dtype=np.float32
+                ),
+            }
+        )
+        current_step = MNN.expr.placeholder([len(slots)], dtype=MNN.numpy.float32)
+        inputs["current_step"] = current_step
+        return inputs, current_step
+
+    def _admit(self, items: list) -> list:
+        """Condition new chunks and sample their starting latents."""
+        try:
+            text_emb, text_mask, dur_onnx = self.tts._condition(
+                [item.text for item in items],
+                [item.lang for item in items],
+                Style.concat([item.style for item in items]),
+                np.array([item.speed for item in items], dtype=np.float32),
+            )
+            xt, latent_mask = self.tts.sample_noisy_latent(dur_onnx)
+        except Exception as e:
+            self._fail_items(items, e)
+            return []
+
+        wav_lengths = (dur_onnx * self.tts.sample_rate).astype(np.int64)
+        text_lengths = text_mask.sum(axis=(1, 2)).astype(np.int64)
+        latent_lengths = latent_mask.sum(axis=(1, 2)).astype(np.int64)
+        slots = []
+        for i, item in enumerate(items):
+            if self.tts.text_buckets or self.tts.latent_buckets:
+                # Keep bucketed shapes so the running batch stays on bucket sizes
+                text_len, latent_len = text_mask.shape[-1], xt.shape[-1]
+            else:
+                text_len, latent_len = text_lengths[i], latent_lengths[i]
+            slots.append(
+                _Slot(
+                    item,
+                    text_emb[i : i + 1, :, :text_len],
+                    text_mask[i : i + 1, :, :text_len],
+                    item.style.ttl,
+                    xt[i : i + 1, :, :latent_len],
+                    latent_mask[i : i + 1, :, :latent_len],
+                    dur_onnx[i : i + 1],
+                    wav_lengths[i],
+                )
+            )
+        return slots
+
+    def _vocode(self, slots: list):
+        try:
+            wav, *_ = self.tts.vocoder_ort.run(
+                None, {"latent": _pad_stack([slot.latent for slot in slots])}
+            )
+        except Exception as e:
+            self._fail(slots, e)
+            return
+        for i, slot in enumerate(slots):
+            request = slot.item.request
+            if request.future.done():
+                continue
+            request.wavs[slot.item.index] = wav[i : i + 1, : slot.wav_length]
+            request.durs[slot.item.index] = slot.duration
+            request.remaining -= 1
+            if request.remaining == 0:
+                self._finish(request)
+
+    def _fail(self, slots: list, error: Exception):
+        self._fail_items([slot.item for slot in slots], error)
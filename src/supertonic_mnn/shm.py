@@ -0,0 +1,136 @@
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+# Bytes reserved in front of the samples for the shared read position
+_HEADER = 64
+
+# How often a producer waiting for free space re-checks the read position
+_POLL_INTERVAL = 0.001
+
+
+class AudioRingBuffer:
+    """
+    Single-producer ring buffer of float32 PCM in shared memory.
+
+    The buffer is created in the parent before forking; the worker process
+    writes audio into it and sends only the returned region (a small tuple of
+    ints) back through its result queue. The parent reads the samples in
+    place and releases the region once it is done with them, which lets the
+    worker reuse that space. Regions may be released in any order; space is
+    recycled as soon as every earlier region has been released.
+
+    The consumer side must mark every region it gets with received() before
+    reading it, so close() can wait for regions still being read.
+
+    A region is (start, end, offset, length): start/end are monotonic
+    positions used for recycling, offset/length locate the samples.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Number of float32 samples the buffer holds.
+        """
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=_HEADER + capacity * 4)
+        self._tail = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._tail[0] = 0
+        self._data = np.ndarray(
+            (capacity,), dtype=np.float32, buffer=self._shm.buf, offset=_HEADER
+        )
+        # Producer side
+        self._head = 0
+        # Consumer side: released regions not yet contiguous with the tail
+        self._released = {}
+        self._received = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def write(self, audio: np.ndarray, timeout: Optional[float] = None) -> Optional[tuple]:
+        """
+        Copy audio into the buffer, waiting for the consumer to free space.
+
+        Returns:
+            The region holding the samples, or None if audio can never fit
+            (larger than the buffer) so the caller should send it another way.
+
+        Raises:
+            TimeoutError: If no space was freed within timeout seconds.
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        length = len(audio)
+        if length > self.capacity:
+            return None
+
+        start = self._head
+        pos = start
+        offset = pos % self.capacity
+        if offset + length > self.capacity:
+            # Samples are stored contiguously; skip the tail end of the buffer
+            pos += self.capacity - offset
+            offset = 0
+        end = pos + length
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while end - int(self._tail[0]) > self.capacity:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("No space freed in the audio ring buffer")
+            time.sleep(_POLL_INTERVAL)
+
+        self._data[offset:offset + length] = audio
+        self._head = end
+        return start, end, offset, length
+
+    def received(self, region: tuple):
+        """Record that the consumer got a region and will release it later."""
+        with self._lock:
+            self._received = max(self._received, region[1])
+
+    def read(self, region: tuple) -> np.ndarray:
+        """Zero-copy view of a region's samples; valid until it is released."""
+        _, _, offset, length = region
+        return self._data[offset:offset + length]
+
+    def release(self, region: tuple):
+        """Hand a region's space back to the producer."""
+        start, end, _, _ = region
+        with self._lock:
+            if self._tail is None:
+                return
+            self._released[start] = end
+            tail = int(self._tail[0])
+            while tail in self._released:
+                tail = self._released.pop(tail)
+            self._tail[0] = tail
+            if self._closing and tail >= self._received:
+                self._unmap()
+
+    def close(self):
+        """
+        Free the shared memory.
+
+        The segment is unlinked right away; it is unmapped once every region
+        passed to received() has been released.
+        """
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            if int(self._tail[0]) >= self._received:
+                self._unmap()
+
+    def _unmap(self):
+        self._tail = None
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # A caller still holds a view; the mapping goes away with it
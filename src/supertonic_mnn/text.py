@@ -2,7 +2,7 @@ import json
 import re
 import numpy as np
 from unicodedata import normalize
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
 
 AVAILABLE_LANGS = [
@@ -12,105 +12,96 @@ AVAILABLE_LANGS = [
 ]
 
 
+# Character-level normalization, applied after NFKD in one regex pass:
+# emojis and special symbols are removed, dashes, quotes and separators
+# replaced. Only matched characters go through the replacement table.
+_EMOJI_RANGES = (
+    "\U0001f600-\U0001f64f"  # emoticons
+    "\U0001f300-\U0001f5ff"  # symbols & pictographs
+    "\U0001f680-\U0001f6ff"  # transport & map symbols
+    "\U0001f700-\U0001f77f"
+    "\U0001f780-\U0001f7ff"
+    "\U0001f800-\U0001f8ff"
+    "\U0001f900-\U0001f9ff"
+    "\U0001fa00-\U0001fa6f"
+    "\U0001fa70-\U0001faff"
+    "☀-⛿"
+    "✀-➿"
+    "\U0001f1e6-\U0001f1ff"
+)
+_REMOVED_CHARS = "♥☆♡©\\"
+_CHAR_REPLACEMENTS = {
+    "–": "-",
+    "‑": "-",
+    "—": "-",
+    "_": " ",
+    "“": '"',
+    "”": '"',
+    "‘": "'",
+    "’": "'",
+    "´": "'",
+    "`": "'",
+    "[": " ",
+    "]": " ",
+    "|": " ",
+    "/": " ",
+    "#": " ",
+    "→": " ",
+    "←": " ",
+    "@": " at ",
+}
+_CHAR_PATTERN = re.compile(
+    "["
+    + _EMOJI_RANGES
+    + re.escape(_REMOVED_CHARS)
+    + re.escape("".join(_CHAR_REPLACEMENTS))
+    + "]"
+)
+
+_EXPRESSIONS = {
+    "e.g.,": "for example, ",
+    "i.e.,": "that is, ",
+}
+_EXPRESSION_PATTERN = re.compile("|".join(re.escape(expr) for expr in _EXPRESSIONS))
+# Space before punctuation
+_PUNCT_SPACE_PATTERN = re.compile(r" ([,.!?;:'])")
+# Runs of the same quote
+_DUPLICATE_QUOTE_PATTERN = re.compile(r"([\"'])\1+")
+# Text ending with punctuation, quotes, or closing brackets
+_FINAL_PUNCT_PATTERN = re.compile(r"[.!?;:,'\"’)\]}…。」』】〉》›»]$")
+
+
+def _replace_char(match) -> str:
+    return _CHAR_REPLACEMENTS.get(match.group(), "")
+
+
 class UnicodeProcessor:
     def __init__(self, unicode_indexer_path: str):
         with open(unicode_indexer_path, "r") as f:
-            self.indexer = json.load(f)
+            # Lookup table from code point to token id, -1 for unsupported
+            # characters. A trailing -1 catches code points past the end.
+            self.indexer = np.append(np.asarray(json.load(f), dtype=np.int32), -1)
 
     def _preprocess_text(self, text: str, lang: str) -> str:
-        text = normalize("NFKD", text)
-
-        # Remove emojis (wide Unicode range)
-        emoji_pattern = re.compile(
-            "[\U0001f600-\U0001f64f"  # emoticons
-            "\U0001f300-\U0001f5ff"  # symbols & pictographs
-            "\U0001f680-\U0001f6ff"  # transport & map symbols
-            "\U0001f700-\U0001f77f"
-            "\U0001f780-\U0001f7ff"
-            "\U0001f800-\U0001f8ff"
-            "\U0001f900-\U0001f9ff"
-            "\U0001fa00-\U0001fa6f"
-            "\U0001fa70-\U0001faff"
-            "☀-⛿"
-            "✀-➿"
-            "\U0001f1e6-\U0001f1ff]+",
-            flags=re.UNICODE,
-        )
-        text = emoji_pattern.sub("", text)
-
-        # Replace various dashes and symbols
-        replacements = {
-            "–": "-",
-            "‑": "-",
-            "—": "-",
-            "_": " ",
-            "“": '"',
-            "”": '"',
-            "‘": "'",
-            "’": "'",
-            "´": "'",
-            "`": "'",
-            "[": " ",
-            "]": " ",
-            "|": " ",
-            "/": " ",
-            "#": " ",
-            "→": " ",
-            "←": " ",
-        }
-        for k, v in replacements.items():
-            text = text.replace(k, v)
-
-        # Remove special symbols
-        text = re.sub(r"[♥☆♡©\\]", "", text)
+        if lang not in AVAILABLE_LANGS:
+            raise ValueError(f"Invalid language: {lang}")
 
+        text = normalize("NFKD", text)
+        # Remove emojis and special symbols, replace dashes, quotes, etc.
+        text = _CHAR_PATTERN.sub(_replace_char, text)
         # Replace known expressions
-        expr_replacements = {
-            "@": " at ",
-            "e.g.,": "for example, ",
-            "i.e.,": "that is, ",
-        }
-        for k, v in expr_replacements.items():
-            text = text.replace(k, v)
-
+        text = _EXPRESSION_PATTERN.sub(lambda match: _EXPRESSIONS[match.group()], text)
         # Fix spacing around punctuation
-        text = re.sub(r" ,", ",", text)
-        text = re.sub(r" \.", ".", text)
-        text = re.sub(r" !", "!", text)
-        text = re.sub(r" \?", "?", text)
-        text = re.sub(r" ;", ";", text)
-        text = re.sub(r" :", ":", text)
-        text = re.sub(r" '", "'", text)
-
+        text = _PUNCT_SPACE_PATTERN.sub(r"\1", text)
         # Remove duplicate quotes
-        while '""' in text:
-            text = text.replace('""', '"')
-        while "''" in text:
-            text = text.replace("''", "'")
-        while "``" in text:
-            text = text.replace("``", "`")
-
+        text = _DUPLICATE_QUOTE_PATTERN.sub(r"\1", text)
         # Remove extra spaces
-        text = re.sub(r"\s+", " ", text).strip()
+        text = " ".join(text.split())
 
         # If text doesn't end with punctuation, quotes, or closing brackets, add a period
-        if not re.search(r"[.!?;:,'\"’)\]}…。」』】〉》›»]$", text):
+        if not _FINAL_PUNCT_PATTERN.search(text):
             text += "."
-
-        if lang not in AVAILABLE_LANGS:
-            raise ValueError(f"Invalid language: {lang}")
-        text = f"<{lang}>" + text + f"</{lang}>"
-        return text
-
-    def _get_text_mask(self, text_ids_lengths: np.ndarray) -> np.ndarray:
-        text_mask = length_to_mask(text_ids_lengths)
-        return text_mask
-
-    def _text_to_unicode_values(self, text: str) -> np.ndarray:
-        unicode_values = np.array(
-            [ord(char) for char in text], dtype=np.uint16
-        )  # 2 bytes
-        return unicode_values
+        return f"<{lang}>" + text + f"</{lang}>"
 
     def __call__(
         self, text_list: list[str], lang_list: list[str]
@@ -118,14 +109,28 @@ class UnicodeProcessor:
         text_list = [
             self._preprocess_text(t, lang) for t, lang in zip(text_list, lang_list)
         ]
-        text_ids_lengths = np.array([len(text) for text in text_list], dtype=np.int64)
-        text_ids = np.zeros((len(text_list), text_ids_lengths.max()), dtype=np.int64)
-        for i, text in enumerate(text_list):
-            unicode_vals = self._text_to_unicode_values(text)
-            text_ids[i, : len(unicode_vals)] = np.array(
-                [self.indexer[val] for val in unicode_vals], dtype=np.int64
+        return self._tokenize(text_list)
+
+    def _tokenize(self, text_list: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Token ids and mask of texts already passed through _preprocess_text."""
+        lengths = np.array([len(text) for text in text_list], dtype=np.int64)
+        mask = np.arange(lengths.max()) < lengths[:, None]
+
+        # Code points of the whole batch, looked up in one go
+        joined = "".join(text_list)
+        codes = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        ids = self.indexer[np.minimum(codes, len(self.indexer) - 1)]
+        unknown = np.flatnonzero(ids < 0)
+        if unknown.size:
+            chars = ", ".join(
+                f"{char!r} (U+{ord(char):04X})"
+                for char in dict.fromkeys(joined[i] for i in unknown)
             )
-        text_mask = self._get_text_mask(text_ids_lengths)
+            raise ValueError(f"Unsupported characters in text: {chars}")
+
+        text_ids = np.zeros(mask.shape, dtype=np.int32)
+        text_ids[mask] = ids
+        text_mask = mask.astype(np.float32)[:, None, :]
         return text_ids, text_mask
 
 
@@ -146,6 +151,149 @@ def length_to_mask(lengths: np.ndarray, max_len: Optional[int] = None) -> np.nda
     return mask.reshape(-1, 1, max_len)
 
 
+# Sentence boundaries: whitespace after . ! or ?, except after common
+# abbreviations like Mr., Mrs., Dr., etc. and single capital letters like F.
+# Candidates are found in one pass; the exceptions are checked per candidate.
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_ABBREVIATIONS = (
+    "Mr.", "Mrs.", "Ms.", "Dr.", "Prof.", "Sr.", "Jr.", "Ph.D.", "etc.", "e.g.",
+    "i.e.", "vs.", "Inc.", "Ltd.", "Co.", "Corp.", "St.", "Ave.", "Blvd.",
+)
+
+# Clause boundaries: whitespace after , ; or :, or right after CJK commas
+_CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:])\s+|(?<=[、，；：])")
+_WORD_BOUNDARY = re.compile(r"\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# CJK sentence ends, which need no whitespace after them. The next character
+# must have arrived, so a closing bracket after the stop stays with it.
+_CJK_SENTENCE_END = re.compile(r"(?<=[。！？])(?=[^」』）】])")
+
+
+def _split_paragraphs(text: str) -> list[str]:
+    # Split by paragraph (two or more newlines)
+    return [p.strip() for p in re.split(r"\n\s*\n+", text.strip()) if p.strip()]
+
+
+def _is_sentence_end(text: str, end: int) -> bool:
+    """Whether the period, ! or ? just before end closes a sentence."""
+    if text.endswith(_ABBREVIATIONS, 0, end):
+        return False
+    # Single capital letter at the start of a word, like the F. in F. Scott
+    if end >= 2 and "A" <= text[end - 2] <= "Z" and text[end - 1] == ".":
+        before = text[end - 3] if end >= 3 else ""
+        return before.isalnum() or before == "_"
+    return True
+
+
+def _split_sentences(paragraph: str) -> list[str]:
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        if _is_sentence_end(paragraph, match.start()):
+            sentences.append(paragraph[start : match.start()])
+            start = match.end()
+    sentences.append(paragraph[start:])
+    return sentences
+
+
+def _split_clause(sentence: str, max_len: int, boundary=_CLAUSE_BOUNDARY) -> list[str]:
+    """Split off the longest leading run of clauses that fits in max_len, if any."""
+    cut = None
+    for match in boundary.finditer(sentence):
+        if match.start() > max_len:
+            break
+        cut = match
+    if cut is None or cut.start() == 0 or cut.end() == len(sentence):
+        return [sentence]
+    return [sentence[: cut.start()], sentence[cut.end() :]]
+
+
+def _iter_lines(source: Iterable[str]) -> Iterator[str]:
+    """Split text pieces into lines, joining lines that span pieces."""
+    pending = []
+    for piece in source:
+        *lines, rest = piece.split("\n")
+        if lines:
+            pending.append(lines[0])
+            lines[0] = "".join(pending)
+            yield from lines
+            pending = []
+        if rest:
+            pending.append(rest)
+    yield "".join(pending)
+
+
+def iter_paragraphs(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """
+    Yield the paragraphs of a text, as split by chunk_text, one at a time.
+
+    Paragraphs are separated by blank lines. Only the current paragraph is
+    held in memory, so source may be an open file or any iterator of text
+    pieces (lines, tokens, ...), not just a string.
+    """
+    if isinstance(source, str):
+        source = (source,)
+    lines = []
+    for line in _iter_lines(source):
+        if line and not line.isspace():
+            lines.append(line)
+        elif lines:
+            yield "\n".join(lines).strip()
+            lines = []
+    if lines:
+        yield "\n".join(lines).strip()
+
+
+def iter_chunks(
+    source: Union[str, Iterable[str]],
+    max_len: int = 300,
+    first_len: Optional[int] = None,
+    growth: float = 2.0,
+) -> Iterator[str]:
+    """
+    Yield text chunks like chunk_text, reading the text as it goes.
+
+    source may be a string, an open file or any iterator of text pieces;
+    memory use is bounded by the longest paragraph. With first_len, chunks
+    start short and grow like chunk_text_progressive.
+
+    Args:
+        source: Text, file or iterator of text pieces
+        max_len: Maximum length of each chunk (default: 300)
+        first_len: Maximum length of the first chunk, or None for max_len
+        growth: Factor by which the chunk limit grows after each chunk
+
+    Yields:
+        Text chunks
+    """
+    progressive = first_len is not None
+    limit = min(first_len, max_len) if progressive else max_len
+    first = True
+
+    for paragraph in iter_paragraphs(source):
+        sentences = _split_sentences(paragraph)
+        if progressive and first and len(sentences[0]) > limit:
+            sentences[:1] = _split_clause(sentences[0], limit)
+        first = False
+
+        current_chunk = ""
+
+        for sentence in sentences:
+            if len(current_chunk) + len(sentence) + 1 <= limit:
+                current_chunk += (" " if current_chunk else "") + sentence
+            else:
+                if current_chunk:
+                    yield current_chunk.strip()
+                    if progressive:
+                        limit = min(max_len, int(limit * growth))
+                current_chunk = sentence
+
+        if current_chunk:
+            yield current_chunk.strip()
+            if progressive:
+                limit = min(max_len, int(limit * growth))
+
+
 def chunk_text(text: str, max_len: int = 300) -> list[str]:
     """
     Split text into chunks by paragraphs and sentences.
@@ -157,34 +305,94 @@ def chunk_text(text: str, max_len: int = 300) -> list[str]:
     Returns:
         List of text chunks
     """
-    import re
+    return list(iter_chunks(text, max_len))
 
-    # Split by paragraph (two or more newlines)
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n+", text.strip()) if p.strip()]
 
-    chunks = []
+def chunk_text_progressive(
+    text: str, first_len: int, max_len: int = 300, growth: float = 2.0
+) -> list[str]:
+    """
+    Split text like chunk_text, but starting with a short chunk that grows.
 
-    for paragraph in paragraphs:
-        paragraph = paragraph.strip()
-        if not paragraph:
-            continue
+    Meant for streaming, where the first chunk decides the time to first
+    audio. The first chunk holds the sentences that fit in first_len; if the
+    first sentence alone is longer, it is cut at the last clause boundary
+    (comma, semicolon, colon) within first_len. Each following chunk may be
+    growth times longer than the previous limit, up to max_len.
 
-        # Split by sentence boundaries (period, question mark, exclamation mark followed by space)
-        # But exclude common abbreviations like Mr., Mrs., Dr., etc. and single capital letters like F.
-        pattern = r"(?<!Mr\.)(?<!Mrs\.)(?<!Ms\.)(?<!Dr\.)(?<!Prof\.)(?<!Sr\.)(?<!Jr\.)(?<!Ph\.D\.)(?<!etc\.)(?<!e\.g\.)(?<!i\.e\.)(?<!vs\.)(?<!Inc\.)(?<!Ltd\.)(?<!Co\.)(?<!Corp\.)(?<!St\.)(?<!Ave\.)(?<!Blvd\.)(?<!\b[A-Z]\.)(?<=[.!?])\s+"
-        sentences = re.split(pattern, paragraph)
+    Args:
+        text: Input text to chunk
+        first_len: Maximum length of the first chunk
+        max_len: Maximum length of later chunks (default: 300)
+        growth: Factor by which the chunk limit grows after each chunk
 
-        current_chunk = ""
+    Returns:
+        List of text chunks
+    """
+    return list(iter_chunks(text, max_len, first_len, growth))
 
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= max_len:
-                current_chunk += (" " if current_chunk else "") + sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
 
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+class IncrementalChunker:
+    """
+    Cut text that arrives in pieces, e.g. LLM tokens, into chunks early.
+
+    Text is cut at a sentence end or paragraph break as soon as the
+    whitespace after it arrives (CJK full stops need none). A sentence that outgrows the chunk limit
+    (first_len for the first chunk, max_len after it) is cut at its last
+    clause boundary within the limit, or between words past max_len.
+    flush() returns all pending text without waiting for a boundary, e.g.
+    when the text stalls or ends. Cut text is chunked like iter_chunks, so
+    chunks of whole sentences are the ones chunk_text would produce.
+    """
 
-    return chunks
+    def __init__(self, first_len: int = 100, max_len: int = 300):
+        self.first_len = min(first_len, max_len)
+        self.max_len = max_len
+        self.buffer = ""
+        self.started = False
+
+    @property
+    def pending(self) -> bool:
+        """Whether text is waiting for a boundary."""
+        return bool(self.buffer)
+
+    def _take(self, end: int, resume: int) -> list[str]:
+        text = self.buffer[:end]
+        self.buffer = self.buffer[resume:]
+        first_len = None if self.started else self.first_len
+        chunks = list(iter_chunks(text, self.max_len, first_len))
+        self.started = self.started or bool(chunks)
+        return chunks
+
+    def _split(self, limit: int, boundary) -> list[str]:
+        head, *rest = _split_clause(self.buffer, limit, boundary)
+        if not rest:
+            return []
+        return self._take(len(head), len(self.buffer) - len(rest[0]))
+
+    def feed(self, piece: str) -> list[str]:
+        """Add a piece of text and return the chunks it completes."""
+        self.buffer = (self.buffer + piece).lstrip()
+        ends = [
+            match
+            for match in _SENTENCE_END.finditer(self.buffer)
+            if _is_sentence_end(self.buffer, match.start())
+        ]
+        ends += _CJK_SENTENCE_END.finditer(self.buffer)
+        ends += _PARAGRAPH_BREAK.finditer(self.buffer)
+        cut = max(ends, key=lambda match: match.end(), default=None)
+        chunks = self._take(cut.start(), cut.end()) if cut else []
+
+        limit = self.max_len if self.started else self.first_len
+        if len(self.buffer) > limit:
+            chunks += self._split(limit, _CLAUSE_BOUNDARY)
+        if len(self.buffer) > self.max_len:
+            chunks += self._split(self.max_len, _WORD_BOUNDARY)
+        if len(self.buffer) > self.max_len:
+            # No whitespace at all, e.g. unpunctuated CJK text
+            chunks += self._take(self.max_len, self.max_len)
+        return chunks
+
+    def flush(self) -> list[str]:
+        """Return chunks of all pending text."""
+        return self._take(len(self.buffer), len(self.buffer))
@@ -1,9 +1,17 @@
 import os
 import soundfile as sf
 import numpy as np
-from typing import Optional, Union, Tuple
-from .model import ensure_models, load_text_to_speech, get_voice_style_path, DEFAULT_CACHE_DIR
-from .engine import load_voice_style
+from contextlib import contextmanager
+from typing import Iterable, Optional, Union, Tuple
+from .model import (
+    ensure_models,
+    load_text_to_speech,
+    load_engine_pool,
+    get_voice_style_path,
+    DEFAULT_CACHE_DIR,
+)
+from .engine import DEFAULT_FLUSH_TIMEOUT, EarlyExit, load_voice_style
+from .scheduler import BatchScheduler, ContinuousBatchScheduler
 
 class SupertonicTTS:
     """
@@ -15,7 +23,13 @@ class SupertonicTTS:
         tts.save("output.wav", audio, sample_rate)
     """
 
-    def __init__(self, model_dir: str = DEFAULT_CACHE_DIR, precision: str = "fp16", version: str = "v3"):
+    def __init__(
+        self,
+        model_dir: str = DEFAULT_CACHE_DIR,
+        precision: str = "fp16",
+        version: str = "v3",
+        pool_size: int = 1,
+    ):
         """
         Initialize the TTS engine.
 
@@ -23,11 +37,16 @@ class SupertonicTTS:
             model_dir (str): Directory to store/load models.
             precision (str): Model precision ('fp16', 'fp32', 'int8').
             version (str): Model version ('v1', 'v2', 'v3'). Default: 'v3'.
+            pool_size (int): Number of weight-sharing engines for concurrent
+                synthesize() calls from several threads. Default: 1.
         """
         self.model_dir = model_dir
         self.precision = precision
         self.version = version
+        self.pool_size = pool_size
         self.engine = None
+        self.pool = None
+        self.scheduler = None
         self.voice_styles = {}
 
         # Ensure models are available upon initialization
@@ -39,6 +58,125 @@ class SupertonicTTS:
             self.engine = load_text_to_speech(self.model_dir, self.precision, version=self.version)
         return self.engine
 
+    def _get_pool(self):
+        """Lazily loads the engine pool."""
+        if self.pool is None:
+            self.pool = load_engine_pool(
+                self.model_dir, self.precision, version=self.version, size=self.pool_size
+            )
+        return self.pool
+
+    def _all_engines(self):
+        """Every engine in use: the single engine or the pool's, plus the batching one."""
+        engines = list(self._get_pool().engines) if self.pool_size > 1 else [self._get_engine()]
+        if self.scheduler is not None and self.scheduler.tts not in engines:
+            engines.append(self.scheduler.tts)
+        return engines
+
+    @contextmanager
+    def _checkout_engine(self):
+        """Provide an engine for exclusive use, taken from the pool if enabled."""
+        if self.pool_size > 1:
+            with self._get_pool().engine() as engine:
+                yield engine
+        else:
+            yield self._get_engine()
+
+    def _get_style(self, voice: str):
+        """Load or retrieve a voice style."""
+        if voice not in self.voice_styles:
+            style_path = get_voice_style_path(voice, self.model_dir, self.version)
+            self.voice_styles[voice] = load_voice_style([style_path])
+        return self.voice_styles[voice]
+
+    def enable_batching(
+        self, max_batch_size: int = 8, max_wait: float = 0.01, continuous: bool = False
+    ):
+        """
+        Merge concurrent synthesize() calls into shared batches.
+
+        Args:
+            max_batch_size (int): Maximum number of text chunks per batch.
+            max_wait (float): Maximum seconds a request waits for others to join.
+            continuous (bool): Use continuous batching, where requests join and
+                leave the running diffusion batch between steps. max_wait is
+                not used in this mode.
+
+        synthesize_stream() and stream_incremental() are not batched; they
+        keep running on their own engine alongside the scheduler.
+        """
+        if self.scheduler is not None:
+            self.scheduler.close()
+        # The scheduler's thread gets a weight-sharing clone of its own, so
+        # streams can keep running on the other engines meanwhile
+        engine = self._all_engines()[0].clone()
+        if continuous:
+            self.scheduler = ContinuousBatchScheduler(engine, max_batch_size)
+        else:
+            self.scheduler = BatchScheduler(engine, max_batch_size, max_wait)
+
+    def enable_conditioning_cache(self, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        """
+        Cache duration and text embeddings of repeated text chunks.
+
+        One cache is shared by every engine, including those of the pool and
+        of enable_batching().
+
+        Args:
+            max_bytes (int, optional): Memory budget of the cache. None
+                disables it.
+        """
+        first, *others = self._all_engines()
+        first.enable_conditioning_cache(max_bytes)
+        for engine in others:
+            engine.conditioning_cache = first.conditioning_cache
+
+    def enable_waveform_cache(
+        self,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        disk: bool = True,
+        disk_bytes: int = 2 * 1024 * 1024 * 1024,
+    ):
+        """
+        Return stored audio for repeated synthesize() requests.
+
+        Entries are keyed on the text, voice, language, steps, speed, model,
+        seed and batch size. One cache is shared by every engine of the pool
+        and by enable_batching(), whose results are cached separately from
+        unbatched ones.
+
+        Args:
+            max_bytes (int, optional): Memory budget of the in-process tier.
+                None disables the cache.
+            disk (bool): Also keep entries under model_dir/waveforms, shared
+                across processes and runs.
+            disk_bytes (int): Size budget of the on-disk tier.
+        """
+        disk_dir = os.path.join(self.model_dir, "waveforms") if disk else None
+        first, *others = self._all_engines()
+        first.enable_waveform_cache(max_bytes, disk_dir, disk_bytes)
+        for engine in others:
+            engine.waveform_cache = first.waveform_cache
+
+    def enable_timing(self, sinks: Optional[list] = None):
+        """
+        Time each stage of every request and report it to sinks.
+
+        Applies to every engine, including those of the pool and of
+        enable_batching(), which report to the same sinks. With pool_size 1
+        the timing of the last request is available as
+        tts.engine.last_timings.
+
+        Args:
+            sinks (list, optional): Sinks from supertonic_mnn.metrics, e.g.
+                LoggingSink(), PrometheusSink() or HistogramSink(). None logs
+                a summary line per request.
+        """
+        first, *others = self._all_engines()
+        first.enable_timing(sinks)
+        for engine in others:
+            engine.timing_sinks = first.timing_sinks
+
     def synthesize(
         self,
         text: str,
@@ -46,7 +184,10 @@ class SupertonicTTS:
         lang: str = "en",
         steps: int = 5,
         speed: float = 1.0,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        batch_size: int = 1,
+        seed: Optional[int] = None,
+        early_exit: Optional[EarlyExit] = None,
     ) -> Tuple[np.ndarray, int]:
         """
         Synthesize text to speech.
@@ -58,23 +199,43 @@ class SupertonicTTS:
             steps (int): Number of diffusion steps (default 5).
             speed (float): Speech speed (default 1.0).
             output_file (str, optional): Path to save the output audio file.
+            batch_size (int): Number of text chunks to synthesize together in one
+                batched pass (default 1).
+            seed (int, optional): Seed of the initial noise, for reproducible
+                output. Not supported with enable_batching().
+            early_exit (EarlyExit, optional): Stop the diffusion loop once it
+                converges instead of always running all steps. Not supported
+                with enable_batching().
 
         Returns:
             (audio_data, sample_rate): Numpy array of audio data and sample rate.
         """
-        engine = self._get_engine()
+        style = self._get_style(voice)
 
-        # Load or retrieve voice style
-        if voice not in self.voice_styles:
-            style_path = get_voice_style_path(voice, self.model_dir, self.version)
-            self.voice_styles[voice] = load_voice_style([style_path])
-
-        style = self.voice_styles[voice]
-
-        wav, duration, rtf = engine(text, lang, style, total_step=steps, speed=speed)
+        if self.scheduler is not None:
+            if seed is not None:
+                raise ValueError("seed is not supported with batching enabled")
+            if early_exit is not None:
+                raise ValueError("early_exit is not supported with batching enabled")
+            wav, duration = self.scheduler.submit(
+                text, lang, style, total_step=steps, speed=speed
+            ).result()
+            sample_rate = self.scheduler.tts.sample_rate
+        else:
+            with self._checkout_engine() as engine:
+                wav, duration, rtf = engine(
+                    text,
+                    lang,
+                    style,
+                    total_step=steps,
+                    speed=speed,
+                    batch_size=batch_size,
+                    seed=seed,
+                    early_exit=early_exit,
+                )
+                sample_rate = engine.sample_rate
 
         wav_data = wav[0]
-        sample_rate = engine.sample_rate
 
         if output_file:
             self.save(output_file, wav_data, sample_rate)
@@ -83,40 +244,134 @@ class SupertonicTTS:
 
     def synthesize_stream(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         voice: str = "M1",
         lang: str = "en",
         steps: int = 5,
         speed: float = 1.0,
+        pipelined: bool = False,
+        prefetch: int = 0,
+        progressive: bool = False,
+        seed: Optional[int] = None,
+        early_exit: Optional[EarlyExit] = None,
     ):
         """
         Synthesize text to speech as a stream (generator).
 
         Args:
-            text (str): Text to synthesize.
+            text (str or iterable): Text to synthesize, or an open file or
+                iterator of text pieces, read one paragraph at a time.
             voice (str): Voice style name.
             lang (str): Language code (e.g., 'en', 'ko', 'ja'). Default: 'en'.
             steps (int): Number of diffusion steps.
             speed (float): Speech speed.
+            pipelined (bool): Overlap text encoding, diffusion and vocoding of
+                consecutive chunks in separate worker threads.
+            prefetch (int): Number of chunks to synthesize ahead of the consumer
+                in a background thread (default 0, synthesize on demand).
+            progressive (bool): Start with a short first chunk and grow later
+                chunks, for lower time to first audio.
+            seed (int, optional): Seed of the initial noise, for reproducible
+                output.
+            early_exit (EarlyExit, optional): Stop the diffusion loop of each
+                chunk once it converges.
 
         Yields:
             (audio_chunk, sample_rate): Tuple of audio chunk (numpy array) and sample rate.
         """
-        engine = self._get_engine()
+        style = self._get_style(voice)
 
-        # Load or retrieve voice style
-        if voice not in self.voice_styles:
-            style_path = get_voice_style_path(voice, self.model_dir, self.version)
-            self.voice_styles[voice] = load_voice_style([style_path])
+        with self._checkout_engine() as engine:
+            stream_gen = engine.stream(
+                text,
+                lang,
+                style,
+                total_step=steps,
+                speed=speed,
+                pipelined=pipelined,
+                prefetch=prefetch,
+                progressive=progressive,
+                seed=seed,
+                early_exit=early_exit,
+            )
 
-        style = self.voice_styles[voice]
+            sample_rate = engine.sample_rate
 
-        stream_gen = engine.stream(text, lang, style, total_step=steps, speed=speed)
+            for wav, duration, elapsed in stream_gen:
+                yield wav[0], sample_rate
 
-        sample_rate = engine.sample_rate
+    def stream_incremental(
+        self,
+        pieces,
+        voice: str = "M1",
+        lang: str = "en",
+        steps: int = 5,
+        speed: float = 1.0,
+        flush_timeout: Optional[float] = DEFAULT_FLUSH_TIMEOUT,
+        seed: Optional[int] = None,
+        early_exit: Optional[EarlyExit] = None,
+    ):
+        """
+        Synthesize text that arrives in pieces, e.g. tokens from an LLM.
+
+        Speech starts at the first complete sentence (or clause, for long
+        sentences) instead of waiting for the whole text.
+
+        Args:
+            pieces (iterable or async iterable): Text pieces, in order.
+            voice (str): Voice style name.
+            lang (str): Language code (e.g., 'en', 'ko', 'ja'). Default: 'en'.
+            steps (int): Number of diffusion steps.
+            speed (float): Speech speed.
+            flush_timeout (float, optional): Seconds pending text may wait for
+                a sentence boundary before it is synthesized anyway. None
+                waits for a boundary or the end of the text.
+            seed (int, optional): Seed of the initial noise, for reproducible
+                output.
+            early_exit (EarlyExit, optional): Stop the diffusion loop of each
+                chunk once it converges.
+
+        Returns:
+            Generator of (audio_chunk, sample_rate) tuples, or an async
+            generator if pieces is an async iterable.
+        """
+        style = self._get_style(voice)
+        args = (style, lang, steps, speed, flush_timeout, seed, early_exit)
+        if hasattr(pieces, "__aiter__"):
+            return self._astream_incremental(pieces, *args)
+        return self._stream_incremental(pieces, *args)
+
+    def _stream_incremental(
+        self, pieces, style, lang, steps, speed, flush_timeout, seed, early_exit
+    ):
+        with self._checkout_engine() as engine:
+            for wav, duration, elapsed in engine.stream_incremental(
+                pieces,
+                lang,
+                style,
+                total_step=steps,
+                speed=speed,
+                flush_timeout=flush_timeout,
+                seed=seed,
+                early_exit=early_exit,
+            ):
+                yield wav[0], engine.sample_rate
 
-        for wav, duration, elapsed in stream_gen:
-            yield wav[0], sample_rate
+    async def _astream_incremental(
+        self, pieces, style, lang, steps, speed, flush_timeout, seed, early_exit
+    ):
+        with self._checkout_engine() as engine:
+            async for wav, duration, elapsed in engine.stream_incremental(
+                pieces,
+                lang,
+                style,
+                total_step=steps,
+                speed=speed,
+                flush_timeout=flush_timeout,
+                seed=seed,
+                early_exit=early_exit,
+            ):
+                yield wav[0], engine.sample_rate
 
     @staticmethod
     def save(filename: str, audio_data: np.ndarray, sample_rate: int):
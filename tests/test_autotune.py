@@ -0,0 +1,160 @@
+import sys
+import os
+import json
+from unittest.mock import mock_open, patch
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn import model
+from supertonic_mnn import autotune
+from supertonic_mnn.autotune import default_thread_counts
+
+
+def make_model_dir(root):
+    with open(os.path.join(root, "config.json"), "w") as f:
+        json.dump(
+            {
+                "mnn_cfg_backend": "cpu",
+                "mnn_cfg_thread_num": 4,
+                "mnn_cfg_precision": "normal",
+                "mnn_cfg_memory": "normal",
+            },
+            f,
+        )
+    models_dir = os.path.join(root, "v3", "mnn_models")
+    os.makedirs(models_dir)
+    with open(os.path.join(models_dir, "tts.json"), "w") as f:
+        json.dump(
+            {
+                "ae": {"sample_rate": 44100, "base_chunk_size": 512},
+                "ttl": {"chunk_compress_factor": 6, "latent_dim": 24},
+            },
+            f,
+        )
+    with open(os.path.join(models_dir, "unicode_indexer.json"), "w") as f:
+        json.dump([], f)
+
+
+def write_profile(root, host, module_configs):
+    path = model.tuned_profile_path(str(root), "fp16", "v3")
+    with open(path, "w") as f:
+        json.dump({"host": host, "module_configs": module_configs}, f)
+
+
+def test_default_thread_counts_are_powers_of_two_and_cpu_count():
+    with patch("os.cpu_count", return_value=6):
+        assert default_thread_counts() == [1, 2, 4, 6]
+    with patch("os.cpu_count", return_value=1):
+        assert default_thread_counts() == [1]
+
+
+def test_load_text_to_speech_applies_tuned_profile(tmp_path):
+    make_model_dir(str(tmp_path))
+    write_profile(
+        tmp_path,
+        model.host_fingerprint(),
+        {
+            "vocoder": {"model_precision": "int8", "thread_num": 2},
+            "vector_estimator": {"thread_num": 8, "memory": "low"},
+        },
+    )
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        tts = model.load_text_to_speech(
+            str(tmp_path),
+            "fp16",
+            module_configs={"vector_estimator": {"thread_num": 3}},
+            tuned_model_files=True,
+        )
+    calls = {os.path.basename(call.args[0]): call for call in load_mnn.call_args_list}
+    vocoder = calls["vocoder.mnn"]
+    assert os.path.basename(os.path.dirname(vocoder.args[0])) == "int8"
+    assert vocoder.args[3]["thread_num"] == 2
+    assert "model_precision" not in vocoder.args[3]
+    # Explicit module_configs win over the profile
+    assert calls["vector_estimator.mnn"].args[3]["thread_num"] == 3
+    assert calls["vector_estimator.mnn"].args[3]["memory"] == "low"
+    assert calls["duration_predictor.mnn"].args[3]["thread_num"] == 4
+    assert tts.model_version == (
+        "v3/duration_predictor:fp16,text_encoder:fp16,vector_estimator:fp16,vocoder:int8"
+    )
+
+
+def test_tuned_profile_keeps_requested_model_files_by_default(tmp_path):
+    make_model_dir(str(tmp_path))
+    write_profile(
+        tmp_path,
+        model.host_fingerprint(),
+        {"vocoder": {"model_precision": "int8", "thread_num": 2}},
+    )
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        tts = model.load_text_to_speech(str(tmp_path), "fp16")
+    calls = {os.path.basename(call.args[0]): call for call in load_mnn.call_args_list}
+    vocoder = calls["vocoder.mnn"]
+    assert os.path.basename(os.path.dirname(vocoder.args[0])) == "fp16"
+    assert vocoder.args[3]["thread_num"] == 2
+    assert tts.model_version == "v3/fp16"
+
+
+def test_tuned_profile_of_another_host_is_ignored(tmp_path):
+    make_model_dir(str(tmp_path))
+    write_profile(tmp_path, {"machine": "other"}, {"vocoder": {"thread_num": 2}})
+    assert model.load_tuned_profile(str(tmp_path), "fp16", "v3") is None
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        tts = model.load_text_to_speech(str(tmp_path), "fp16")
+    assert all(call.args[3]["thread_num"] == 4 for call in load_mnn.call_args_list)
+    assert tts.model_version == "v3/fp16"
+
+
+def test_load_engine_pool_splits_thread_budget_across_engines(tmp_path):
+    make_model_dir(str(tmp_path))
+    write_profile(tmp_path, model.host_fingerprint(), {"vocoder": {"thread_num": 6}})
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        model.load_engine_pool(str(tmp_path), "fp16", size=2)
+    calls = {os.path.basename(call.args[0]): call.args[3] for call in load_mnn.call_args_list}
+    # The tuned count is the budget of the whole pool
+    assert calls["vocoder.mnn"]["thread_num"] == 3
+    # Modules without a tuned value split config.json's 4 threads
+    assert calls["text_encoder.mnn"]["thread_num"] == 2
+    # An explicit thread_num is split across the engines as asked
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        model.load_engine_pool(str(tmp_path), "fp16", size=2, thread_num=8)
+    assert all(call.args[3]["thread_num"] == 4 for call in load_mnn.call_args_list)
+    # and so are the settings of a caller without a config.json
+    os.remove(tmp_path / "config.json")
+    with patch("supertonic_mnn.model.load_mnn") as load_mnn:
+        model.load_engine_pool(
+            str(tmp_path), "fp16", size=2, tuned=False,
+            mnn_cfg={"backend": 0, "thread_num": 6, "precision": "low", "memory": "low"},
+        )
+    assert all(call.args[3]["thread_num"] == 3 for call in load_mnn.call_args_list)
+    assert all(call.args[3]["precision"] == "low" for call in load_mnn.call_args_list)
+
+
+def test_host_fingerprint_reads_cpu_model_on_linux():
+    cpuinfo = "processor\t: 0\nvendor_id\t: GenuineIntel\nmodel name\t: Test CPU @ 3.00GHz\n"
+    with patch.object(model.sys, "platform", "linux"), patch(
+        "builtins.open", mock_open(read_data=cpuinfo)
+    ):
+        assert model.host_fingerprint()["processor"] == "Test CPU @ 3.00GHz"
+
+
+def test_autotune_only_tries_the_profile_precision_by_default(tmp_path):
+    make_model_dir(str(tmp_path))
+    with patch.object(autotune, "ensure_models") as ensure_models, patch.object(
+        autotune, "load_text_to_speech"
+    ), patch.object(autotune, "load_voice_style"), patch.object(
+        autotune, "get_voice_style_path"
+    ), patch.object(
+        autotune, "sample_inputs", return_value=dict.fromkeys(model.MODULE_NAMES)
+    ), patch.object(
+        autotune, "time_module", return_value=0.1
+    ) as time_module:
+        profile = autotune.autotune(
+            str(tmp_path), "fp32", thread_counts=[1], runtime_precisions=["normal"],
+            memory_modes=["normal"],
+        )
+    assert [call.args[1] for call in ensure_models.call_args_list] == ["fp32"]
+    tried = {os.path.basename(os.path.dirname(call.args[0])) for call in time_module.call_args_list}
+    assert tried == {"fp32"}
+    assert all(cfg["model_precision"] == "fp32" for cfg in profile["module_configs"].values())
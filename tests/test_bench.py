@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.bench import (
+    BENCH_CORPUS,
+    compare,
+    corpus_text,
+    current_rss_mb,
+    peak_rss_mb,
+    reset_peak_rss,
+)
+
+
+def test_corpus_text_cuts_at_word_boundary_up_to_length():
+    text = corpus_text(BENCH_CORPUS["en"], 100)
+    assert text.startswith("Call me Ishmael.")
+    assert len(text) <= 100
+    assert BENCH_CORPUS["en"][len(text)] == " "
+
+
+@pytest.mark.parametrize("lang", sorted(BENCH_CORPUS))
+@pytest.mark.parametrize("length", [100, 300, 400, 1600])
+def test_corpus_text_length_is_comparable_across_languages(lang, length):
+    text = corpus_text(BENCH_CORPUS[lang], length)
+    assert abs(len(text) - length) <= 0.1 * length
+
+
+def test_corpus_text_repeats_short_texts():
+    text = corpus_text("One.\nTwo.", 30)
+    assert text == "One. Two. One. Two. One. Two."
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    config = {"precision": "fp16", "threads": 4, "steps": 5, "voice": "M1", "lang": "en", "length": 100}
+    other = dict(config, threads=8)
+    baseline = {
+        "runs": [
+            {"config": config, "rtf": 0.10, "ttfa": 0.5, "chunks_per_sec": 2.0},
+            {"config": other, "rtf": 0.10, "ttfa": 0.5, "chunks_per_sec": 2.0},
+        ]
+    }
+    report = {
+        "runs": [
+            {"config": config, "rtf": 0.12, "ttfa": 0.52, "chunks_per_sec": 1.5},
+            {"config": other, "rtf": 0.08, "ttfa": 0.4, "chunks_per_sec": 2.5},
+            {"config": dict(config, steps=10), "rtf": 1.0, "ttfa": 9.0, "chunks_per_sec": 0.1},
+        ]
+    }
+    regressions = compare(report, baseline, tolerance=0.1)
+    assert [r["metric"] for r in regressions] == ["rtf", "chunks_per_sec"]
+    assert all(r["config"] == config for r in regressions)
+
+
+def test_peak_rss_is_measured_from_reset():
+    big = np.ones(64 * 1024 * 1024, dtype=np.uint8)  # 64 MB, touched
+    del big
+    if not reset_peak_rss():
+        pytest.skip("peak resident memory can't be reset on this platform")
+    # The earlier allocation no longer counts toward the peak
+    assert peak_rss_mb() < current_rss_mb() + 32
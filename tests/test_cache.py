@@ -0,0 +1,92 @@
+import sys
+import os
+import threading
+import numpy as np
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.cache import LRUCache, WaveformCache
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache(max_bytes=1024)
+    assert cache.get("a") is None
+    cache.put("a", (np.zeros(4, dtype=np.float32), np.ones(2, dtype=np.float32)))
+    emb, dur = cache.get("a")
+    np.testing.assert_array_equal(dur, [1, 1])
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": 24}
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    cache = LRUCache(max_bytes=80)
+    for key in "abc":
+        cache.put(key, np.zeros(8, dtype=np.float32))  # 32 bytes each
+    assert cache.get("a") is None
+    cache.get("b")
+    cache.put("d", np.zeros(8, dtype=np.float32))
+    assert cache.get("c") is None
+    assert cache.get("b") is not None
+    # Values larger than the whole budget are not cached
+    cache.put("e", np.zeros(100, dtype=np.float32))
+    assert cache.get("e") is None
+
+
+def test_lru_cache_stores_read_only_copies():
+    cache = LRUCache(max_bytes=1024)
+    value = np.zeros(4, dtype=np.float32)
+    cache.put("a", value)
+    value[:] = 1
+    cached = cache.get("a")
+    np.testing.assert_array_equal(cached, 0)
+    assert not cached.flags.writeable
+
+
+def test_lru_cache_is_thread_safe():
+    cache = LRUCache(max_bytes=40 * 16)
+
+    def worker(offset):
+        for i in range(500):
+            key = (offset + i) % 60
+            if cache.get(key) is None:
+                cache.put(key, np.zeros(4, dtype=np.float32))
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 2000
+    assert stats["bytes"] == stats["entries"] * 16 <= 40 * 16
+
+
+def test_waveform_cache_key_depends_on_every_field():
+    fields = dict(text=["Hello."], lang="en", voice="abc", steps=5, speed=1.0, seed=None)
+    key = WaveformCache.make_key(**fields)
+    assert key == WaveformCache.make_key(**dict(reversed(list(fields.items()))))
+    assert key != WaveformCache.make_key(**{**fields, "seed": 0})
+    assert key != WaveformCache.make_key(**{**fields, "steps": 6})
+
+
+def test_waveform_cache_reads_back_from_disk(tmp_path):
+    wav = np.arange(8, dtype=np.float32).reshape(1, 8)
+    WaveformCache(1024, str(tmp_path), 1 << 20).put("k", (wav, np.array([0.5])))
+    # A fresh cache (e.g. another process) only has the disk tier
+    cache = WaveformCache(1024, str(tmp_path), 1 << 20)
+    cached_wav, duration = cache.get("k")
+    np.testing.assert_array_equal(cached_wav, wav)
+    np.testing.assert_array_equal(duration, [0.5])
+    assert cache.get("missing") is None
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+def test_waveform_cache_evicts_oldest_disk_entries(tmp_path):
+    cache = WaveformCache(0, str(tmp_path), disk_bytes=1 << 20)
+    wav = np.zeros((1, 16), dtype=np.float32)
+    cache.put("old", (wav, np.array([1.0])))
+    entry_size = os.path.getsize(tmp_path / "old.npz")
+    cache.disk_bytes = entry_size
+    os.utime(tmp_path / "old.npz", (0, 0))
+    cache.put("new", (wav, np.array([1.0])))
+    assert sorted(os.listdir(tmp_path)) == ["new.npz"]
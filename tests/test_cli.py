@@ -1,5 +1,7 @@
+import io
 import sys
 import os
+import threading
 import pytest
 from unittest.mock import MagicMock, patch
 import numpy as np
@@ -11,7 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 #sys.modules['onnxruntime'] = MagicMock()
 #sys.modules['soundfile'] = MagicMock()
 
-from supertonic_mnn.cli import main
+from supertonic_mnn.cli import main, run_bounded
 
 @pytest.fixture
 def mock_dependencies():
@@ -19,7 +21,8 @@ def mock_dependencies():
          patch('supertonic_mnn.cli.load_text_to_speech') as mock_load_tts, \
          patch('supertonic_mnn.cli.load_voice_style') as mock_load_style, \
          patch('supertonic_mnn.cli.get_voice_style_path') as mock_get_style_path, \
-         patch('soundfile.write') as mock_sf_write:
+         patch('soundfile.write') as mock_sf_write, \
+         patch('soundfile.SoundFile') as mock_sound_file:
 
         # Mock TTS engine
         mock_tts_engine = MagicMock()
@@ -29,6 +32,16 @@ def mock_dependencies():
         mock_tts_engine.return_value = ([np.zeros(1000)], 1.0, 0.1)
         mock_load_tts.return_value = mock_tts_engine
 
+        # stream() reads the text and yields one audio chunk per line read
+        streamed = []
+
+        def stream(text, *args, **kwargs):
+            for line in text:
+                streamed.append(line)
+                yield np.zeros((1, 100)), 1.0, 0.1
+
+        mock_tts_engine.stream.side_effect = stream
+
         # Mock style
         mock_load_style.return_value = {"some": "style"}
 
@@ -38,7 +51,9 @@ def mock_dependencies():
             'load_style': mock_load_style,
             'get_style_path': mock_get_style_path,
             'sf_write': mock_sf_write,
-            'tts_engine': mock_tts_engine
+            'sound_file': mock_sound_file.return_value.__enter__.return_value,
+            'tts_engine': mock_tts_engine,
+            'streamed': streamed,
         }
 
 def test_cli_no_args(capsys):
@@ -49,14 +64,32 @@ def test_cli_no_args(capsys):
 
 def test_cli_input_text_stdin(mock_dependencies):
     # Mock stdin
-    with patch('sys.stdin.read', return_value='Hello world'), \
+    with patch('sys.stdin', io.StringIO('Hello world\n')), \
          patch('sys.argv', ['supertonic-mnn']):
         main()
 
     mock_dependencies['ensure'].assert_called_once()
     mock_dependencies['load_tts'].assert_called_once()
-    mock_dependencies['tts_engine'].assert_called_with('Hello world', {'some': 'style'}, 5, 1.0)
-    mock_dependencies['sf_write'].assert_called_once()
+    args = mock_dependencies['tts_engine'].stream.call_args.args
+    assert args[1:] == ('en', {'some': 'style'}, 5, 1.0)
+    assert mock_dependencies['streamed'] == ['Hello world\n']
+    mock_dependencies['sound_file'].write.assert_called_once()
+
+
+def test_cli_synthesizes_stdin_lines_as_they_arrive(mock_dependencies):
+    events = []
+
+    def stdin():
+        for line in ['First line.\n', 'Second line.\n']:
+            events.append(f"read {line.strip()}")
+            yield line
+
+    mock_dependencies['sound_file'].write.side_effect = lambda wav: events.append("write")
+    with patch('sys.stdin', stdin()), patch('sys.argv', ['supertonic-mnn']):
+        main()
+
+    # Audio of the first line is written before the second line is read
+    assert events == ["read First line.", "write", "read Second line.", "write"]
 
 def test_cli_input_file(mock_dependencies, tmp_path):
     input_file = tmp_path / "input.txt"
@@ -76,13 +109,92 @@ def test_cli_input_file(mock_dependencies, tmp_path):
     assert mock_dependencies['sf_write'].call_count == 2
 
 def test_cli_custom_args(mock_dependencies):
-    with patch('sys.stdin.read', return_value='Test'), \
+    with patch('sys.stdin', io.StringIO('Test')), \
          patch('sys.argv', ['supertonic-mnn', '--voice', 'Z1', '--speed', '1.2', '--steps', '10']):
         main()
 
     from unittest.mock import ANY
-    mock_dependencies['get_style_path'].assert_called_with('Z1', ANY)
+    mock_dependencies['get_style_path'].assert_called_with('Z1', ANY, ANY)
     # Note: DEFAULT_CACHE_DIR is used if not provided, we didn't mock it so checking call args might be tricky if we don't know the exact value.
     # But we can check speed and steps passed to tts_engine
-    mock_dependencies['tts_engine'].assert_called_with('Test', {'some': 'style'}, 10, 1.2)
+    args = mock_dependencies['tts_engine'].stream.call_args.args
+    assert args[1:] == ('en', {'some': 'style'}, 10, 1.2)
+    assert mock_dependencies['streamed'] == ['Test']
+
+
+
+
+def test_cli_seed_and_timing_reach_the_engine(mock_dependencies):
+    with patch('sys.stdin', io.StringIO('Test')), \
+         patch('sys.argv', ['supertonic-mnn', '--seed', '7', '--timing']):
+        main()
+
+    mock_dependencies['tts_engine'].enable_timing.assert_called_once()
+    assert mock_dependencies['tts_engine'].stream.call_args.kwargs['seed'] == 7
+
+
+class FakePreforkServer:
+    instances = []
+
+    def __init__(self, *args, workers, **kwargs):
+        self.workers = workers
+        self.documents = []
+        self.closed = False
+        FakePreforkServer.instances.append(self)
+
+    def start(self):
+        pass
+
+    def synthesize_document(self, text, voice, lang, steps, speed, seed=None):
+        self.documents.append((text, voice, seed))
+        return np.zeros(10), 24000
+
+    def close(self):
+        self.closed = True
+
+
+def test_cli_jobs_synthesizes_each_line_in_worker_processes(mock_dependencies, tmp_path):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("Line 1\nLine 2\nLine 3")
+    FakePreforkServer.instances.clear()
+    with patch('supertonic_mnn.cli.PreforkServer', FakePreforkServer), \
+         patch('sys.argv', ['supertonic-mnn', '-i', str(input_file), '-o', str(tmp_path / 'out.wav'),
+                            '--jobs', '2', '--seed', '3']):
+        main()
+
+    server, = FakePreforkServer.instances
+    assert server.workers == 2
+    assert sorted(server.documents) == [(f"Line {i}", "M1", 3) for i in (1, 2, 3)]
+    assert server.closed
+    assert mock_dependencies['sf_write'].call_count == 3
+    mock_dependencies['load_tts'].assert_not_called()
+
+
+@pytest.mark.parametrize("flag", [['--batch-size', '2'], ['--pipelined'], ['--timing']])
+def test_cli_jobs_rejects_unsupported_flags(mock_dependencies, flag):
+    with patch('sys.argv', ['supertonic-mnn', '--jobs', '2'] + flag), \
+         pytest.raises(SystemExit):
+        main()
+    mock_dependencies['ensure'].assert_not_called()
+
+
+def test_run_bounded_reads_items_as_workers_free_up():
+    read = []
+    release = threading.Event()
+
+    def items():
+        for i in range(6):
+            read.append(i)
+            yield i
+
+    def work(item):
+        release.wait(timeout=5)
 
+    runner = threading.Thread(target=run_bounded, args=(work, items(), 2))
+    runner.start()
+    runner.join(timeout=0.2)
+    # Only as many items as workers are taken while they are all busy
+    assert read == [0, 1]
+    release.set()
+    runner.join(timeout=5)
+    assert read == list(range(6))
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import sys
+import os
+import numpy as np
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn import engine
+from supertonic_mnn.engine import (
+    EarlyExit,
+    MNNInference,
+    Style,
+    TextToSpeech,
+    bucket_length,
+    get_latent_mask,
+)
+from supertonic_mnn.text import UnicodeProcessor
+
+
+class FakeVocoder:
+    """Fully convolutional stand-in: 3-frame moving average, 4 samples per frame."""
+
+    def run(self, output_names, input_dict):
+        latent = input_dict["latent"].mean(axis=1)
+        padded = np.pad(latent, ((0, 0), (1, 1)))
+        smoothed = (padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]) / 3
+        return [np.repeat(smoothed, 4, axis=1)]
+
+
+class FakeVectorEstimator:
+    """Moves the latent by a velocity that decays by a factor each step."""
+
+    def __init__(self, decay):
+        self.decay = decay
+        self.calls = 0
+
+    def bind(self, inputs):
+        return dict(inputs)
+
+    def forward(self, inputs):
+        x = inputs["noisy_latent"] + self.decay**self.calls
+        self.calls += 1
+        return [x]
+
+
+def make_tts():
+    cfgs = {
+        "ae": {"sample_rate": 16, "base_chunk_size": 2},
+        "ttl": {"chunk_compress_factor": 2, "latent_dim": 3},
+    }
+    return TextToSpeech(cfgs, None, None, None, None, FakeVocoder())
+
+
+def test_bucket_length_rounds_up_to_smallest_fitting_bucket():
+    buckets = [16, 32, 64]
+    assert bucket_length(1, buckets) == 16
+    assert bucket_length(16, buckets) == 16
+    assert bucket_length(17, buckets) == 32
+    assert bucket_length(64, buckets) == 64
+
+
+def test_bucket_length_beyond_largest_bucket_uses_multiples():
+    assert bucket_length(65, [16, 32, 64]) == 128
+    assert bucket_length(200, [16, 32, 64]) == 256
+
+
+def test_bucket_length_without_buckets_is_identity():
+    assert bucket_length(37, None) == 37
+    assert bucket_length(37, []) == 37
+
+
+def test_shape_cache_evicts_least_recently_used_module():
+    inference = MNNInference("model.mnn", ["x"], ["y"], {})
+    clones = iter(range(100))
+    inference.model.clone.side_effect = lambda shared: next(clones)
+    inference.enable_shape_cache(max_modules=2)
+    first = inference._module_for([np.zeros(1)])
+    assert first is inference.model
+    assert inference._module_for([np.zeros(2)]) == 0
+    # Using the first shape again makes the second the least recently used
+    assert inference._module_for([np.zeros(1)]) is first
+    assert inference._module_for([np.zeros(3)]) == 1
+    assert list(inference.shape_modules) == [((1,),), ((3,),)]
+    assert inference._module_for([np.zeros(2)]) == 2
+
+
+def test_run_returns_requested_outputs_in_order(monkeypatch):
+    monkeypatch.setattr(engine, "as_numpy", lambda value, copy=False: (value, copy))
+    inference = MNNInference("model.mnn", ["x"], ["a", "b", "c"], {})
+    inference.model.forward.return_value = ["var_a", "var_b", "var_c"]
+    inputs = {"x": np.zeros(2, dtype=np.float32)}
+    assert inference.run(["c", "a"], inputs) == [("var_c", False), ("var_a", False)]
+    assert inference.run(None, inputs, copy=True) == [
+        ("var_a", True),
+        ("var_b", True),
+        ("var_c", True),
+    ]
+    with pytest.raises(KeyError, match="Unknown output 'd'"):
+        inference.run(["a", "d"], inputs)
+
+
+def test_get_latent_mask_pads_to_max_len():
+    wav_lengths = np.array([3072 * 2, 3072 * 3 - 1])
+    mask = get_latent_mask(wav_lengths, 512, 6, max_len=5)
+    assert mask.shape == (2, 1, 5)
+    np.testing.assert_array_equal(mask[0, 0], [1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(mask[1, 0], [1, 1, 1, 0, 0])
+
+
+def test_windowed_vocoding_matches_full_decode():
+    tts = make_tts()
+    latent = np.random.default_rng(0).standard_normal((2, 6, 23)).astype(np.float32)
+    duration = np.array([23 * 4 / 16, 20 * 4 / 16])
+    full = tts._vocode(latent, duration)
+
+    tts.enable_windowed_vocoding(window=5, overlap=1)
+    windows = list(tts._vocode_windows(latent, duration))
+    assert [wav.shape[1] for wav, _ in windows] == [20, 20, 20, 20, 12]
+    assert [last for _, last in windows] == [False] * 4 + [True]
+    np.testing.assert_allclose(tts._vocode(latent, duration), full, atol=1e-6)
+
+
+def test_windowed_vocoding_skips_padded_frames_when_bucketing():
+    tts = make_tts()
+    tts.latent_buckets = [32]
+    latent = np.ones((1, 6, 32), dtype=np.float32)
+    tts.enable_windowed_vocoding(window=8, overlap=2)
+    wav = tts._vocode(latent, np.array([10 * 4 / 16]))
+    assert wav.shape == (1, 40)
+
+
+def test_sample_noisy_latent_is_seeded_and_reuses_buffer():
+    tts = make_tts()
+    duration = np.array([10 * 4 / 16])
+    first, mask = tts.sample_noisy_latent(duration, np.random.default_rng(3), reuse_buffer=True)
+    assert first.dtype == np.float32 and first.shape == (1, 6, 10)
+    expected = first.copy()
+    second, _ = tts.sample_noisy_latent(duration, np.random.default_rng(3), reuse_buffer=True)
+    assert np.shares_memory(first, second)
+    np.testing.assert_array_equal(second, expected)
+
+    tts.latent_buckets = [16]
+    padded, mask = tts.sample_noisy_latent(duration, 3)
+    assert padded.shape == (1, 6, 16)
+    assert padded[..., :10].all()
+    assert not padded[..., 10:].any()
+
+
+class RecordingEstimator:
+    """Returns an opaque output per step, like an MNN Var, and records its inputs."""
+
+    def __init__(self):
+        self.bound = []
+        self.fed = []
+        self.outputs = []
+
+    def bind(self, inputs):
+        self.bound.append(set(inputs))
+        return dict(inputs)
+
+    def forward(self, inputs):
+        self.fed.append(inputs["noisy_latent"])
+        self.outputs.append(object())
+        return [self.outputs[-1]]
+
+
+def test_denoise_binds_once_and_feeds_latent_back():
+    tts = make_tts()
+    tts.vector_est_ort = RecordingEstimator()
+    xt = np.zeros((1, 6, 4), dtype=np.float32)
+    style = Style(np.zeros((1, 2, 3), np.float32), np.zeros((1, 2, 3), np.float32))
+    mask = np.ones((1, 1, 4), dtype=np.float32)
+    out = tts._denoise(xt, np.zeros((1, 8, 5), np.float32), style, mask, mask, total_step=3)
+
+    estimator = tts.vector_est_ort
+    assert len(estimator.bound) == 1
+    assert len(estimator.fed) == 3
+    # Each step's output goes straight into the next step and is returned as is
+    assert estimator.fed[0] is xt
+    assert all(fed is prev for fed, prev in zip(estimator.fed[1:], estimator.outputs))
+    assert out is estimator.outputs[-1]
+
+
+def test_batched_chunks_are_trimmed_to_their_own_duration(monkeypatch):
+    tts = make_tts()
+    groups = []
+
+    def fake_infer(text_list, lang_list, style, total_step, speed, rng, early_exit):
+        groups.append((list(text_list), style.ttl.shape[0]))
+        # 16 samples per second, padded to the longest chunk plus a tail
+        dur = np.array([len(text) / 4 for text in text_list], dtype=np.float32)
+        wav = np.ones((len(text_list), int(dur.max() * 16) + 8), dtype=np.float32)
+        return wav, dur, 0.6
+
+    monkeypatch.setattr(tts, "_infer", fake_infer)
+    style = Style(np.zeros((1, 2, 3), np.float32), np.zeros((1, 2, 3), np.float32))
+    chunks = list(tts._infer_chunks(["abcd", "ab", "abcdefgh"], "en", style, 5, batch_size=2))
+
+    assert groups == [(["abcd", "ab"], 2), (["abcdefgh"], 1)]
+    assert [wav.shape for wav, _, _ in chunks] == [(1, 16), (1, 8), (1, 32)]
+    np.testing.assert_allclose([dur[0] for _, dur, _ in chunks], [1.0, 0.5, 2.0])
+    # The group's time is split evenly between its chunks
+    np.testing.assert_allclose([elapsed for _, _, elapsed in chunks], [0.3, 0.3, 0.6])
+
+
+def test_stream_incremental_closes_chunker_when_consumer_stops_early(monkeypatch):
+    tts = make_tts()
+    closed = []
+    real_incremental_chunks = engine.incremental_chunks
+
+    def tracked_incremental_chunks(*args):
+        try:
+            yield from real_incremental_chunks(*args)
+        finally:
+            closed.append(True)
+
+    def fake_infer(text_list, lang_list, style, total_step, speed, rng, early_exit):
+        return np.ones((1, 8), np.float32), np.array([0.5], np.float32), 0.0
+
+    # Keeps the synthesis generators alive, so only an explicit close ends them
+    generators = []
+    synthesize_incremental = tts._synthesize_incremental
+
+    def kept_synthesize_incremental(*args):
+        generators.append(synthesize_incremental(*args))
+        return generators[-1]
+
+    monkeypatch.setattr(engine, "incremental_chunks", tracked_incremental_chunks)
+    monkeypatch.setattr(tts, "_infer", fake_infer)
+    monkeypatch.setattr(tts, "_synthesize_incremental", kept_synthesize_incremental)
+    style = Style(np.zeros((1, 1, 1), np.float32), np.zeros((1, 1, 1), np.float32))
+    pieces = ["First sentence here. ", "Second one. ", "Third one."]
+
+    chunks = tts.stream_incremental(iter(pieces), "en", style, 5, flush_timeout=None)
+    next(chunks)
+    chunks.close()
+    assert closed == [True]
+    assert tts._timings is None
+
+    async def pieces_async():
+        for piece in pieces:
+            yield piece
+
+    async def first_chunk():
+        chunks = tts.stream_incremental(pieces_async(), "en", style, 5, flush_timeout=None)
+        async for chunk in chunks:
+            break
+        await chunks.aclose()
+
+    asyncio.run(first_chunk())
+    assert closed == [True, True]
+
+
+def test_early_exit_extrapolates_once_updates_stop_changing(monkeypatch):
+    monkeypatch.setattr(engine, "as_numpy", lambda value, copy=False: np.array(value))
+    tts = make_tts()
+    style = Style(np.zeros((1, 1, 1), np.float32), np.zeros((1, 1, 1), np.float32))
+    xt = np.zeros((1, 6, 4), dtype=np.float32)
+    args = (xt, None, style, None, None, 8)
+
+    tts.vector_est_ort = FakeVectorEstimator(decay=1.0)
+    early_exit = EarlyExit(threshold=0.05)
+    out = tts._denoise(*args, early_exit=early_exit)
+    assert tts.vector_est_ort.calls == 2
+    assert early_exit.steps_used == [2]
+    np.testing.assert_allclose(out, 8.0)
+
+    tts.vector_est_ort = FakeVectorEstimator(decay=0.5)
+    early_exit = EarlyExit(threshold=0.05, max_steps=5)
+    tts._denoise(*args, early_exit=early_exit)
+    assert tts.vector_est_ort.calls == 5
+    assert early_exit.steps_used == [5]
+
+
+class CountingProcessor(UnicodeProcessor):
+    """Ascii-only UnicodeProcessor that counts how often text is normalized."""
+
+    def __init__(self, tmp_path):
+        indexer_path = tmp_path / "unicode_indexer.json"
+        indexer_path.write_text(json.dumps(list(range(128))))
+        super().__init__(str(indexer_path))
+        self.normalized = 0
+
+    def _preprocess_text(self, text, lang):
+        self.normalized += 1
+        return super()._preprocess_text(text, lang)
+
+
+class FakeModule:
+    def __init__(self, output):
+        self.output = output
+        self.calls = 0
+
+    def run(self, output_names, input_dict):
+        self.calls += 1
+        return [self.output]
+
+
+def test_conditioning_cache_normalizes_text_once_per_miss(tmp_path):
+    tts = make_tts()
+    tts.text_processor = CountingProcessor(tmp_path)
+    tts.dp_ort = FakeModule(np.array([2.0], dtype=np.float32))
+    tts.text_enc_ort = FakeModule(np.ones((1, 4, 8), dtype=np.float32))
+    tts.enable_conditioning_cache(1024 * 1024)
+    style = Style(np.zeros((1, 1, 1), np.float32), np.zeros((1, 1, 1), np.float32))
+
+    _, text_mask, duration = tts._condition(["Hello."], ["en"], style, speed=2.0)
+    assert tts.text_processor.normalized == 1
+    assert text_mask.shape == (1, 1, len("<en>Hello.</en>"))
+    np.testing.assert_allclose(duration, [1.0])
+
+    tts._condition(["Hello."], ["en"], style, speed=1.0)
+    assert tts.text_processor.normalized == 2
+    assert tts.dp_ort.calls == tts.text_enc_ort.calls == 1
+
+
+def test_waveform_cache_key_covers_engine_settings(tmp_path, monkeypatch):
+    tts = make_tts()
+    tts.text_processor = CountingProcessor(tmp_path)
+    tts.enable_waveform_cache(1024 * 1024)
+    calls = []
+
+    def fake_infer_chunks(text_list, *args):
+        calls.append(args)
+        for _ in text_list:
+            yield np.ones((1, 8), np.float32), np.array([0.5], np.float32), 0.0
+
+    monkeypatch.setattr(tts, "_infer_chunks", fake_infer_chunks)
+    style = Style(np.zeros((1, 1, 1), np.float32), np.zeros((1, 1, 1), np.float32))
+
+    def synthesize(**kwargs):
+        tts("Hello.", "en", style, total_step=5, seed=0, **kwargs)
+
+    synthesize()
+    synthesize()
+    assert len(calls) == 1
+    # A hit is writable like a miss, and doesn't change the cached copy
+    wav, _, _ = tts("Hello.", "en", style, total_step=5, seed=0)
+    wav *= 2
+    wav, _, _ = tts("Hello.", "en", style, total_step=5, seed=0)
+    np.testing.assert_array_equal(wav, 1.0)
+    synthesize(batch_size=2)
+    synthesize(pipelined=True)
+    assert len(calls) == 3
+    tts.text_buckets = [32, 64]
+    synthesize()
+    tts.enable_windowed_vocoding()
+    synthesize()
+    assert len(calls) == 5
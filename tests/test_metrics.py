@@ -0,0 +1,65 @@
+import sys
+import os
+import logging
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.metrics import (
+    HistogramSink,
+    LoggingSink,
+    PrometheusSink,
+    RequestTimings,
+)
+
+
+def make_timings(step_seconds=(0.01, 0.02)):
+    timings = RequestTimings()
+    timings.stages["duration_predictor"] = 0.005
+    timings.stages["vocoder"] = 0.1
+    for seconds in step_seconds:
+        timings.add_step(seconds)
+    timings.finish(audio_duration=2.0, chunks=1, total=0.2)
+    return timings
+
+
+def test_request_timings_derives_overhead_and_rtf():
+    timings = make_timings()
+    assert timings.stages["vector_estimator"] == 0.03
+    assert abs(timings.overhead - 0.065) < 1e-9
+    assert timings.rtf == 0.1
+    assert timings.as_dict()["steps"] == [0.01, 0.02]
+
+    with timings.stage("text_processing"):
+        pass
+    assert timings.stages["text_processing"] > 0
+
+
+def test_histogram_sink_reports_percentiles():
+    sink = HistogramSink()
+    for i in range(1, 101):
+        sink.record(make_timings(step_seconds=(i / 1000,)))
+    summary = sink.summary()
+    assert sink.requests == 100
+    assert summary["vector_estimator_step"]["count"] == 100
+    assert summary["vector_estimator_step"]["p50"] in (0.05, 0.051)
+    assert summary["vector_estimator_step"]["p95"] in (0.095, 0.096)
+    assert sink.percentile("missing", 50) is None
+
+
+def test_prometheus_sink_renders_cumulative_buckets():
+    sink = PrometheusSink(buckets=(0.01, 0.1))
+    sink.record(make_timings(step_seconds=(0.005, 0.05)))
+    text = sink.render()
+    assert '# TYPE supertonic_stage_seconds histogram' in text
+    assert 'supertonic_stage_seconds_bucket{stage="vector_estimator_step",le="0.01"} 1' in text
+    assert 'supertonic_stage_seconds_bucket{stage="vector_estimator_step",le="+Inf"} 2' in text
+    assert 'supertonic_stage_seconds_count{stage="vocoder"} 1' in text
+    assert "supertonic_requests_total 1" in text
+
+
+def test_logging_sink_logs_summary(caplog):
+    with caplog.at_level(logging.INFO, logger="supertonic_mnn"):
+        LoggingSink().record(make_timings())
+    assert "RTF 0.1000" in caplog.text
+    assert "vocoder=100.0ms" in caplog.text
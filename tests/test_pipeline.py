@@ -0,0 +1,119 @@
+import sys
+import os
+import threading
+import pytest
+import numpy as np
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.pipeline import pipelined_infer
+
+
+class FakeTTS:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+
+    def _condition(self, text_list, lang_list, style, speed):
+        if text_list[0] == self.fail_on:
+            raise RuntimeError("conditioning failed")
+        dur = np.array([len(text_list[0])], dtype=np.float32)
+        return None, None, dur
+
+    def sample_noisy_latent(self, dur, rng=None):
+        return np.full((1, 1, 1), dur[0]), None
+
+    def _denoise(self, xt, text_emb, style, text_mask, latent_mask, total_step, early_exit=None):
+        return xt + total_step
+
+    def _vocode(self, xt, dur):
+        return xt.reshape(1, -1)
+
+
+def test_pipelined_infer_yields_chunks_in_order():
+    texts = ["a" * n for n in range(1, 30)]
+    out = list(pipelined_infer(FakeTTS(), texts, "en", None, total_step=5))
+    assert [float(wav[0, 0]) for wav, _, _ in out] == [n + 5.0 for n in range(1, 30)]
+
+
+def test_pipelined_infer_propagates_errors_and_stops_workers():
+    threads_before = threading.active_count()
+    with pytest.raises(RuntimeError, match="conditioning failed"):
+        list(pipelined_infer(FakeTTS(fail_on="bad"), ["ok", "bad", "never"], "en", None, 5))
+    assert threading.active_count() == threads_before
+
+
+def test_pipelined_infer_stops_workers_when_closed_early():
+    threads_before = threading.active_count()
+    gen = pipelined_infer(FakeTTS(), ["a"] * 50, "en", None, 5)
+    next(gen)
+    gen.close()
+    assert threading.active_count() == threads_before
+
+
+def test_lookahead_yields_in_order_and_reraises():
+    from supertonic_mnn.pipeline import lookahead
+
+    def source():
+        yield 1
+        yield 2
+        raise ValueError("producer failed")
+
+    gen = lookahead(source(), depth=2)
+    assert next(gen) == 1
+    assert next(gen) == 2
+    with pytest.raises(ValueError, match="producer failed"):
+        next(gen)
+
+
+def test_lookahead_closes_source_when_consumer_stops_early():
+    from supertonic_mnn.pipeline import lookahead
+
+    closed = threading.Event()
+
+    def source():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.set()
+
+    gen = lookahead(source(), depth=2)
+    assert next(gen) == 0
+    gen.close()
+    assert closed.is_set()
+
+
+def test_incremental_chunks_cuts_at_sentences_and_flushes_stalled_text():
+    import queue
+    import time
+    from supertonic_mnn.pipeline import incremental_chunks, read_pieces
+    from supertonic_mnn.text import IncrementalChunker
+
+    def llm():
+        yield from ["Hello", " there.", " How", " are"]
+        time.sleep(0.3)  # Stalls mid-sentence
+        yield from [" you?", " Fine"]
+
+    inbox = queue.Queue()
+    stop = threading.Event()
+    read_pieces(llm(), inbox, stop)
+    chunks = incremental_chunks(inbox, stop, IncrementalChunker(100, 300), flush_timeout=0.1)
+    assert list(chunks) == ["Hello there.", "How are", "you?", "Fine"]
+
+
+def test_incremental_chunks_reraises_reader_errors():
+    import queue
+    from supertonic_mnn.pipeline import incremental_chunks, read_pieces
+    from supertonic_mnn.text import IncrementalChunker
+
+    def llm():
+        yield "Hello there. "
+        raise ValueError("stream failed")
+
+    inbox = queue.Queue()
+    stop = threading.Event()
+    read_pieces(llm(), inbox, stop)
+    chunks = incremental_chunks(inbox, stop, IncrementalChunker(100, 300))
+    with pytest.raises(ValueError, match="stream failed"):
+        list(chunks)
@@ -0,0 +1,47 @@
+import sys
+import os
+import threading
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.pool import EnginePool
+
+
+class FakeTTS:
+    sample_rate = 24000
+
+    def __init__(self, parent=None):
+        self.parent = parent
+
+    def clone(self):
+        return FakeTTS(parent=self)
+
+
+def test_pool_clones_engine_and_hands_out_each_once():
+    base = FakeTTS()
+    pool = EnginePool(base, size=3)
+    engines = [pool.checkout(timeout=1) for _ in range(3)]
+    assert engines[0] is base
+    assert all(engine.parent is base for engine in engines[1:])
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.01)
+    for engine in engines:
+        pool.checkin(engine)
+
+
+def test_pool_engine_context_returns_engine_to_pool():
+    pool = EnginePool(FakeTTS(), size=1)
+    with pool.engine() as engine:
+        assert engine is not None
+    released = []
+    thread = threading.Thread(target=lambda: released.append(pool.checkout(timeout=1)))
+    thread.start()
+    thread.join()
+    assert released == [engine]
+
+
+def test_pool_rejects_empty_size():
+    with pytest.raises(ValueError):
+        EnginePool(FakeTTS(), size=0)
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import numpy as np
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn import prefork
+from supertonic_mnn.prefork import PreforkServer
+
+
+class FakeEngine:
+    sample_rate = 24000
+
+    def _chunk_text(self, text, lang):
+        return text.split("|")
+
+
+class FakeSupertonicTTS:
+    def __init__(self, model_dir, precision, version):
+        self.engine = FakeEngine()
+        self.voice_styles = {}
+
+    def _get_engine(self):
+        return self.engine
+
+    def _get_style(self, voice):
+        self.voice_styles[voice] = voice
+        return voice
+
+    def synthesize(self, text, voice, lang, steps, speed, seed=None):
+        if text == "crash":
+            os._exit(1)
+        return np.full(len(text), steps, dtype=np.float32), FakeEngine.sample_rate
+
+    def synthesize_stream(self, text, voice, lang, steps, speed, seed=None):
+        for word in text.split():
+            yield np.full(len(word), steps, dtype=np.float32), FakeEngine.sample_rate
+        yield np.zeros(10, dtype=np.float32), FakeEngine.sample_rate
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(prefork, "SupertonicTTS", FakeSupertonicTTS)
+    with PreforkServer(voices=["M1"], workers=2, check_interval=0.05) as server:
+        yield server
+
+
+def test_prefork_returns_results_per_request(server):
+    futures = [server.submit("x" * n, voice="M1", steps=n) for n in range(1, 6)]
+    for n, future in enumerate(futures, 1):
+        audio, sample_rate = future.result(timeout=10)
+        assert sample_rate == 24000
+        np.testing.assert_array_equal(audio, np.full(n, n, dtype=np.float32))
+
+
+def test_prefork_document_reassembles_chunks_in_order(server):
+    audio, sample_rate = server.synthesize_document(
+        "a|bb|ccc", voice="M1", steps=1, silence_duration=1 / FakeEngine.sample_rate
+    )
+    np.testing.assert_array_equal(audio, [1, 0, 1, 1, 0, 1, 1, 1])
+
+
+def test_prefork_restarts_crashed_worker(server):
+    with pytest.raises(RuntimeError):
+        server.synthesize("crash", voice="M1")
+    audio, _ = server.synthesize("ok", voice="M1")
+    assert len(audio) == 2
+    assert all(worker.process.is_alive() for worker in server._workers)
+
+
+def test_prefork_rejects_voice_not_preloaded(server):
+    with pytest.raises(ValueError):
+        server.submit("hello", voice="F1")
+
+
+def test_prefork_streams_chunks_through_shared_memory(monkeypatch):
+    monkeypatch.setattr(prefork, "SupertonicTTS", FakeSupertonicTTS)
+    with PreforkServer(voices=["M1"], workers=1, ring_size=8) as server:
+        chunks = [
+            audio.copy() for audio, _ in server.synthesize_stream("abc def", voice="M1")
+        ]
+    # Chunks that do not fit the ring fall back to the result queue
+    assert [len(chunk) for chunk in chunks] == [3, 3, 10]
+
+
+def test_prefork_abandons_stream_when_consumer_stalls(monkeypatch):
+    monkeypatch.setattr(prefork, "SupertonicTTS", FakeSupertonicTTS)
+    with PreforkServer(voices=["M1"], workers=1, ring_size=8, write_timeout=0.1) as server:
+        chunks = server.synthesize_stream("abc def ghi", voice="M1")
+        next(chunks)
+        # The third chunk cannot fit while the first two are still held
+        time.sleep(0.5)
+        with pytest.raises(RuntimeError, match="TimeoutError"):
+            next(chunks)
+        # The worker and its ring are free for the next request
+        audio, _ = server.synthesize("ok", voice="M1")
+        assert len(audio) == 2
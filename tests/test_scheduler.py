@@ -0,0 +1,193 @@
+import sys
+import os
+import threading
+import numpy as np
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.cache import WaveformCache
+from supertonic_mnn.engine import Style
+from supertonic_mnn import scheduler as scheduler_module
+from supertonic_mnn.scheduler import BatchScheduler, ContinuousBatchScheduler
+
+
+class FakeTTS:
+    sample_rate = 10
+    waveform_cache = None
+
+    def __init__(self):
+        self.batches = []
+
+    def _waveform_key(self, text_list, lang, style, total_step, speed, silence_duration, **settings):
+        return WaveformCache.make_key(text=text_list, lang=lang, steps=total_step, **settings)
+
+    def _chunk_text(self, text, lang):
+        return text.split("|")
+
+    def _infer(self, text_list, lang_list, style, total_step, speed):
+        self.batches.append((list(text_list), list(lang_list), style.ttl.shape[0], total_step))
+        dur = np.array([len(t) for t in text_list], dtype=np.float32) / speed
+        wav = np.ones((len(text_list), int(dur.max() * self.sample_rate) + 5), dtype=np.float32)
+        return wav, dur, 0.0
+
+
+def make_style():
+    return Style(np.zeros((1, 2, 3), dtype=np.float32), np.zeros((1, 2, 3), dtype=np.float32))
+
+
+def test_scheduler_merges_requests_and_reassembles_per_caller():
+    tts = FakeTTS()
+    scheduler = BatchScheduler(tts, max_batch_size=8, max_wait=0.2)
+    first = scheduler.submit("ab|c", "en", make_style(), 5, speed=1.0, silence_duration=0.5)
+    second = scheduler.submit("defg", "ko", make_style(), 5, speed=2.0)
+    wav1, dur1 = first.result(timeout=5)
+    wav2, dur2 = second.result(timeout=5)
+    scheduler.close()
+
+    assert tts.batches == [(["ab", "c", "defg"], ["en", "en", "ko"], 3, 5)]
+    # 2s + 0.5s silence + 1s, trimmed to each chunk's own duration
+    assert wav1.shape == (1, 35)
+    np.testing.assert_allclose(dur1, [3.5])
+    assert wav2.shape == (1, 20)
+    np.testing.assert_allclose(dur2, [2.0])
+
+
+def test_scheduler_does_not_mix_step_counts():
+    tts = FakeTTS()
+    scheduler = BatchScheduler(tts, max_batch_size=8, max_wait=0.2)
+    futures = [
+        scheduler.submit("a", "en", make_style(), 5),
+        scheduler.submit("b", "en", make_style(), 3),
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.close()
+
+    assert sorted(batch[3] for batch in tts.batches) == [3, 5]
+
+
+def test_scheduler_answers_repeated_text_from_waveform_cache():
+    tts = FakeTTS()
+    tts.waveform_cache = WaveformCache(1024 * 1024)
+    scheduler = BatchScheduler(tts, max_batch_size=8, max_wait=0.0)
+    first, _ = scheduler.submit("abc", "en", make_style(), 5, speed=1.0).result(timeout=5)
+    second, duration = scheduler.submit("abc", "en", make_style(), 5, speed=1.0).result(timeout=5)
+    scheduler.close()
+
+    assert len(tts.batches) == 1
+    np.testing.assert_array_equal(second, first)
+    np.testing.assert_allclose(duration, [3.0])
+    assert second.flags.writeable
+
+
+def test_scheduler_resolves_every_request_submitted_around_close():
+    tts = FakeTTS()
+    scheduler = BatchScheduler(tts, max_batch_size=4, max_wait=0.0)
+    futures = []
+
+    def submitter():
+        for _ in range(200):
+            try:
+                futures.append(scheduler.submit("a", "en", make_style(), 5))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=submitter) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    scheduler.close()
+    for thread in threads:
+        thread.join()
+    # Accepted requests are finished by close(); later ones were refused
+    assert all(future.done() for future in futures)
+
+
+def test_pad_stack_pads_last_axis_and_stacks_batch():
+    from supertonic_mnn.scheduler import _pad_stack
+
+    a = np.ones((1, 2, 3), dtype=np.float32)
+    b = np.full((1, 2, 5), 2.0, dtype=np.float32)
+    out = _pad_stack([a, b])
+    assert out.shape == (2, 2, 5)
+    np.testing.assert_array_equal(out[0, :, 3:], 0.0)
+    np.testing.assert_array_equal(out[1], 2.0)
+
+
+class CountingEstimator:
+    """Adds one to the latent per step; can hold a chosen call until released."""
+
+    def __init__(self, hold_call=None):
+        self.batch_sizes = []
+        self.hold_call = hold_call
+        self.held = threading.Event()
+        self.release = threading.Event()
+
+    def bind(self, inputs):
+        return dict(inputs)
+
+    def forward(self, inputs):
+        if len(self.batch_sizes) == self.hold_call:
+            self.held.set()
+            self.release.wait(timeout=5)
+        self.batch_sizes.append(inputs["noisy_latent"].shape[0])
+        return [inputs["noisy_latent"] + 1]
+
+
+class FakeVocoder:
+    def __init__(self):
+        self.steps = []
+
+    def run(self, output_names, input_dict):
+        latent = input_dict["latent"]
+        self.steps.append(latent[:, 0, 0].tolist())
+        return [latent.mean(axis=1)]
+
+
+class ContinuousFakeTTS:
+    """Every chunk lasts 4 samples of 4 latent frames; the wav holds the steps run."""
+
+    sample_rate = 1
+    text_buckets = None
+    latent_buckets = None
+    waveform_cache = None
+
+    def __init__(self, estimator):
+        self.vector_est_ort = estimator
+        self.vocoder_ort = FakeVocoder()
+
+    def _chunk_text(self, text, lang):
+        return text.split("|")
+
+    def _condition(self, text_list, lang_list, style, speed):
+        n = len(text_list)
+        text_emb = np.zeros((n, 2, 3), dtype=np.float32)
+        text_mask = np.ones((n, 1, 3), dtype=np.float32)
+        return text_emb, text_mask, np.full(n, 4.0, dtype=np.float32)
+
+    def sample_noisy_latent(self, duration):
+        n = len(duration)
+        return np.zeros((n, 2, 4), dtype=np.float32), np.ones((n, 1, 4), dtype=np.float32)
+
+
+def test_continuous_scheduler_admits_and_retires_between_steps(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "as_numpy", lambda value, copy=False: np.asarray(value))
+    estimator = CountingEstimator(hold_call=1)
+    tts = ContinuousFakeTTS(estimator)
+    scheduler = ContinuousBatchScheduler(tts, max_batch_size=4)
+    long = scheduler.submit("long", "en", make_style(), 10, silence_duration=0.0)
+    # Join while the first request is mid-denoise, with fewer steps
+    assert estimator.held.wait(timeout=5)
+    short = scheduler.submit("short", "en", make_style(), 3, silence_duration=0.0)
+    estimator.release.set()
+    short_wav, _ = short.result(timeout=5)
+    long_wav, _ = long.result(timeout=5)
+    scheduler.close()
+
+    # Each chunk ran exactly its own number of steps
+    np.testing.assert_array_equal(short_wav, np.full((1, 4), 3.0))
+    np.testing.assert_array_equal(long_wav, np.full((1, 4), 10.0))
+    # The short chunk joined after two steps and left after its third
+    assert estimator.batch_sizes == [1, 1, 2, 2, 2, 1, 1, 1, 1, 1]
+    # and was vocoded on its own before the long one finished
+    assert tts.vocoder_ort.steps == [[3.0], [10.0]]
@@ -0,0 +1,41 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.shm import AudioRingBuffer
+
+
+@pytest.fixture
+def ring():
+    ring = AudioRingBuffer(10)
+    yield ring
+    ring.close()
+
+
+def test_ring_round_trips_audio(ring):
+    region = ring.write(np.arange(4, dtype=np.float32))
+    ring.received(region)
+    np.testing.assert_array_equal(ring.read(region), np.arange(4))
+    ring.release(region)
+
+
+def test_ring_recycles_space_after_every_earlier_region_is_released(ring):
+    first = ring.write(np.ones(4))
+    second = ring.write(np.full(4, 2.0))
+    # Releasing out of order frees nothing until the first region goes back
+    ring.release(second)
+    with pytest.raises(TimeoutError):
+        ring.write(np.zeros(4), timeout=0.01)
+    ring.release(first)
+    # Wraps to the start of the buffer rather than splitting the samples
+    third = ring.write(np.full(4, 3.0), timeout=0.01)
+    assert third[2] == 0
+    np.testing.assert_array_equal(ring.read(third), np.full(4, 3.0))
+
+
+def test_ring_rejects_audio_larger_than_buffer(ring):
+    assert ring.write(np.zeros(11)) is None
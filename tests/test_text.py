@@ -0,0 +1,205 @@
+import json
+import sys
+import os
+from unicodedata import normalize
+
+import numpy as np
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn.text import (
+    IncrementalChunker,
+    UnicodeProcessor,
+    _split_sentences,
+    chunk_text,
+    chunk_text_progressive,
+    iter_chunks,
+)
+
+
+def test_progressive_first_chunk_ends_at_sentence_boundary():
+    text = "Hi there. How are you today? " + "This sentence is filler text. " * 20
+    chunks = chunk_text_progressive(text, first_len=40, max_len=120)
+    assert chunks[0] == "Hi there. How are you today?"
+    # Limits grow 40 -> 80 -> 120
+    assert 40 < len(chunks[1]) <= 80
+    assert all(80 < len(chunk) <= 120 for chunk in chunks[2:-1])
+    assert " ".join(chunks) == " ".join(text.split())
+
+
+def test_progressive_splits_long_first_sentence_at_clause():
+    text = "When the first sentence runs long, we cut it at a comma, which keeps prosody."
+    chunks = chunk_text_progressive(text, first_len=40)
+    assert chunks == [
+        "When the first sentence runs long,",
+        "we cut it at a comma, which keeps prosody.",
+    ]
+
+
+def test_progressive_splits_cjk_clause_without_spaces():
+    text = "今日はとても良い天気ですね、散歩に行きましょう。"
+    chunks = chunk_text_progressive(text, first_len=16, max_len=120)
+    assert chunks == ["今日はとても良い天気ですね、", "散歩に行きましょう。"]
+
+
+def test_progressive_matches_chunk_text_once_grown():
+    text = "\n\n".join(["Short paragraph."] * 5)
+    assert chunk_text_progressive(text, first_len=300) == chunk_text(text)
+
+
+# (text, lang, expected) with expected in NFC; the processor outputs NFKD
+NORMALIZATION_CORPUS = [
+    ("Hello, world!", "en", "<en>Hello, world!</en>"),
+    (
+        "e.g., this works; i.e., it is fine",
+        "en",
+        "<en>for example, this works; that is, it is fine.</en>",
+    ),
+    (
+        "Email me @ home_address [now] | later / soon # tag → next ← prev",
+        "en",
+        "<en>Email me at home address now later soon tag next prev.</en>",
+    ),
+    (
+        "“Quoted” and ‘single’ with ´acute´ and `backtick`",
+        "en",
+        "<en>\"Quoted\" and'single' with \u0301acute \u0301 and'backtick'</en>",
+    ),
+    ("Dashes – en \u2011 nb — em", "en", "<en>Dashes - en \u2010 nb - em.</en>"),
+    ("I ♥ you ☆ and ♡ © 2024 back\\slash", "en", "<en>I you and 2024 backslash.</en>"),
+    (
+        "Emoji 😀 party 🎉 rocket 🚀 flag 🇺🇸 sun ☀ check ✅",
+        "en",
+        "<en>Emoji party rocket flag sun check.</en>",
+    ),
+    (
+        "Spaces before punctuation , . ! ? ; : ' done",
+        "en",
+        "<en>Spaces before punctuation,.!?;:' done.</en>",
+    ),
+    (
+        "Quotes \"\"\"doubled\"\" and ''single'' ``ticks``",
+        "en",
+        "<en>Quotes \"doubled\" and'single'ticks'</en>",
+    ),
+    ("  Tabs\tand\nnewlines   everywhere  ", "en", "<en>Tabs and newlines everywhere.</en>"),
+    ("No final punctuation", "en", "<en>No final punctuation.</en>"),
+    ("Ends with ellipsis…", "en", "<en>Ends with ellipsis...</en>"),
+    ("Ends with paren (like this)", "en", "<en>Ends with paren (like this)</en>"),
+    ("Ｆｕｌｌｗｉｄｔｈ ＡＢＣ １２３！", "en", "<en>Fullwidth ABC 123!</en>"),
+    ("ﬁ ligature and ½ fraction", "en", "<en>fi ligature and 1⁄2 fraction.</en>"),
+    ("안녕하세요. 오늘 날씨가 좋네요", "ko", "<ko>안녕하세요. 오늘 날씨가 좋네요.</ko>"),
+    ("한국어 문장 , 띄어쓰기 !", "ko", "<ko>한국어 문장, 띄어쓰기!</ko>"),
+    ("こんにちは、世界。", "ja", "<ja>こんにちは、世界。</ja>"),
+    ("「かぎ括弧」で終わる「文」", "ja", "<ja>「かぎ括弧」で終わる「文」</ja>"),
+    ("ｶﾀｶﾅ ﾃｽﾄ", "ja", "<ja>カタカナ テスト.</ja>"),
+    ("Ça va? Très bien, merci !", "fr", "<fr>Ça va? Très bien, merci!</fr>"),
+    ("L’été « chaud » arrive", "fr", "<fr>L'été « chaud » arrive.</fr>"),
+    ("Grüße aus München — schön", "de", "<de>Grüße aus München - schön.</de>"),
+    ("¿Dónde está la biblioteca?", "es", "<es>¿Dónde está la biblioteca?</es>"),
+    ("Привет, мир ! Как дела", "ru", "<ru>Привет, мир! Как дела.</ru>"),
+    ("Καλημέρα κόσμε ;", "el", "<el>Καλημέρα κόσμε;</el>"),
+    ("مرحبا بالعالم", "ar", "<ar>مرحبا بالعالم.</ar>"),
+    ("नमस्ते दुनिया", "hi", "<hi>नमस्ते दुनिया.</hi>"),
+    ("Xin chào thế giới", "vi", "<vi>Xin chào thế giới.</vi>"),
+    ("Merhaba dünya @ İstanbul", "tr", "<tr>Merhaba dünya at İstanbul.</tr>"),
+    ("Cześć świecie » koniec «", "pl", "<pl>Cześć świecie » koniec «.</pl>"),
+    ("Ahoj světe ' ' ''", "cs", "<cs>Ahoj světe'</cs>"),
+    ("Hej världen_med_understreck", "sv", "<sv>Hej världen med understreck.</sv>"),
+    ("Language agnostic 123", "na", "<na>Language agnostic 123.</na>"),
+    ("", "en", "<en>.</en>"),
+    ("   ", "en", "<en>.</en>"),
+    ("😀😀😀", "en", "<en>.</en>"),
+    ("\"\"", "en", "<en>\"</en>"),
+    ("Already tagged? <en>", "en", "<en>Already tagged? <en>.</en>"),
+]
+
+
+@pytest.fixture
+def processor(tmp_path):
+    indexer_path = tmp_path / "unicode_indexer.json"
+    indexer_path.write_text("[]")
+    return UnicodeProcessor(str(indexer_path))
+
+
+@pytest.mark.parametrize("text, lang, expected", NORMALIZATION_CORPUS)
+def test_preprocess_text_normalizes_multilingual_corpus(processor, text, lang, expected):
+    assert processor._preprocess_text(text, lang) == normalize("NFKD", expected)
+
+
+def test_preprocess_text_rejects_unknown_language(processor):
+    with pytest.raises(ValueError, match="Invalid language"):
+        processor._preprocess_text("Hello", "xx")
+
+
+@pytest.fixture
+def ascii_processor(tmp_path):
+    # Printable ASCII maps to code point - 31, everything else is unsupported
+    indexer = [i - 31 if 32 <= i < 127 else -1 for i in range(128)]
+    indexer_path = tmp_path / "unicode_indexer.json"
+    indexer_path.write_text(json.dumps(indexer))
+    return UnicodeProcessor(str(indexer_path))
+
+
+def test_processor_pads_batch_and_builds_mask(ascii_processor):
+    text_ids, text_mask = ascii_processor(["Hi.", "Hello there."], ["en", "en"])
+    short, long = "<en>Hi.</en>", "<en>Hello there.</en>"
+    assert text_ids.dtype == np.int32
+    assert text_ids.shape == (2, len(long))
+    assert text_ids[0].tolist() == [ord(c) - 31 for c in short] + [0] * (len(long) - len(short))
+    assert text_ids[1].tolist() == [ord(c) - 31 for c in long]
+    assert text_mask.shape == (2, 1, len(long))
+    assert text_mask.dtype == np.float32
+    assert text_mask.sum(axis=(1, 2)).tolist() == [len(short), len(long)]
+
+
+def test_processor_names_unsupported_characters(ascii_processor):
+    with pytest.raises(ValueError, match=r"'ß' \(U\+00DF\), '中' \(U\+4E2D\)"):
+        ascii_processor(["Straße", "中文 ok"], ["de", "en"])
+
+
+def test_split_sentences_keeps_abbreviations_and_initials():
+    text = "Mr. Smith met Dr. Jones today! F. Scott wrote it. Was it OK? Yes."
+    assert _split_sentences(text) == [
+        "Mr. Smith met Dr. Jones today!",
+        "F. Scott wrote it.",
+        "Was it OK?",
+        "Yes.",
+    ]
+
+
+def test_iter_chunks_streams_same_chunks_as_chunk_text(tmp_path):
+    with open(os.path.join(os.path.dirname(__file__), "tts.txt"), encoding="utf-8") as f:
+        text = f.read()
+    path = tmp_path / "book.txt"
+    path.write_text(text, encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        assert list(iter_chunks(f, max_len=120)) == chunk_text(text, max_len=120)
+    # Pieces split mid-line and mid-paragraph, like LLM tokens
+    pieces = (text[i : i + 7] for i in range(0, len(text), 7))
+    assert list(iter_chunks(pieces)) == chunk_text(text)
+
+
+def test_incremental_chunker_cuts_as_sentences_complete():
+    chunker = IncrementalChunker(first_len=40, max_len=120)
+    tokens = ["Sure", ",", " this", " is", " a", " rather", " long", " opening", " clause,", " then"]
+    chunks = [chunk for token in tokens for chunk in chunker.feed(token)]
+    # The first sentence outgrows first_len and is cut at its last clause
+    # boundary within it
+    assert chunks == ["Sure,"]
+    assert chunker.feed(" more. Mr.") == ["this is a rather long opening clause, then more."]
+    assert chunker.feed(" Smith ") == []
+    assert chunker.feed("left.\n\nNext") == ["Mr. Smith left."]
+    assert chunker.feed(" 今日は。明日") == ["Next 今日は。"]
+    assert chunker.flush() == ["明日"]
+    assert not chunker.pending
+
+
+def test_incremental_chunker_keeps_closing_bracket_split_across_pieces():
+    chunker = IncrementalChunker(first_len=40, max_len=120)
+    pieces = ["「こんにちは。", "」と彼は言った。", "次の文です。"]
+    chunks = [chunk for piece in pieces for chunk in chunker.feed(piece)]
+    chunks += chunker.flush()
+    assert chunks == ["「こんにちは。」と彼は言った。", "次の文です。"]
@@ -0,0 +1,88 @@
+import sys
+import os
+import copy
+import pytest
+
+# Ensure src is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from supertonic_mnn import wrapper
+from supertonic_mnn.pool import EnginePool
+
+
+class FakeEngine:
+    sample_rate = 24000
+
+    def __init__(self):
+        self.conditioning_cache = None
+        self.waveform_cache = None
+        self.timing_sinks = None
+
+    def clone(self):
+        return copy.copy(self)
+
+    def enable_conditioning_cache(self, max_bytes):
+        self.conditioning_cache = object()
+
+    def enable_waveform_cache(self, max_bytes, disk_dir, disk_bytes):
+        self.waveform_cache = object()
+
+    def enable_timing(self, sinks):
+        self.timing_sinks = list(sinks)
+
+
+@pytest.fixture
+def pooled_tts(monkeypatch, tmp_path):
+    monkeypatch.setattr(wrapper, "ensure_models", lambda *args: None)
+    monkeypatch.setattr(
+        wrapper, "load_engine_pool", lambda *args, size, **kwargs: EnginePool(FakeEngine(), size)
+    )
+
+    def no_single_engine(*args, **kwargs):
+        raise AssertionError("a pooled wrapper must not load a separate engine")
+
+    monkeypatch.setattr(wrapper, "load_text_to_speech", no_single_engine)
+    return wrapper.SupertonicTTS(model_dir=str(tmp_path), pool_size=2)
+
+
+def test_settings_apply_to_every_pool_engine(pooled_tts):
+    pooled_tts.enable_conditioning_cache()
+    pooled_tts.enable_waveform_cache(disk=False)
+    sink = object()
+    pooled_tts.enable_timing([sink])
+    first, second = pooled_tts.pool.engines
+    assert first.conditioning_cache is not None
+    assert second.conditioning_cache is first.conditioning_cache
+    assert first.waveform_cache is not None
+    assert second.waveform_cache is first.waveform_cache
+    assert first.timing_sinks == second.timing_sinks == [sink]
+
+
+def test_batching_with_pool_uses_clone_that_follows_settings(pooled_tts):
+    pooled_tts.enable_batching()
+    try:
+        engine = pooled_tts.scheduler.tts
+        assert engine not in pooled_tts.pool.engines
+        # The pool keeps both engines free for streaming
+        checked_out = [pooled_tts.pool.checkout(timeout=1) for _ in range(2)]
+        for pooled in checked_out:
+            pooled_tts.pool.checkin(pooled)
+        pooled_tts.enable_conditioning_cache()
+        assert engine.conditioning_cache is pooled_tts.pool.engines[0].conditioning_cache
+    finally:
+        pooled_tts.scheduler.close()
+
+
+def test_batching_runs_on_its_own_engine_beside_streams(monkeypatch, tmp_path):
+    monkeypatch.setattr(wrapper, "ensure_models", lambda *args: None)
+    monkeypatch.setattr(wrapper, "load_text_to_speech", lambda *args, **kwargs: FakeEngine())
+    tts = wrapper.SupertonicTTS(model_dir=str(tmp_path))
+    tts.enable_batching(continuous=True)
+    try:
+        with tts._checkout_engine() as engine:
+            assert engine is tts.engine
+        assert tts.scheduler.tts is not tts.engine
+        tts.enable_timing([])
+        assert tts.scheduler.tts.timing_sinks == []
+    finally:
+        tts.scheduler.close()